@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+ANN Benchmark
+IVF index (core/ann_index.py) va aniq qidiruvni solishtirish:
+recall@k, so'rov kechikishi, qurish va mmap yuklash vaqti
+
+Usage:
+    python scripts/benchmark_ann.py
+    python scripts/benchmark_ann.py --size 50000 --k 10 --nprobe 4,8,16,32
+    python scripts/benchmark_ann.py --data embeddings.npy --queries 500
+
+embeddings.npy - (N, 512) float32 haqiqiy ArcFace embeddinglar.
+Berilmasa sintetik galereya yasaladi (har bir shaxs atrofida bir nechta namuna).
+"""
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Project root
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+
+def synthetic_gallery(size: int, dim: int, per_identity: int = 8, noise: float = 0.6, seed: int = 0):
+    """Shaxslar markazlari atrofidagi shovqinli embeddinglar"""
+    rng = np.random.default_rng(seed)
+    identities = rng.normal(size=(max(1, size // per_identity), dim)).astype(np.float32)
+    owners = rng.integers(0, len(identities), size)
+    vectors = identities[owners] + noise * rng.normal(size=(size, dim)).astype(np.float32)
+    return vectors, identities
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float = 0.3, seed: int = 1) -> np.ndarray:
+    """Galereyadagi tasodifiy vektorlarning shovqinli nusxalari (yangi kamera namunasi kabi)"""
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.choice(len(vectors), count, replace=False)]
+    scale = np.linalg.norm(picked, axis=1, keepdims=True) / np.sqrt(picked.shape[1])
+    return picked + noise * scale * rng.normal(size=picked.shape).astype(np.float32)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    """Asosiy funksiya"""
+    parser = argparse.ArgumentParser(description="ANN index benchmark")
+    parser.add_argument("--data", help="(N, dim) embeddinglar .npy fayli")
+    parser.add_argument("--size", type=int, default=20000, help="Sintetik galereya o'lchami")
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--nlist", type=int, default=0, help="0 - avtomatik (~4*sqrt(N))")
+    parser.add_argument("--nprobe", default="1,4,8,16,32")
+    args = parser.parse_args()
+
+    from safebrowser.core.ann_index import IVFIndex
+
+    if args.data:
+        vectors = np.load(args.data).astype(np.float32)
+    else:
+        vectors, _ = synthetic_gallery(args.size, args.dim)
+    ids = np.arange(len(vectors))
+    queries = make_queries(vectors, min(args.queries, len(vectors)))
+    print(f"Galereya: {vectors.shape[0]} x {vectors.shape[1]}, so'rovlar: {len(queries)}, k={args.k}")
+
+    index = IVFIndex(dim=vectors.shape[1], nlist=args.nlist)
+    _, add_ms = timed(lambda: index.add(ids, vectors))
+    _, train_ms = timed(index.train)
+    print(f"Qurish: add {add_ms:.0f} ms, train {train_ms:.0f} ms ({index.nlist} klaster)")
+
+    exact = []
+    started = time.perf_counter()
+    for query in queries:
+        exact.append(index.search_exact(query, args.k)[0].tolist())
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    print("\n" + "=" * 52)
+    print(f"{'':14}{'recall@' + str(args.k):>12}{'recall@1':>10}{'ms/query':>10}{'speedup':>8}")
+    print("=" * 52)
+    print(f"{'exact':14}{1.0:12.3f}{1.0:10.3f}{exact_ms:10.3f}{1.0:7.1f}x")
+
+    for nprobe in (int(n) for n in args.nprobe.split(",")):
+        hits, top1 = 0, 0
+        started = time.perf_counter()
+        results = [index.search(query, args.k, nprobe=nprobe)[0] for query in queries]
+        query_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        for found, truth in zip(results, exact):
+            hits += len(set(truth).intersection(found.tolist()))
+            top1 += int(len(found) > 0 and int(found[0]) == truth[0])
+        recall = hits / sum(len(t) for t in exact)
+        print(f"{'nprobe=' + str(nprobe):14}{recall:12.3f}{top1 / len(queries):10.3f}"
+              f"{query_ms:10.3f}{exact_ms / query_ms:7.1f}x")
+
+    # Saqlash va mmap yuklash
+    with tempfile.TemporaryDirectory() as tmp:
+        _, save_ms = timed(lambda: index.save(tmp))
+        loaded, load_ms = timed(lambda: IVFIndex.load(tmp, mmap=True))
+        loaded.search(queries[0], args.k)
+        print(f"\nSaqlash {save_ms:.0f} ms, mmap yuklash {load_ms:.1f} ms ({len(loaded)} vektor)")
+
+    # Qo'shish/o'chirish (qayta o'qitishsiz)
+    extra = make_queries(vectors, min(1000, len(vectors)), seed=2)
+    _, insert_ms = timed(lambda: index.add(np.arange(len(vectors), len(vectors) + len(extra)), extra))
+    _, delete_ms = timed(lambda: index.remove(range(len(extra))))
+    print(f"Qo'shish {len(extra)} ta: {insert_ms:.1f} ms, o'chirish {len(extra)} ta: {delete_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Embedding Benchmark
+Joriy yo'l (kesilgan yuzda detection + recognition) va
+embed_aligned (keypoint bo'yicha faqat recognition) tezligini solishtirish,
+hamda bittalab va batch embedding o'tkazuvchanligi
+
+Usage:
+    python scripts/benchmark_embedding.py
+    python scripts/benchmark_embedding.py --image face.jpg --runs 50 --batch 8
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Project root
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+
+def load_image(path: str = None) -> np.ndarray:
+    """Test rasmini yuklash (RGB - ilovadagi kabi)"""
+    if path:
+        img = cv2.imread(path)
+        if img is None:
+            print(f"Error: {path} o'qilmadi")
+            sys.exit(1)
+    else:
+        from insightface.data import get_image
+        img = get_image("t1")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def timeit(fn, runs: int) -> float:
+    """O'rtacha vaqt (ms), bitta isitish chaqiruvidan keyin"""
+    fn()
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) * 1000 / runs
+
+
+def crop_with_margin(image: np.ndarray, bbox, margin_x: int = 25, margin_y: int = 40) -> np.ndarray:
+    """FaceDetectorWorker'dagi kabi margin bilan kesish"""
+    h, w = image.shape[:2]
+    x1, y1, x2, y2 = bbox.astype(int)
+    x1, y1 = max(0, x1 - margin_x), max(0, y1 - margin_y)
+    x2, y2 = min(w, x2 + margin_x), min(h, y2 + margin_y)
+    return image[y1:y2, x1:x2].copy()
+
+
+def main():
+    """Asosiy funksiya"""
+    parser = argparse.ArgumentParser(description="Embedding benchmark")
+    parser.add_argument("--image", help="Yuz bor rasm (default: insightface t1)")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--det-size", type=int, default=320)
+    args = parser.parse_args()
+
+    from safebrowser.core.face_analyzer import FaceAnalyzer
+
+    analyzer = FaceAnalyzer(det_size=(args.det_size, args.det_size), gpu_id=-1)
+    if not analyzer.initialize():
+        print("Error: model yuklanmadi")
+        sys.exit(1)
+
+    image = load_image(args.image)
+    faces = analyzer.detect(image)
+    if not faces:
+        print("Error: rasmda yuz topilmadi")
+        sys.exit(1)
+
+    face = max(faces, key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1]))
+    crop = crop_with_margin(image, face.bbox)
+
+    print("=" * 50)
+    print("SafeBrowser Embedding Benchmark")
+    print("=" * 50)
+    print(f"Image: {image.shape[1]}x{image.shape[0]}, faces: {len(faces)}, runs: {args.runs}")
+
+    current_ms = timeit(lambda: analyzer.get_embedding(crop), args.runs)
+    aligned_ms = timeit(lambda: analyzer.embed_aligned(image, face.kps), args.runs)
+
+    frames = [image] * args.batch
+    kps_list = [face.kps] * args.batch
+    batch_ms = timeit(lambda: analyzer.embed_aligned_batch(frames, kps_list), args.runs)
+
+    crops = [crop] * args.batch
+    loop_ms = timeit(lambda: [analyzer.get_embedding(c) for c in crops], args.runs)
+    batched_ms = timeit(lambda: analyzer.get_embeddings_batch(crops), args.runs)
+
+    reference = analyzer.get_embedding(crop)
+    aligned = analyzer.embed_aligned(image, face.kps)
+    similarity = FaceAnalyzer.cosine_similarity(reference, aligned)
+
+    print(f"\n  get_embedding(crop)      : {current_ms:8.2f} ms")
+    print(f"  embed_aligned(frame, kps): {aligned_ms:8.2f} ms  ({current_ms / aligned_ms:.1f}x)")
+    print(f"  embed_aligned_batch x{args.batch:<3} : {batch_ms:8.2f} ms  "
+          f"({batch_ms / args.batch:.2f} ms/face)")
+    print(f"\n  get_embedding x{args.batch:<3}         : {loop_ms:8.2f} ms")
+    print(f"  get_embeddings_batch x{args.batch:<3}  : {batched_ms:8.2f} ms  ({loop_ms / batched_ms:.1f}x)")
+    print(f"\n  Cosine similarity (crop vs aligned): {similarity:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+"""
+Model Quantization
+SCRFD (detection) va ArcFace (recognition) modellarining INT8 nusxalarini
+yaratish hamda FP32 bilan tezlik va aniqlik farqini solishtirish
+
+Nusxalar pack papkasidagi int8/ ostiga yoziladi. Ilovada yoqish uchun
+config.ini'da:
+    [onnx]
+    detector_precision = int8
+    recognizer_precision = int8
+
+Usage:
+    python scripts/quantize_models.py --calib-dir calib/
+    python scripts/quantize_models.py --calib-dir calib/ --mode dynamic --pairs pairs.txt
+    python scripts/quantize_models.py --calib-dir calib/ --report-only
+
+pairs.txt - har qatorda bitta juftlik: "rasm1.jpg rasm2.jpg"
+(calib-dir ga nisbatan yoki to'liq yo'l)
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Project root
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def load_images(calib_dir: Path, limit: int) -> list:
+    """Kalibratsiya rasmlari (RGB - ilovadagi kabi)"""
+    paths = sorted(p for p in calib_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:limit]
+    images = []
+    for path in paths:
+        img = cv2.imread(str(path))
+        if img is not None:
+            images.append((path, cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+    return images
+
+
+def detector_blob(det_model, image: np.ndarray, input_size: tuple) -> np.ndarray:
+    """SCRFD.detect() dagi kabi letterbox + normalizatsiya"""
+    im_ratio = image.shape[0] / image.shape[1]
+    model_ratio = input_size[1] / input_size[0]
+    if im_ratio > model_ratio:
+        new_height = input_size[1]
+        new_width = int(new_height / im_ratio)
+    else:
+        new_width = input_size[0]
+        new_height = int(new_width * im_ratio)
+
+    det_img = np.zeros((input_size[1], input_size[0], 3), dtype=np.uint8)
+    det_img[:new_height, :new_width] = cv2.resize(image, (new_width, new_height))
+    return cv2.dnn.blobFromImage(
+        det_img,
+        1.0 / det_model.input_std,
+        input_size,
+        (det_model.input_mean, det_model.input_mean, det_model.input_mean),
+        swapRB=True
+    )
+
+
+def recognition_blob(rec_model, aligned: list) -> np.ndarray:
+    """FaceAnalyzer._run_recognition() dagi kabi NCHW tensor"""
+    return cv2.dnn.blobFromImages(
+        aligned,
+        1.0 / rec_model.input_std,
+        rec_model.input_size,
+        (rec_model.input_mean, rec_model.input_mean, rec_model.input_mean),
+        swapRB=True
+    )
+
+
+class BlobReader:
+    """onnxruntime.quantization.CalibrationDataReader - tayyor tensorlar ro'yxati"""
+
+    def __init__(self, input_name: str, blobs: list):
+        self.input_name = input_name
+        self._blobs = iter(blobs)
+
+    def get_next(self):
+        blob = next(self._blobs, None)
+        if blob is None:
+            return None
+        return {self.input_name: blob}
+
+
+def quantize(source: Path, target: Path, mode: str, reader=None):
+    """Bitta modelni kvantlash"""
+    from onnxruntime.quantization import (
+        quantize_dynamic,
+        quantize_static,
+        QuantType,
+        QuantFormat,
+    )
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if mode == "dynamic":
+        quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+    else:
+        quantize_static(
+            str(source),
+            str(target),
+            reader,
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8
+        )
+    print(f"  {source.name} -> {target.relative_to(source.parent)} ({mode})")
+
+
+def timeit(fn, runs: int) -> float:
+    """O'rtacha vaqt (ms), bitta isitish chaqiruvidan keyin"""
+    fn()
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) * 1000 / runs
+
+
+def load_pairs(path: str, calib_dir: Path) -> list:
+    """Juftliklar fayli (har qatorda ikki rasm yo'li)"""
+    pairs = []
+    for line in Path(path).read_text().splitlines():
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        a, b = (Path(p) if Path(p).is_absolute() else calib_dir / p for p in parts[:2])
+        img_a, img_b = cv2.imread(str(a)), cv2.imread(str(b))
+        if img_a is not None and img_b is not None:
+            pairs.append((
+                cv2.cvtColor(img_a, cv2.COLOR_BGR2RGB),
+                cv2.cvtColor(img_b, cv2.COLOR_BGR2RGB)
+            ))
+    return pairs
+
+
+def report(fp32, int8, images: list, pairs: list, det_size: tuple, runs: int):
+    """FP32 va INT8: tezlik va aniqlik farqi"""
+    from safebrowser.core.face_analyzer import FaceAnalyzer
+    from safebrowser.core.tracker import bbox_iou
+
+    image = images[0][1]
+    face = fp32._largest(fp32.detect(image))
+
+    print("\n" + "=" * 60)
+    print(f"{'':22}{'FP32':>10}{'INT8':>10}{'speedup':>10}")
+    print("=" * 60)
+
+    det_fp32 = timeit(lambda: fp32.detect(image), runs)
+    det_int8 = timeit(lambda: int8.detect(image), runs)
+    print(f"{'detection ' + str(det_size[0]) + ' (ms)':22}{det_fp32:10.2f}{det_int8:10.2f}"
+          f"{det_fp32 / det_int8:9.2f}x")
+
+    if face is not None:
+        rec_fp32 = timeit(lambda: fp32.embed_aligned(image, face.kps), runs)
+        rec_int8 = timeit(lambda: int8.embed_aligned(image, face.kps), runs)
+        print(f"{'recognition (ms)':22}{rec_fp32:10.2f}{rec_int8:10.2f}{rec_fp32 / rec_int8:9.2f}x")
+
+    # Aniqlik: bir xil keypointlar bo'yicha embedding farqi va detection IoU
+    embedding_cos, det_iou, det_missed = [], [], 0
+    for _, img in images:
+        ref = fp32._largest(fp32.detect(img))
+        if ref is None:
+            continue
+
+        test = int8._largest(int8.detect(img))
+        if test is None:
+            det_missed += 1
+        else:
+            det_iou.append(bbox_iou(ref.bbox, test.bbox))
+
+        embedding_cos.append(FaceAnalyzer.cosine_similarity(
+            fp32.embed_aligned(img, ref.kps),
+            int8.embed_aligned(img, ref.kps)
+        ))
+
+    print("\nAccuracy drift")
+    if embedding_cos:
+        print(f"  embedding cosine FP32 vs INT8 : mean {np.mean(embedding_cos):.4f}, "
+              f"min {np.min(embedding_cos):.4f} ({len(embedding_cos)} faces)")
+    if det_iou or det_missed:
+        print(f"  detection IoU FP32 vs INT8    : mean {np.mean(det_iou) if det_iou else 0:.4f}, "
+              f"missed {det_missed}")
+
+    if pairs:
+        drift = []
+        for img_a, img_b in pairs:
+            sims = []
+            for analyzer in (fp32, int8):
+                emb_a = analyzer.get_embeddings_batch([img_a])[0]
+                emb_b = analyzer.get_embeddings_batch([img_b])[0]
+                sims.append(FaceAnalyzer.cosine_similarity(emb_a, emb_b))
+            drift.append(abs(sims[0] - sims[1]))
+        print(f"  pair similarity |FP32 - INT8| : mean {np.mean(drift):.4f}, "
+              f"max {np.max(drift):.4f} ({len(pairs)} pairs)")
+
+
+def main():
+    """Asosiy funksiya"""
+    parser = argparse.ArgumentParser(description="INT8 model quantization")
+    parser.add_argument("--calib-dir", required=True, help="Kalibratsiya rasmlari papkasi")
+    parser.add_argument("--mode", choices=["static", "dynamic"], default="static")
+    parser.add_argument("--models", choices=["all", "detection", "recognition"], default="all")
+    parser.add_argument("--pairs", help="Aniqlik uchun juftliklar fayli")
+    parser.add_argument("--limit", type=int, default=100, help="Maksimal kalibratsiya rasmlari")
+    parser.add_argument("--det-size", type=int, default=640)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--report-only", action="store_true", help="Faqat solishtirish")
+    args = parser.parse_args()
+
+    from safebrowser.core.face_analyzer import FaceAnalyzer
+    from safebrowser.core.onnx_session import quantized_model_path
+
+    calib_dir = Path(args.calib_dir)
+    det_size = (args.det_size, args.det_size)
+    images = load_images(calib_dir, args.limit)
+    if not images:
+        print(f"Error: {calib_dir} da rasm topilmadi")
+        sys.exit(1)
+
+    fp32 = FaceAnalyzer(
+        det_size=det_size,
+        gpu_id=-1,
+        precision={"detection": "fp32", "recognition": "fp32"}
+    )
+    if not fp32.initialize():
+        print("Error: FP32 model yuklanmadi")
+        sys.exit(1)
+
+    tasks = ["detection", "recognition"] if args.models == "all" else [args.models]
+
+    if not args.report_only:
+        print(f"Quantizing ({args.mode}, {len(images)} calibration images)...")
+        for taskname in tasks:
+            model = fp32.models[taskname]
+            source = Path(model.model_file)
+            reader = None
+
+            if args.mode == "static":
+                if taskname == "detection":
+                    blobs = [detector_blob(model, img, det_size) for _, img in images]
+                else:
+                    faces = [(img, fp32._largest(fp32.detect(img))) for _, img in images]
+                    blobs = [
+                        recognition_blob(model, [fp32._align(img, face.kps)])
+                        for img, face in faces if face is not None
+                    ]
+                if not blobs:
+                    print(f"Error: {taskname} uchun kalibratsiya ma'lumoti yo'q (yuz topilmadi)")
+                    sys.exit(1)
+                reader = BlobReader(model.input_name, blobs)
+
+            quantize(source, quantized_model_path(str(source), "int8"), args.mode, reader)
+
+    int8 = FaceAnalyzer(
+        det_size=det_size,
+        gpu_id=-1,
+        precision={t: ("int8" if t in tasks else "fp32") for t in ("detection", "recognition")}
+    )
+    if not int8.initialize():
+        print("Error: INT8 model yuklanmadi")
+        sys.exit(1)
+
+    pairs = load_pairs(args.pairs, calib_dir) if args.pairs else []
+    report(fp32, int8, images, pairs, det_size, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,13 @@ SafeBrowser Entry Point
 python -m safebrowser
 """
 import sys
+import multiprocessing
 
 
 def main():
     """Entry point"""
+    # Inference server (spawn) - PyInstaller exe ichida ham ishlashi uchun
+    multiprocessing.freeze_support()
     from safebrowser.app import SafeBrowserApp
     app = SafeBrowserApp()
     sys.exit(app.run())
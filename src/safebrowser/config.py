@@ -23,12 +23,71 @@ DEFAULTS = {
     "api": {
         "base_url": "http://localhost:8000/api/v1",
         "timeout": "15",
+        # Server ixcham formatni (sbe1) qo'llab-quvvatlamaguncha - legacy
+        "embedding_format": "legacy",
+        "retries": "2",
+        "backoff": "0.3",
+        "pool_size": "8",
+    },
+    # Endpoint bo'yicha timeout (soniya); bo'lmasa [api] timeout
+    "api_timeouts": {
+        "users/face_identification": "10",
+        "users/face_gallery": "30",
     },
     "face_recognition": {
         "detection_size": "640",
         "similarity_threshold": "40",
         "check_interval": "10",
     },
+    "staff_gallery": {
+        "enabled": "true",
+        "threshold": "45",
+        "top_k": "3",
+        # Lokal moslikni qo'shimcha server tasdig'idan o'tkazish (ixtiyoriy)
+        "server_confirm": "false",
+        # Sinxronlash bundan eski bo'lsa (soat) lokal moslik server'siz qabul qilinmaydi
+        "max_sync_age": "24",
+    },
+    "face_detector": {
+        "target_preview_fps": "25",
+        "target_detection_hz": "5",
+        "max_detection_hz": "15",
+        "adaptive_det_size": "false",
+        "tracker_enabled": "true",
+        "keyframe_interval": "1.0",
+        "roi_detection": "false",
+        "roi_input_size": "160",
+        "full_scan_interval": "2.0",
+        "embedding_interval": "1.0",
+    },
+    "quality": {
+        "enabled": "true",
+        "min_det_score": "0.6",
+        "min_face_size": "60",
+        "min_sharpness": "40",
+        "max_yaw": "35",
+        "max_pitch": "30",
+    },
+    "onnx": {
+        "intra_op_threads": "0",
+        "inter_op_threads": "1",
+        "reserved_cores": "2",
+        "execution_mode": "sequential",
+        "graph_optimization": "all",
+        "allow_spinning": "false",
+        "pin_threads": "false",
+        "optimized_cache": "true",
+        "detector_precision": "fp32",
+        "recognizer_precision": "fp32",
+        "execution_provider": "auto",
+    },
+    "inference": {
+        "out_of_process": "false",
+        "slots": "2",
+        "slot_mb": "8",
+        "request_timeout": "10",
+        "workers": "1",
+    },
     "camera": {
         "width": "640",
         "height": "480",
@@ -80,6 +139,10 @@ class Config:
         """Integer qiymat olish"""
         return self._config.getint(section, key, fallback=fallback)
 
+    def getfloat(self, section: str, key: str, fallback: float = 0.0) -> float:
+        """Float qiymat olish"""
+        return self._config.getfloat(section, key, fallback=fallback)
+
     def getboolean(self, section: str, key: str, fallback: bool = False) -> bool:
         """Boolean qiymat olish"""
         return self._config.getboolean(section, key, fallback=fallback)
@@ -99,6 +162,27 @@ class Config:
     def api_timeout(self) -> int:
         return self.getint("api", "timeout", 15)
 
+    @property
+    def api_retries(self) -> int:
+        return self.getint("api", "retries", 2)
+
+    @property
+    def api_backoff(self) -> float:
+        return self.getfloat("api", "backoff", 0.3)
+
+    @property
+    def api_pool_size(self) -> int:
+        return self.getint("api", "pool_size", 8)
+
+    def api_endpoint_timeout(self, endpoint: str) -> float:
+        """Endpoint uchun timeout ([api_timeouts], bo'lmasa [api] timeout)"""
+        return self.getfloat("api_timeouts", endpoint.strip("/"), float(self.api_timeout))
+
+    @property
+    def api_embedding_format(self) -> str:
+        """Embedding yuborish formati: legacy (standart), int8 yoki float16"""
+        return self.get("api", "embedding_format", "legacy")
+
     @property
     def detection_size(self) -> int:
         return self.getint("face_recognition", "detection_size", 640)
@@ -107,10 +191,159 @@ class Config:
     def similarity_threshold(self) -> int:
         return self.getint("face_recognition", "similarity_threshold", 40)
 
+    @property
+    def staff_gallery_enabled(self) -> bool:
+        return self.getboolean("staff_gallery", "enabled", True)
+
+    @property
+    def staff_gallery_threshold(self) -> int:
+        return self.getint("staff_gallery", "threshold", 45)
+
+    @property
+    def staff_gallery_top_k(self) -> int:
+        return self.getint("staff_gallery", "top_k", 3)
+
+    @property
+    def staff_gallery_server_confirm(self) -> bool:
+        return self.getboolean("staff_gallery", "server_confirm", False)
+
+    @property
+    def staff_gallery_max_sync_age(self) -> float:
+        """Soniyalarda (config'da soat)"""
+        return self.getfloat("staff_gallery", "max_sync_age", 24) * 3600
+
     @property
     def check_interval(self) -> int:
         return self.getint("face_recognition", "check_interval", 10)
 
+    @property
+    def target_preview_fps(self) -> int:
+        return self.getint("face_detector", "target_preview_fps", 25)
+
+    @property
+    def target_detection_hz(self) -> int:
+        return self.getint("face_detector", "target_detection_hz", 5)
+
+    @property
+    def max_detection_hz(self) -> int:
+        return self.getint("face_detector", "max_detection_hz", 15)
+
+    @property
+    def adaptive_det_size(self) -> bool:
+        return self.getboolean("face_detector", "adaptive_det_size", False)
+
+    @property
+    def tracker_enabled(self) -> bool:
+        return self.getboolean("face_detector", "tracker_enabled", True)
+
+    @property
+    def keyframe_interval(self) -> float:
+        return self.getfloat("face_detector", "keyframe_interval", 1.0)
+
+    @property
+    def roi_detection(self) -> bool:
+        return self.getboolean("face_detector", "roi_detection", False)
+
+    @property
+    def roi_input_size(self) -> int:
+        return self.getint("face_detector", "roi_input_size", 160)
+
+    @property
+    def full_scan_interval(self) -> float:
+        return self.getfloat("face_detector", "full_scan_interval", 2.0)
+
+    @property
+    def embedding_interval(self) -> float:
+        return self.getfloat("face_detector", "embedding_interval", 1.0)
+
+    @property
+    def quality_enabled(self) -> bool:
+        return self.getboolean("quality", "enabled", True)
+
+    @property
+    def quality_min_det_score(self) -> float:
+        return self.getfloat("quality", "min_det_score", 0.6)
+
+    @property
+    def quality_min_face_size(self) -> int:
+        return self.getint("quality", "min_face_size", 60)
+
+    @property
+    def quality_min_sharpness(self) -> float:
+        return self.getfloat("quality", "min_sharpness", 40.0)
+
+    @property
+    def quality_max_yaw(self) -> float:
+        return self.getfloat("quality", "max_yaw", 35.0)
+
+    @property
+    def quality_max_pitch(self) -> float:
+        return self.getfloat("quality", "max_pitch", 30.0)
+
+    @property
+    def onnx_intra_op_threads(self) -> int:
+        return self.getint("onnx", "intra_op_threads", 0)
+
+    @property
+    def onnx_inter_op_threads(self) -> int:
+        return self.getint("onnx", "inter_op_threads", 1)
+
+    @property
+    def onnx_reserved_cores(self) -> int:
+        return self.getint("onnx", "reserved_cores", 2)
+
+    @property
+    def onnx_execution_mode(self) -> str:
+        return self.get("onnx", "execution_mode", "sequential").lower()
+
+    @property
+    def onnx_graph_optimization(self) -> str:
+        return self.get("onnx", "graph_optimization", "all").lower()
+
+    @property
+    def onnx_allow_spinning(self) -> bool:
+        return self.getboolean("onnx", "allow_spinning", False)
+
+    @property
+    def onnx_pin_threads(self) -> bool:
+        return self.getboolean("onnx", "pin_threads", False)
+
+    @property
+    def onnx_optimized_cache(self) -> bool:
+        return self.getboolean("onnx", "optimized_cache", True)
+
+    @property
+    def detector_precision(self) -> str:
+        return self.get("onnx", "detector_precision", "fp32").lower()
+
+    @property
+    def recognizer_precision(self) -> str:
+        return self.get("onnx", "recognizer_precision", "fp32").lower()
+
+    @property
+    def execution_provider(self) -> str:
+        return self.get("onnx", "execution_provider", "auto").strip()
+
+    @property
+    def inference_out_of_process(self) -> bool:
+        return self.getboolean("inference", "out_of_process", False)
+
+    @property
+    def inference_slots(self) -> int:
+        return self.getint("inference", "slots", 2)
+
+    @property
+    def inference_slot_mb(self) -> int:
+        return self.getint("inference", "slot_mb", 8)
+
+    @property
+    def inference_timeout(self) -> float:
+        return self.getfloat("inference", "request_timeout", 10.0)
+
+    @property
+    def inference_workers(self) -> int:
+        return self.getint("inference", "workers", 1)
+
     @property
     def camera_width(self) -> int:
         return self.getint("camera", "width", 640)
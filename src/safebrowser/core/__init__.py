@@ -3,5 +3,17 @@ Core module - Face recognition va proctoring asosiy logikasi
 """
 
 from safebrowser.core.face_analyzer import FaceAnalyzer
+from safebrowser.core.scheduler import LatencyBudgetScheduler
+from safebrowser.core.tracker import FaceTracker
+from safebrowser.core.roi_detector import RoiDetector
+from safebrowser.core.model_registry import ModelRegistry, registry
+from safebrowser.core.inference_executor import InferenceExecutor, executor
+from safebrowser.core.embedding_cache import EmbeddingCache
+from safebrowser.core.verifier import SequentialVerifier
+from safebrowser.core.quality import FaceQualityGate
+from safebrowser.core.ann_index import IVFIndex
+from safebrowser.core.staff_gallery import StaffGallery
 
-__all__ = ["FaceAnalyzer"]
+__all__ = ["FaceAnalyzer", "LatencyBudgetScheduler", "FaceTracker", "RoiDetector",
+           "ModelRegistry", "registry", "InferenceExecutor", "executor", "EmbeddingCache",
+           "SequentialVerifier", "FaceQualityGate", "IVFIndex", "StaffGallery"]
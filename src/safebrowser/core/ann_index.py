@@ -0,0 +1,305 @@
+"""
+ANN Index - katta galereyalar uchun taxminiy eng yaqin qo'shni qidiruvi
+IVF (inverted file): embeddinglar k-means markazlari bo'yicha
+klasterlarga bo'linadi, qidiruvda faqat so'rovga eng yaqin nprobe ta
+klaster ko'riladi. Faqat numpy - qo'shimcha kutubxona talab qilinmaydi.
+
+- add()/remove(): o'qitilgandan keyin ham qo'shish va o'chirish
+- save()/load(): .npy fayllar, load(mmap=True) - xotiraga nusxalamasdan
+- O'qitilmagan index (kichik galereya) aniq qidiruv bilan ishlaydi
+
+O'lchov: scripts/benchmark_ann.py (recall@k va kechikish, aniq qidiruvga nisbatan)
+"""
+import json
+import math
+import os
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+
+INDEX_FILES = ("vectors", "ids", "lists", "alive", "centroids")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Eng katta k ta qiymat indekslari (kamayish tartibida)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    nlist: int,
+    iterations: int = 10,
+    seed: int = 0
+) -> np.ndarray:
+    """Cosine o'xshashlik bo'yicha k-means (markazlar normallashtirilgan)"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+
+        # Klaster bo'yicha yig'indi: saralab, bo'laklarni reduceat bilan qo'shish
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+
+        sums = np.empty_like(centroids)
+        sums[filled] = np.add.reduceat(vectors[order], starts, axis=0)
+
+        # Bo'sh klaster - tasodifiy nuqtadan qayta boshlash
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = _normalize(sums)
+
+    return centroids
+
+
+class IVFIndex:
+    """
+    Cosine o'xshashlik uchun IVF-Flat index
+
+    Vektorlar normallashtirilib (capacity, dim) float32 massivda
+    saqlanadi; har bir qator klaster raqami (lists) va tirik/o'chirilgan
+    belgisi (alive) bilan. O'chirish - belgi (compact() joyni bo'shatadi).
+    """
+
+    def __init__(self, dim: int = 512, nlist: int = 0, nprobe: int = 8):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids = None
+
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lists = np.empty(0, dtype=np.int32)
+        self._alive = np.empty(0, dtype=bool)
+        self._size = 0
+        self._rows = {}
+        self._members = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id) -> bool:
+        return int(item_id) in self._rows
+
+    @staticmethod
+    def default_nlist(count: int) -> int:
+        """Klasterlar soni: ~4*sqrt(N), kamida 1"""
+        return max(1, int(4 * math.sqrt(count)))
+
+    def train(self, vectors: np.ndarray = None, iterations: int = 10, max_samples: int = 50000):
+        """
+        k-means markazlarini o'rgatish
+
+        vectors berilmasa index'dagi mavjud vektorlar ishlatiladi.
+        Mavjud vektorlar yangi markazlar bo'yicha qayta taqsimlanadi.
+        """
+        if vectors is None:
+            vectors = self._vectors[:self._size][self._alive[:self._size]]
+        vectors = _normalize(vectors)
+        if not len(vectors):
+            raise ValueError("O'qitish uchun vektor yo'q")
+
+        nlist = min(self.nlist or self.default_nlist(len(vectors)), len(vectors))
+        if len(vectors) > max_samples:
+            rng = np.random.default_rng(0)
+            vectors = vectors[rng.choice(len(vectors), max_samples, replace=False)]
+
+        self.nlist = nlist
+        self.centroids = spherical_kmeans(vectors, nlist, iterations)
+        if self._size:
+            self._lists[:self._size] = self._assign(self._vectors[:self._size])
+        self._members = None
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _reserve(self, extra: int):
+        """Massivlarni kamida extra qatorga kengaytirish (ikki barobar o'sish)"""
+        needed = self._size + extra
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+
+        capacity = max(needed, capacity * 2, 1024)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        ids = np.empty(capacity, dtype=np.int64)
+        lists = np.zeros(capacity, dtype=np.int32)
+        alive = np.zeros(capacity, dtype=bool)
+
+        vectors[:self._size] = self._vectors[:self._size]
+        ids[:self._size] = self._ids[:self._size]
+        lists[:self._size] = self._lists[:self._size]
+        alive[:self._size] = self._alive[:self._size]
+        self._vectors, self._ids, self._lists, self._alive = vectors, ids, lists, alive
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray):
+        """Vektorlarni qo'shish (mavjud id - almashtiriladi)"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        vectors = _normalize(np.asarray(vectors).reshape(len(ids), self.dim))
+        self.remove(i for i in ids if int(i) in self._rows)
+
+        self._reserve(len(ids))
+        start, end = self._size, self._size + len(ids)
+        self._vectors[start:end] = vectors
+        self._ids[start:end] = ids
+        self._alive[start:end] = True
+        if self.is_trained:
+            self._lists[start:end] = self._assign(vectors)
+
+        for offset, item_id in enumerate(ids):
+            self._rows[int(item_id)] = start + offset
+        self._size = end
+        self._members = None
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Vektorlarni o'chirish (belgi qo'yiladi)"""
+        removed = 0
+        for item_id in ids:
+            row = self._rows.pop(int(item_id), None)
+            if row is not None:
+                self._alive[row] = False
+                removed += 1
+        if removed:
+            self._members = None
+        return removed
+
+    def compact(self):
+        """O'chirilgan qatorlarni tashlab yuborish"""
+        keep = np.flatnonzero(self._alive[:self._size])
+        self._vectors = np.ascontiguousarray(self._vectors[keep])
+        self._ids = self._ids[keep].copy()
+        self._lists = self._lists[keep].copy()
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._size = len(keep)
+        self._rows = {int(item_id): row for row, item_id in enumerate(self._ids)}
+        self._members = None
+
+    def _list_members(self) -> List[np.ndarray]:
+        """Har bir klasterdagi tirik qatorlar (o'zgarishgacha keshlanadi)"""
+        if self._members is None:
+            rows = np.flatnonzero(self._alive[:self._size])
+            lists = self._lists[rows]
+            order = np.argsort(lists, kind="stable")
+            bounds = np.searchsorted(lists[order], np.arange(self.nlist + 1))
+            sorted_rows = rows[order]
+            self._members = [sorted_rows[bounds[i]:bounds[i + 1]] for i in range(self.nlist)]
+        return self._members
+
+    def search_exact(self, query: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Aniq qidiruv (barcha tirik vektorlar bo'yicha)"""
+        query = _normalize(np.asarray(query).ravel())
+        scores = self._vectors[:self._size] @ query
+        scores[~self._alive[:self._size]] = -np.inf
+
+        top = _top_k(scores, min(k, len(self)))
+        return self._ids[top], scores[top]
+
+    def search(self, query: np.ndarray, k: int = 1, nprobe: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Taxminiy qidiruv
+
+        Returns:
+            (ids, o'xshashliklar) - kamayish tartibida
+        """
+        if not self.is_trained:
+            return self.search_exact(query, k)
+
+        query = _normalize(np.asarray(query).ravel())
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes = _top_k(self.centroids @ query, nprobe)
+
+        members = self._list_members()
+        rows = np.concatenate([members[p] for p in probes])
+        if not len(rows):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self._vectors[rows] @ query
+        top = _top_k(scores, k)
+        return self._ids[rows[top]], scores[top]
+
+    def find_duplicates(self, threshold: float, k: int = 5, nprobe: int = None) -> List[tuple]:
+        """
+        Bir-biriga juda o'xshash juftliklar (masalan, takroriy nomzodlar)
+
+        Returns:
+            [(id1, id2, o'xshashlik)] - id1 < id2, o'xshashlik kamayish tartibida
+        """
+        pairs = {}
+        for row in np.flatnonzero(self._alive[:self._size]):
+            item_id = int(self._ids[row])
+            ids, scores = self.search(self._vectors[row], k + 1, nprobe)
+            for other, score in zip(ids, scores):
+                other = int(other)
+                if other != item_id and score >= threshold:
+                    pairs[(min(item_id, other), max(item_id, other))] = float(score)
+        return sorted(((a, b, s) for (a, b), s in pairs.items()), key=lambda p: -p[2])
+
+    def save(self, directory: str):
+        """
+        Index'ni papkaga yozish (har bir massiv alohida .npy - mmap uchun)
+
+        Fayllar vaqtinchalik nomga yozilib almashtiriladi - mmap bilan
+        ochilgan eski fayllar ustiga yozilmaydi.
+        """
+        self.compact()
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        arrays = {
+            "vectors": self._vectors,
+            "ids": self._ids,
+            "lists": self._lists,
+            "alive": self._alive,
+            "centroids": self.centroids if self.is_trained else np.empty((0, self.dim), np.float32),
+        }
+        for name, array in arrays.items():
+            tmp = directory / f"{name}.tmp.npy"
+            np.save(tmp, array)
+            os.replace(tmp, directory / f"{name}.npy")
+
+        meta = {"dim": self.dim, "nlist": self.nlist, "nprobe": self.nprobe, "trained": self.is_trained}
+        (directory / "index.json").write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'IVFIndex':
+        """
+        Index'ni o'qish
+
+        mmap=True - vektorlar copy-on-write xotira xaritasi orqali
+        o'qiladi (katta galereya RAM'ga to'liq yuklanmaydi).
+        """
+        directory = Path(directory)
+        meta = json.loads((directory / "index.json").read_text())
+        mode = "c" if mmap else None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mode) for name in INDEX_FILES}
+
+        index = cls(dim=meta["dim"], nlist=meta["nlist"], nprobe=meta["nprobe"])
+        index._vectors = arrays["vectors"]
+        index._ids = arrays["ids"]
+        index._lists = arrays["lists"]
+        index._alive = arrays["alive"]
+        index._size = len(arrays["ids"])
+        index.centroids = np.array(arrays["centroids"]) if meta["trained"] else None
+        index._rows = {int(item_id): row for row, item_id in enumerate(index._ids)}
+        return index
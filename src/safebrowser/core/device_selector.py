@@ -0,0 +1,277 @@
+"""
+Device Selector - o'lchov asosida execution provider tanlash
+Har bir mavjud provider (va CPU uchun bir nechta thread soni) probe
+frame'da (InsightFace bilan keladigan yuzli rasm) detection va
+tekislangan yuz crop'ida recognition bilan o'lchanadi. G'olib app data
+papkasida qurilma identifikatori bo'yicha saqlanadi va keyingi
+ishga tushirishlarda qayta o'lchanmaydi.
+"""
+import json
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+import psutil
+
+from safebrowser.core.model_registry import ModelRegistry, DEFAULT_PACK, CPU_PROVIDERS
+
+
+# Tezlatkich provider'lar (TensorRT - engine qurish juda uzoq, o'lchanmaydi)
+ACCELERATED_PROVIDERS = [
+    'CUDAExecutionProvider',
+    'ROCMExecutionProvider',
+    'DmlExecutionProvider',
+    'OpenVINOExecutionProvider',
+    'CoreMLExecutionProvider',
+]
+
+# config.ini [onnx] execution_provider qisqa nomlari
+PROVIDER_ALIASES = {
+    "cpu": 'CPUExecutionProvider',
+    "cuda": 'CUDAExecutionProvider',
+    "rocm": 'ROCMExecutionProvider',
+    "dml": 'DmlExecutionProvider',
+    "openvino": 'OpenVINOExecutionProvider',
+    "coreml": 'CoreMLExecutionProvider',
+}
+
+CACHE_FILE_NAME = "execution_provider.json"
+
+
+def _cache_file() -> Path:
+    from safebrowser.utils.system import get_app_data_dir
+    return get_app_data_dir() / CACHE_FILE_NAME
+
+
+def _fingerprint() -> str:
+    """Qurilma + ONNX Runtime versiyasi va provider'lari"""
+    import onnxruntime as ort
+    from safebrowser.utils.system import get_hardware_fingerprint
+
+    return get_hardware_fingerprint(f"{ort.__version__}|{','.join(ort.get_available_providers())}")
+
+
+def candidate_configs() -> List[dict]:
+    """O'lchanadigan konfiguratsiyalar: tezlatkichlar va CPU thread variantlari"""
+    import onnxruntime as ort
+    from safebrowser.core.onnx_session import intra_op_threads
+
+    available = ort.get_available_providers()
+    candidates = [
+        {"providers": [provider, 'CPUExecutionProvider'], "intra_op_threads": 0}
+        for provider in ACCELERATED_PROVIDERS
+        if provider in available
+    ]
+
+    physical = psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
+    for threads in sorted({intra_op_threads(), physical, max(1, physical // 2)}, reverse=True):
+        candidates.append({"providers": list(CPU_PROVIDERS), "intra_op_threads": threads})
+    return candidates
+
+
+PROBE_IMAGE = "t1"
+
+
+def _probe_frame() -> np.ndarray:
+    """
+    Kamera o'lchamidagi probe frame
+
+    InsightFace paketidagi yuzli rasm (t1), topilmasa -
+    deterministik shovqin.
+    """
+    try:
+        from insightface.data import get_image
+        return cv2.resize(get_image(PROBE_IMAGE), (640, 480))
+    except Exception as e:
+        print(f"Probe rasm topilmadi ({e}) - shovqinli frame")
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+
+def _probe_crop(frame: np.ndarray, det, det_size: Tuple[int, int], size: int) -> np.ndarray:
+    """
+    Recognition uchun tekislangan size x size yuz crop'i
+
+    Birinchi topilgan yuz landmark'lari bo'yicha; yuz topilmasa -
+    frame markazidan kesilgan qat'iy crop (nol emas).
+    """
+    from insightface.utils import face_align
+
+    bboxes, kpss = det.detect(frame, input_size=det_size)
+    if kpss is not None and len(kpss):
+        best = int(np.argmax(bboxes[:, 4]))
+        return face_align.norm_crop(frame, kpss[best], image_size=size)
+
+    h, w = frame.shape[:2]
+    side = min(h, w)
+    top, left = (h - side) // 2, (w - side) // 2
+    return cv2.resize(frame[top:top + side, left:left + side], (size, size))
+
+
+def benchmark(
+    candidate: dict,
+    pack: str = DEFAULT_PACK,
+    det_size: Tuple[int, int] = (640, 640),
+    precision: dict = None,
+    runs: int = 5
+) -> dict:
+    """
+    Bitta konfiguratsiyani o'lchash
+
+    Alohida registry ishlatiladi - o'lchov modellari asosiy
+    registry'ga tushmaydi va o'lchovdan keyin o'chiriladi. Thread soni
+    shu registry sessiyalariga beriladi - global sozlama o'zgarmaydi.
+
+    Returns:
+        {"providers", "intra_op_threads", "detection_ms", "recognition_ms", "total_ms"}
+        yoki xatolikda {"error": ...}
+    """
+    precision = precision or {}
+    result = dict(candidate)
+    bench = ModelRegistry(intra_op_threads=candidate.get("intra_op_threads") or None)
+    handles = []
+
+    try:
+        for taskname in ("detection", "recognition"):
+            handles.append(bench.acquire(
+                taskname,
+                pack,
+                candidate["providers"],
+                precision.get(taskname, "fp32")
+            ))
+        det, rec = handles[0].model, handles[1].model
+
+        frame = _probe_frame()
+
+        # Birinchi chaqiruv - kernel tayyorlash, o'lchovga kirmaydi
+        aligned = _probe_crop(frame, det, det_size, rec.input_size[0])
+        rec.get_feat([aligned])
+
+        det_times, rec_times = [], []
+        for _ in range(runs):
+            started = time.perf_counter()
+            det.detect(frame, input_size=det_size)
+            det_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            rec.get_feat([aligned])
+            rec_times.append(time.perf_counter() - started)
+
+        result["detection_ms"] = round(float(np.median(det_times)) * 1000, 2)
+        result["recognition_ms"] = round(float(np.median(rec_times)) * 1000, 2)
+        result["total_ms"] = round(result["detection_ms"] + result["recognition_ms"], 2)
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        for handle in handles:
+            handle.release()
+
+    return result
+
+
+def _load_cache() -> dict:
+    try:
+        return json.loads(_cache_file().read_text())
+    except Exception:
+        return {}
+
+
+def _save_cache(cache: dict):
+    try:
+        path = _cache_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(cache, indent=2))
+    except Exception as e:
+        print(f"Execution provider cache save error: {e}")
+
+
+def _configured_provider() -> Optional[dict]:
+    """config.ini da provider qo'lda berilgan bo'lsa"""
+    from safebrowser.config import config
+
+    name = config.execution_provider
+    if name in ("", "auto"):
+        return None
+
+    provider = PROVIDER_ALIASES.get(name, name)
+    providers = [provider] if provider == 'CPUExecutionProvider' else [provider, 'CPUExecutionProvider']
+    return {"providers": providers, "intra_op_threads": 0, "source": "config"}
+
+
+def select_execution(
+    pack: str = DEFAULT_PACK,
+    det_size: Tuple[int, int] = (640, 640),
+    precision: dict = None,
+    force: bool = False,
+    progress=None
+) -> dict:
+    """
+    Eng tez execution konfiguratsiyasini tanlash
+
+    Args:
+        force: Keshni e'tiborsiz qoldirib qayta o'lchash
+        progress: callback(message) - har bir o'lchov oldidan
+
+    Returns:
+        {"providers": [...], "intra_op_threads": n, ...}
+    """
+    configured = _configured_provider()
+    if configured is not None:
+        return configured
+
+    fingerprint = _fingerprint()
+    cache = _load_cache()
+    cached = cache.get(fingerprint)
+    if cached and not force:
+        print(f"Execution provider (cache): {cached['providers'][0]}, "
+              f"threads={cached['intra_op_threads']}")
+        return cached
+
+    results = []
+    for candidate in candidate_configs():
+        label = f"{candidate['providers'][0]} (threads={candidate['intra_op_threads'] or 'auto'})"
+        if progress is not None:
+            progress(f"O'lchanmoqda: {label}")
+
+        result = benchmark(candidate, pack, det_size, precision)
+        results.append(result)
+        if "error" in result:
+            print(f"  {label}: xatolik - {result['error']}")
+        else:
+            print(f"  {label}: det {result['detection_ms']} ms, rec {result['recognition_ms']} ms")
+
+    valid = [r for r in results if "error" not in r]
+    if not valid:
+        return {"providers": list(CPU_PROVIDERS), "intra_op_threads": 0, "source": "fallback"}
+
+    best = min(valid, key=lambda r: r["total_ms"])
+    selection = {
+        "providers": best["providers"],
+        "intra_op_threads": best["intra_op_threads"],
+        "total_ms": best["total_ms"],
+        "det_size": list(det_size),
+        "measured_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+        "source": "benchmark",
+    }
+    cache[fingerprint] = selection
+    _save_cache(cache)
+
+    print(f"Execution provider tanlandi: {best['providers'][0]}, "
+          f"threads={best['intra_op_threads']} ({best['total_ms']} ms)")
+    return selection
+
+
+def apply_selection(selection: dict) -> List[str]:
+    """
+    Tanlovni sessiya sozlamalariga qo'llash
+
+    Returns:
+        FaceAnalyzer uchun provider'lar ro'yxati
+    """
+    from safebrowser.core.onnx_session import set_thread_override
+
+    set_thread_override(selection.get("intra_op_threads") or None)
+    return list(selection["providers"])
@@ -0,0 +1,75 @@
+"""
+Embedding Cache - rasm mazmuni bo'yicha embedding keshi (LRU)
+Bir xil pasport rasmi bilan takroriy tekshiruvlarda rasm qayta
+decode qilinmaydi va recognition qayta ishlatilmaydi.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Union
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Chegaralangan LRU kesh: mazmun hash'i -> normallashtirilgan embedding
+
+    Kalit - rasm baytlari (yoki base64 matni) bo'yicha blake2b hash,
+    shuning uchun bir xil rasm boshqa obyekt bo'lib kelsa ham topiladi.
+    """
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = max(1, capacity)
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(content: Union[str, bytes]) -> str:
+        if isinstance(content, str):
+            content = content.encode()
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    @staticmethod
+    def normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._items.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding: np.ndarray) -> np.ndarray:
+        """Normallashtirib saqlash va saqlangan nusxani qaytarish"""
+        embedding = self.normalize(embedding)
+        embedding.setflags(write=False)
+        with self._lock:
+            self._items[key] = embedding
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+        return embedding
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
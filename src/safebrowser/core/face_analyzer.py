@@ -3,79 +3,416 @@ Face Analyzer - InsightFace wrapper
 Yuzni aniqlash va tanib olish
 Cross-platform qo'llab-quvvatlash
 """
+import time
+import cv2
 import numpy as np
-from typing import Optional, Tuple, List
-from insightface.app import FaceAnalysis
+from typing import Optional, Tuple, List, Sequence
+from insightface.app.common import Face
+from insightface.utils import face_align
+
+from safebrowser.core.model_registry import (
+    registry,
+    DEFAULT_PACK,
+    CPU_PROVIDERS,
+    providers_for_device,
+)
 
 
 class FaceAnalyzer:
     """
     InsightFace FaceAnalysis wrapper class
+
+    Modellar jarayon bo'yicha yagona registry'dan olinadi: bir xil
+    sozlamali bir nechta FaceAnalyzer bitta ONNX sessiyani bo'lishadi.
+    det_size har bir chaqiruvda detector'ga beriladi, shuning uchun
+    turli o'lchamli analyzer'lar ham bitta modeldan foydalanadi.
+    Aniqlik (FP32/INT8) berilmasa config'dan olinadi.
     """
 
-    def __init__(self, det_size: Tuple[int, int] = (640, 640), gpu_id: int = -1):
+    def __init__(
+        self,
+        det_size: Tuple[int, int] = (640, 640),
+        gpu_id: int = -1,
+        pack: str = DEFAULT_PACK,
+        precision: dict = None,
+        providers: Sequence[str] = None
+    ):
         self.det_size = det_size
         self.gpu_id = gpu_id
+        self.pack = pack
+        self.providers = tuple(providers) if providers else providers_for_device(gpu_id)
+        self.precision = precision or self._config_precision()
+        self.max_batch = 32
         self._app = None
+        self._handles = {}
         self._initialized = False
 
     def initialize(self) -> bool:
-        """Modelni ishga tushirish (cross-platform)"""
-        # Lazy import to avoid circular dependency
-        from safebrowser.utils.system import get_models_dir
-
-        # Cross-platform models directory
-        models_path = str(get_models_dir())
-        print(f"InsightFace models path: {models_path}")
-
+        """Modellarni registry orqali olish (cross-platform)"""
         try:
-            if self.gpu_id >= 0:
-                providers = ['CUDAExecutionProvider', 'CPUExecutionProvider']
-            else:
-                providers = ['CPUExecutionProvider']
-
-            self._app = FaceAnalysis(
-                providers=providers,
-                root=models_path,
-                allowed_modules=['detection', 'recognition']
-            )
-            self._app.prepare(ctx_id=self.gpu_id, det_size=self.det_size)
-
-            self._initialized = True
-            print(f"FaceAnalyzer initialized: det_size={self.det_size}, gpu_id={self.gpu_id}")
-            return True
-
+            self._acquire(self.providers)
         except Exception as e:
             print(f"FaceAnalyzer init error: {e}")
+            if self.providers == CPU_PROVIDERS:
+                return False
             # Fallback - CPU only
             try:
-                self._app = FaceAnalysis(
-                    providers=['CPUExecutionProvider'],
-                    root=models_path
-                )
-                self._app.prepare(ctx_id=-1, det_size=(320, 320))
-                self._initialized = True
-                return True
+                self._acquire(CPU_PROVIDERS)
+                self.providers = CPU_PROVIDERS
             except Exception as fallback_error:
                 print(f"Fallback init error: {fallback_error}")
                 return False
 
+        self.gpu_id = -1 if self.providers == CPU_PROVIDERS else max(self.gpu_id, 0)
+        self._initialized = True
+        print(f"FaceAnalyzer initialized: det_size={self.det_size}, providers={list(self.providers)}")
+        return True
+
+    @staticmethod
+    def _config_precision() -> dict:
+        from safebrowser.config import config
+        return {
+            "detection": config.detector_precision,
+            "recognition": config.recognizer_precision,
+        }
+
+    def _acquire(self, providers: Sequence[str]):
+        """Detection va recognition handle'larini olish"""
+        handles = {}
+        try:
+            for taskname in ("detection", "recognition"):
+                precision = self.precision.get(taskname, "fp32")
+                handles[taskname] = registry.acquire(taskname, self.pack, providers, precision)
+        except Exception:
+            for handle in handles.values():
+                handle.release()
+            raise
+        self._handles = handles
+
+    def share(self) -> 'FaceAnalyzer':
+        """
+        Xuddi shu modellarga yangi handle'lar bilan analyzer
+
+        Worker o'z nusxasini oladi va ishini tugatganda release()
+        qiladi - modellar oxirgi foydalanuvchi bilan o'chiriladi.
+        """
+        clone = FaceAnalyzer(
+            det_size=self.det_size,
+            gpu_id=self.gpu_id,
+            pack=self.pack,
+            precision=self.precision,
+            providers=self.providers
+        )
+        clone.max_batch = self.max_batch
+        clone._app = self._app
+        clone._initialized = self._initialized
+
+        for taskname, handle in self._handles.items():
+            if not handle.is_released:
+                clone._handles[taskname] = registry.share(handle)
+        return clone
+
+    def release(self):
+        """Registry handle'larini qaytarish"""
+        for handle in self._handles.values():
+            handle.release()
+        self._handles = {}
+        if self._app is None:
+            self._initialized = False
+
+    def warm_up(self) -> dict:
+        """
+        Bo'sh frame'da bir martalik inference
+
+        ONNX Runtime birinchi chaqiruvda kernel va xotirani tayyorlaydi.
+        Buni oldindan qilish birinchi haqiqiy tekshiruvni sekinlashtirmaydi.
+
+        Returns:
+            {"detection_ms": ..., "recognition_ms": ...}
+        """
+        timings = {}
+        if not self._initialized:
+            return timings
+
+        if self.det_model is not None:
+            started = time.perf_counter()
+            self.detect(np.zeros((self.det_size[1], self.det_size[0], 3), dtype=np.uint8))
+            timings["detection_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        rec = self.rec_model
+        if rec is not None:
+            size = rec.input_size[0]
+            started = time.perf_counter()
+            self._run_recognition([np.zeros((size, size, 3), dtype=np.uint8)])
+            timings["recognition_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        print(f"FaceAnalyzer warm-up: {timings}")
+        return timings
+
     @property
     def app(self):
-        """InsightFace app instance"""
+        """
+        FaceAnalysis bilan mos obyekt (get, det_model, models)
+
+        Registry orqali yuklanganda analyzer'ning o'zi qaytariladi.
+        """
+        if self._handles:
+            return self
         return self._app
 
+    @property
+    def models(self) -> dict:
+        """Vazifa bo'yicha modellar (FaceAnalysis.models kabi)"""
+        if self._handles:
+            return {task: handle.model for task, handle in self._handles.items()}
+        if self._app is None:
+            return {}
+        return self._app.models
+
     @property
     def is_initialized(self) -> bool:
         return self._initialized
 
+    @classmethod
+    def from_app(cls, app) -> Optional['FaceAnalyzer']:
+        """
+        Tayyor FaceAnalysis instance'ni o'rash
+
+        FaceAnalyzer berilsa uning modellariga yangi handle'lar bilan
+        nusxa (share) qaytariladi, None berilsa None.
+        """
+        if app is None:
+            return None
+        if isinstance(app, cls):
+            return app.share()
+
+        det_size = tuple(getattr(app, "det_size", None) or (640, 640))
+        analyzer = cls(det_size=det_size)
+        analyzer._app = app
+        analyzer._initialized = True
+        return analyzer
+
+    @property
+    def det_model(self):
+        """Detection modeli (SCRFD)"""
+        if "detection" in self._handles:
+            return self._handles["detection"].model
+        if self._app is None:
+            return None
+        return getattr(self._app, "det_model", None)
+
+    @property
+    def rec_model(self):
+        """Recognition modeli (ArcFace)"""
+        return self.models.get("recognition")
+
+    @staticmethod
+    def faces_from_detections(bboxes: np.ndarray, kpss: Optional[np.ndarray]) -> List[Face]:
+        """Detector natijasini Face obyektlariga aylantirish"""
+        return [
+            Face(
+                bbox=bboxes[i, 0:4],
+                kps=kpss[i] if kpss is not None else None,
+                det_score=bboxes[i, 4]
+            )
+            for i in range(bboxes.shape[0])
+        ]
+
+    def detect(
+        self,
+        image: np.ndarray,
+        input_size: Tuple[int, int] = None,
+        max_num: int = 0
+    ) -> List[Face]:
+        """
+        Faqat detection - bbox, kps va det_score (embedding hisoblanmaydi)
+
+        Live preview uchun arzon yo'l. Embedding kerak bo'lsa
+        get_face_embedding() alohida chaqiriladi.
+        """
+        det_model = self.det_model
+        if not self._initialized or det_model is None:
+            return []
+
+        try:
+            bboxes, kpss = det_model.detect(
+                image,
+                input_size=input_size or self.det_size,
+                max_num=max_num
+            )
+            return self.faces_from_detections(bboxes, kpss)
+        except Exception as e:
+            print(f"Face detection error: {e}")
+            return []
+
+    def get_face_embedding(self, image: np.ndarray, face: Face) -> Optional[np.ndarray]:
+        """
+        Aniqlangan yuz uchun embedding (talab bo'lganda)
+
+        Args:
+            image: detect() ga berilgan rasm
+            face: detect() natijasidagi yuz (kps kerak)
+        """
+        if face is None or face.kps is None:
+            return None
+
+        embedding = self.embed_aligned(image, face.kps)
+        if embedding is not None:
+            face.embedding = embedding
+        return embedding
+
+    def _align(self, image: np.ndarray, kps) -> np.ndarray:
+        """5 nuqta bo'yicha similarity-warp (112x112 ArcFace crop)"""
+        image_size = self.rec_model.input_size[0]
+        landmark = np.asarray(kps, dtype=np.float32).reshape(5, 2)
+        return face_align.norm_crop(image, landmark=landmark, image_size=image_size)
+
+    def _run_recognition(self, aligned: List[np.ndarray]) -> np.ndarray:
+        """
+        Recognition ONNX sessiyasini to'g'ridan-to'g'ri chaqirish
+
+        Yuzlar bitta NCHW tensorga yig'iladi va max_batch
+        bo'laklarda ishlatiladi.
+
+        Returns:
+            (N, 512) embeddinglar
+        """
+        rec = self.rec_model
+        blob = cv2.dnn.blobFromImages(
+            aligned,
+            1.0 / rec.input_std,
+            rec.input_size,
+            (rec.input_mean, rec.input_mean, rec.input_mean),
+            swapRB=True
+        )
+
+        # Batch o'lchami qat'iy bo'lgan modellar (masalan 1) uchun
+        step = rec.input_shape[0] if isinstance(rec.input_shape[0], int) else self.max_batch
+        if len(aligned) <= step:
+            return rec.session.run(rec.output_names, {rec.input_name: blob})[0]
+
+        return np.vstack([
+            rec.session.run(rec.output_names, {rec.input_name: blob[i:i + step]})[0]
+            for i in range(0, len(aligned), step)
+        ])
+
+    def embed_aligned(self, frame: np.ndarray, kps) -> Optional[np.ndarray]:
+        """
+        Keypointlar ma'lum bo'lganda embedding (detection ishlatilmaydi)
+
+        Args:
+            frame: To'liq frame (kps shu frame koordinatalarida)
+            kps: 5x2 keypointlar (detector natijasi)
+        """
+        if self.rec_model is None or frame is None or kps is None:
+            return None
+
+        try:
+            return self._run_recognition([self._align(frame, kps)])[0]
+        except Exception as e:
+            print(f"Face embedding error: {e}")
+            return None
+
+    def embed_aligned_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        kps_list: Sequence
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Bir nechta yuz uchun embedding - bitta ONNX chaqiruvi
+
+        Args:
+            frames: Frame'lar (bitta frame bir necha marta kelishi mumkin)
+            kps_list: Har bir yuz uchun 5x2 keypointlar
+
+        Returns:
+            Har bir yuz uchun embedding (xatolikda None)
+        """
+        if self.rec_model is None or not frames:
+            return [None] * len(frames)
+
+        try:
+            aligned = [self._align(f, k) for f, k in zip(frames, kps_list)]
+            return list(self._run_recognition(aligned))
+        except Exception as e:
+            print(f"Batch embedding error: {e}")
+            return [None] * len(frames)
+
+    def get_embeddings_batch(
+        self,
+        images: Sequence[np.ndarray],
+        kps_list: Sequence = None
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Bir nechta rasm uchun embedding - recognition bitta ONNX run'da
+
+        Args:
+            images: Rasmlar (masalan navbatdagi verification so'rovlari)
+            kps_list: Har bir rasm uchun 5x2 keypointlar. Berilmasa (yoki
+                elementi None bo'lsa) rasmdagi eng katta yuz aniqlanadi.
+
+        Returns:
+            Har bir rasm uchun embedding (yuz topilmasa None)
+        """
+        if not images:
+            return []
+        if kps_list is None:
+            kps_list = [None] * len(images)
+
+        # Keypointi yo'q rasmlarda faqat detection
+        resolved = []
+        for image, kps in zip(images, kps_list):
+            if kps is None and image is not None:
+                face = self._largest(self.detect(image))
+                kps = face.kps if face is not None else None
+            resolved.append(kps)
+
+        valid = [i for i, kps in enumerate(resolved) if kps is not None]
+        results = [None] * len(images)
+        if not valid:
+            return results
+
+        embeddings = self.embed_aligned_batch(
+            [images[i] for i in valid],
+            [resolved[i] for i in valid]
+        )
+        for i, embedding in zip(valid, embeddings):
+            results[i] = embedding
+        return results
+
+    def get_frame_embeddings(self, image: np.ndarray, max_num: int = 0) -> List[Face]:
+        """
+        Bitta frame'dagi barcha yuzlar - detection + bitta recognition run
+
+        Returns:
+            embedding o'rnatilgan Face'lar
+        """
+        faces = [f for f in self.detect(image, max_num=max_num) if f.kps is not None]
+        if not faces:
+            return []
+
+        embeddings = self.embed_aligned_batch([image] * len(faces), [f.kps for f in faces])
+        for face, embedding in zip(faces, embeddings):
+            face.embedding = embedding
+        return faces
+
+    @staticmethod
+    def _largest(faces: List[Face]) -> Optional[Face]:
+        if not faces:
+            return None
+        return max(faces, key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1]))
+
+    def get(self, image: np.ndarray, max_num: int = 0) -> List[Face]:
+        """FaceAnalysis.get() bilan mos: detection + embedding"""
+        return self.get_frame_embeddings(image, max_num=max_num)
+
     def detect_faces(self, image: np.ndarray) -> List:
         """Yuzlarni aniqlash"""
-        if not self._initialized or self._app is None:
+        if not self._initialized:
             return []
 
         try:
-            return self._app.get(image)
+            return self.get(image)
         except Exception as e:
             print(f"Face detection error: {e}")
             return []
@@ -144,20 +481,13 @@ class FaceAnalyzer:
     @staticmethod
     def detect_best_device() -> int:
         """
-        Eng yaxshi qurilmani aniqlash
+        Eng yaxshi qurilmani aniqlash (o'lchov asosida, keshlangan)
         Returns: 0+ = GPU, -1 = CPU
         """
         try:
-            import onnxruntime as ort
-            providers = ort.get_available_providers()
-
-            if 'CUDAExecutionProvider' in providers:
-                return 0
-            if 'DmlExecutionProvider' in providers:
-                return 0
-            if 'OpenVINOExecutionProvider' in providers:
-                return 0
+            from safebrowser.core.device_selector import select_execution
 
-            return -1
+            providers = select_execution()["providers"]
+            return -1 if tuple(providers) == CPU_PROVIDERS else 0
         except Exception:
             return -1
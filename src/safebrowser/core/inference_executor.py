@@ -0,0 +1,188 @@
+"""
+Inference Executor - barcha worker'lar uchun yagona inference navbati
+FaceDetectorWorker, FaceIdStaffWorker, Camera1Worker va
+CPUOptimizedFaceIdWorker modelni o'zlari chaqirmaydi - ish (job)
+navbatga qo'yiladi va Future orqali natija kutiladi.
+
+Ustuvorlik: live preview > davriy qayta tekshirish > offline ishlar.
+Bir vaqtda bitta (config bo'yicha) inference bajariladi, shuning uchun
+ONNX sessiyalari va CPU yadrolari uchun raqobat bo'lmaydi.
+"""
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable
+
+
+PRIORITY_PREVIEW = 0
+PRIORITY_VERIFY = 1
+PRIORITY_OFFLINE = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_PREVIEW: "preview",
+    PRIORITY_VERIFY: "verify",
+    PRIORITY_OFFLINE: "offline",
+}
+
+# Navbatni to'xtatish belgisi (har qanday job'dan oldin olinadi)
+_STOP = -1
+
+
+class _Job:
+    __slots__ = ("fn", "args", "kwargs", "future", "priority", "submitted")
+
+    def __init__(self, fn, args, kwargs, priority):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.priority = priority
+        self.submitted = time.monotonic()
+
+
+class InferenceExecutor:
+    """
+    Ustuvorlikli inference navbati
+
+    - submit(): job'ni navbatga qo'yadi va Future qaytaradi
+    - run(): submit() + natijani kutish (executor thread'idan chaqirilsa
+      to'g'ridan-to'g'ri bajariladi - ichma-ich job'lar osilib qolmaydi)
+    - stats(): navbat chuqurligi va kutish vaqti (ustuvorlik bo'yicha)
+    """
+
+    def __init__(self, workers: int = 1, window: int = 200):
+        self.workers = max(1, workers)
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._local = threading.local()
+
+        self._pending = {p: 0 for p in PRIORITY_NAMES}
+        self._waits = {p: deque(maxlen=window) for p in PRIORITY_NAMES}
+        self._runs = {p: deque(maxlen=window) for p in PRIORITY_NAMES}
+        self._active = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def is_running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self):
+        with self._lock:
+            if self._threads and all(t.is_alive() for t in self._threads):
+                return
+            self._threads = [
+                threading.Thread(target=self._loop, name=f"inference-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def shutdown(self, wait: bool = True):
+        """Navbatdagi job'larni bekor qilish va thread'larni to'xtatish"""
+        for _ in self._threads:
+            self._queue.put((_STOP, next(self._seq), None))
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+        self._threads = []
+
+        while True:
+            try:
+                _, _, job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                self._dequeued(job)
+                job.future.cancel()
+
+    def submit(self, fn: Callable, *args, priority: int = PRIORITY_VERIFY, **kwargs) -> Future:
+        """Job'ni navbatga qo'yish"""
+        if priority not in PRIORITY_NAMES:
+            raise ValueError(f"Noma'lum ustuvorlik: {priority}")
+
+        if not self.is_running:
+            self.start()
+
+        job = _Job(fn, args, kwargs, priority)
+        with self._lock:
+            self._pending[priority] += 1
+        self._queue.put((priority, next(self._seq), job))
+        return job.future
+
+    def run(self, fn: Callable, *args, priority: int = PRIORITY_VERIFY, timeout: float = None, **kwargs):
+        """Job'ni bajarib natijani qaytarish (xatolik chaqiruvchiga o'tadi)"""
+        if getattr(self._local, "inside", False):
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, priority=priority, **kwargs).result(timeout)
+
+    def _dequeued(self, job: _Job):
+        with self._lock:
+            self._pending[job.priority] -= 1
+
+    def _loop(self):
+        self._local.inside = True
+        while True:
+            priority, _, job = self._queue.get()
+            if priority == _STOP:
+                break
+
+            self._dequeued(job)
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            started = time.monotonic()
+            with self._lock:
+                self._active += 1
+                self._waits[priority].append(started - job.submitted)
+
+            try:
+                job.future.set_result(job.fn(*job.args, **job.kwargs))
+                ok = True
+            except BaseException as e:
+                job.future.set_exception(e)
+                ok = False
+
+            with self._lock:
+                self._active -= 1
+                self._runs[priority].append(time.monotonic() - started)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    @staticmethod
+    def _summary(values) -> dict:
+        if not values:
+            return {"avg_ms": 0.0, "max_ms": 0.0}
+        return {
+            "avg_ms": round(sum(values) / len(values) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1),
+        }
+
+    def stats(self) -> dict:
+        """Navbat chuqurligi, kutish va bajarilish vaqtlari"""
+        with self._lock:
+            return {
+                "depth": {PRIORITY_NAMES[p]: n for p, n in self._pending.items()},
+                "active": self._active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait": {PRIORITY_NAMES[p]: self._summary(v) for p, v in self._waits.items()},
+                "run": {PRIORITY_NAMES[p]: self._summary(v) for p, v in self._runs.items()},
+            }
+
+
+def _create_executor() -> InferenceExecutor:
+    from safebrowser.config import config
+    return InferenceExecutor(workers=config.inference_workers)
+
+
+# Jarayon bo'yicha yagona executor (birinchi job'da ishga tushadi)
+executor = _create_executor()
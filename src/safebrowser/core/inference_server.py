@@ -0,0 +1,475 @@
+"""
+Inference Server - InsightFace inference'ni alohida jarayonda bajarish
+GUI jarayonida insightface'ning numpy oldi/keyingi ishlovi GIL'ni
+ushlab turadi va UI qotadi. Server rejimida modellar subprocess'da
+ishlaydi, frame'lar esa multiprocessing.shared_memory slotlari orqali
+nusxalanmasdan uzatiladi.
+
+Protokol (Pipe orqali, bitta so'rov - bitta javob):
+    so'rov:  {"op": "detect" | "recognize" | "warm_up" | "ping" | "stop",
+              "slot": i, "shape": ..., "dtype": ...  (yoki "array": ndarray),
+              ...op argumentlari}
+    javob:   {"ok": True, "result": ...} yoki {"ok": False, "error": "..."}
+
+Server yiqilsa yoki javob bermasa, keyingi so'rovda avtomatik qayta
+ishga tushiriladi.
+"""
+import os
+import time
+import atexit
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from safebrowser.core.face_analyzer import FaceAnalyzer
+
+
+class InferenceServerError(RuntimeError):
+    """Server javob bermadi yoki so'rov bajarilmadi"""
+
+
+def _frame_view(slots: list, msg: dict) -> np.ndarray:
+    """So'rovdagi frame (shared memory ustida, nusxasiz)"""
+    if "array" in msg:
+        return msg["array"]
+    shm = slots[msg["slot"]]
+    return np.ndarray(msg["shape"], dtype=np.dtype(msg["dtype"]), buffer=shm.buf)
+
+
+def _handle(analyzer: FaceAnalyzer, slots: list, msg: dict):
+    op = msg["op"]
+    if op == "detect":
+        frame = _frame_view(slots, msg)
+        return analyzer.det_model.detect(frame, input_size=msg["input_size"], max_num=msg["max_num"])
+    if op == "recognize":
+        aligned = _frame_view(slots, msg)
+        return analyzer._run_recognition(list(aligned))
+    if op == "warm_up":
+        return analyzer.warm_up()
+    if op == "ping":
+        return os.getpid()
+    raise ValueError(f"Noma'lum so'rov: {op}")
+
+
+def _serve(conn, slot_names: list, options: dict):
+    """Server jarayoni (spawn - Qt va Windows bilan xavfsiz)"""
+    from safebrowser.core.onnx_session import set_thread_override
+
+    set_thread_override(options.get("intra_op_threads") or None)
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+
+    analyzer = FaceAnalyzer(
+        det_size=options["det_size"],
+        providers=options["providers"],
+        precision=options["precision"]
+    )
+    if not analyzer.initialize():
+        conn.send({"ok": False, "error": "Model yuklanmadi"})
+        return
+
+    conn.send({
+        "ok": True,
+        "pid": os.getpid(),
+        "rec_input_size": tuple(analyzer.rec_model.input_size),
+    })
+
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                # Asosiy jarayon yopildi
+                break
+
+            if msg.get("op") == "stop":
+                break
+
+            try:
+                conn.send({"ok": True, "result": _handle(analyzer, slots, msg)})
+            except Exception as e:
+                conn.send({"ok": False, "error": str(e)})
+    finally:
+        analyzer.release()
+        for shm in slots:
+            shm.close()
+
+
+class InferenceServer:
+    """
+    Inference subprocess'ining mijoz tomoni
+
+    - Shared memory slotlar mijozga tegishli (yaratadi va o'chiradi)
+    - Frame bo'sh slotga yoziladi (pipe lock'idan tashqarida), shuning
+      uchun keyingi so'rovning nusxalanishi joriy inference bilan ustma-ust
+    - Slotdan katta massivlar pipe orqali yuboriladi
+    """
+
+    def __init__(
+        self,
+        det_size: Tuple[int, int] = (640, 640),
+        providers: Sequence[str] = None,
+        precision: dict = None,
+        intra_op_threads: int = 0,
+        slots: int = 2,
+        slot_bytes: int = 8 * 1024 * 1024,
+        timeout: float = 10.0,
+        start_timeout: float = 120.0
+    ):
+        self.det_size = tuple(det_size)
+        self.providers = list(providers) if providers else ['CPUExecutionProvider']
+        self.precision = precision
+        self.intra_op_threads = intra_op_threads
+        self.slot_bytes = slot_bytes
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.rec_input_size = (112, 112)
+
+        self._ctx = mp.get_context("spawn")
+        self._lock = threading.Lock()
+        self._slots_cond = threading.Condition()
+        self._slot_count = slots
+        self._shm = []
+        self._free_slots = []
+        self._closing = False
+        self._process = None
+        self._conn = None
+        self._last_start = 0.0
+
+        self.requests = 0
+        self.failures = 0
+        self.restarts = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def is_started(self) -> bool:
+        """start() qilingan va stop() qilinmagan (yiqilgan jarayon call() da qayta tushadi)"""
+        return bool(self._shm)
+
+    def start(self) -> bool:
+        """Slotlarni yaratish va serverni ishga tushirish"""
+        with self._lock:
+            if not self._shm:
+                self._shm = [
+                    shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+                    for _ in range(self._slot_count)
+                ]
+                with self._slots_cond:
+                    self._free_slots = list(range(self._slot_count))
+                    self._closing = False
+                atexit.register(self.stop)
+            try:
+                self._spawn()
+                return True
+            except Exception as e:
+                print(f"Inference server start error: {e}")
+                return False
+
+    def _spawn(self):
+        """Jarayonni yaratish va handshake'ni kutish (lock ostida)"""
+        parent_conn, child_conn = self._ctx.Pipe()
+        options = {
+            "det_size": self.det_size,
+            "providers": self.providers,
+            "precision": self.precision,
+            "intra_op_threads": self.intra_op_threads,
+        }
+        process = self._ctx.Process(
+            target=_serve,
+            args=(child_conn, [shm.name for shm in self._shm], options),
+            name="safebrowser-inference",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._last_start = time.monotonic()
+
+        if not parent_conn.poll(self.start_timeout):
+            process.kill()
+            raise InferenceServerError("Server ishga tushmadi (timeout)")
+
+        hello = parent_conn.recv()
+        if not hello.get("ok"):
+            process.join(1)
+            raise InferenceServerError(hello.get("error", "Server xatoligi"))
+
+        self.rec_input_size = tuple(hello["rec_input_size"])
+        self._process = process
+        self._conn = parent_conn
+        print(f"Inference server started (pid={hello['pid']})")
+
+    def _shutdown_process(self):
+        """Joriy jarayonni to'xtatish (lock ostida)"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+        if self._process is not None:
+            self._process.join(0.5)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join(1)
+            self._process = None
+
+    def _restart(self):
+        """Yiqilgan yoki osilib qolgan serverni qayta ishga tushirish"""
+        self._shutdown_process()
+
+        # Ketma-ket yiqilishlarda CPU'ni band qilmaslik
+        wait = 1.0 - (time.monotonic() - self._last_start)
+        if wait > 0:
+            time.sleep(wait)
+
+        self.restarts += 1
+        print(f"Inference server restarting ({self.restarts})...")
+        self._spawn()
+
+    def stop(self):
+        """
+        Serverni to'xtatish va slotlarni o'chirish
+
+        Yangi so'rovlar rad etiladi, slot ishlatayotgan so'rovlar
+        tugashi kutiladi - shared memory ular ostidan o'chirilmaydi.
+        """
+        with self._slots_cond:
+            self._closing = True
+            deadline = time.monotonic() + self.timeout
+            while self._shm and len(self._free_slots) < len(self._shm):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._slots_cond.wait(remaining):
+                    print("Inference server stop: slotlar bo'shamadi")
+                    break
+
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.send({"op": "stop"})
+                except OSError:
+                    pass
+            self._shutdown_process()
+
+            for shm in self._shm:
+                shm.close()
+                try:
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+            self._shm = []
+            self._free_slots = []
+
+    def _acquire_slot(self) -> int:
+        with self._slots_cond:
+            if self._closing:
+                raise InferenceServerError("Server to'xtatilgan")
+            while not self._free_slots:
+                if not self._slots_cond.wait(self.timeout):
+                    raise InferenceServerError("Bo'sh slot yo'q (timeout)")
+                if self._closing:
+                    raise InferenceServerError("Server to'xtatilgan")
+            return self._free_slots.pop()
+
+    def _release_slot(self, index: int):
+        with self._slots_cond:
+            # stop() kutishdan o'tib ketgan bo'lsa - slot endi mavjud emas
+            if index < len(self._shm) and index not in self._free_slots:
+                self._free_slots.append(index)
+            self._slots_cond.notify_all()
+
+    def call(self, op: str, array: np.ndarray = None, **kwargs):
+        """
+        So'rov yuborish va javobni kutish
+
+        Raises:
+            InferenceServerError: server xatoligi, timeout yoki yiqilish
+        """
+        msg = {"op": op, **kwargs}
+        slot = None
+
+        if array is not None:
+            array = np.ascontiguousarray(array)
+            if array.nbytes <= self.slot_bytes and self._shm:
+                slot = self._acquire_slot()
+                np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm[slot].buf)[...] = array
+                msg.update(slot=slot, shape=array.shape, dtype=array.dtype.str)
+            else:
+                msg["array"] = array
+
+        try:
+            with self._lock:
+                if not self._shm:
+                    raise InferenceServerError("Server to'xtatilgan")
+                self.requests += 1
+                reply = self._roundtrip(msg)
+        finally:
+            if slot is not None:
+                self._release_slot(slot)
+
+        if not reply.get("ok"):
+            self.failures += 1
+            raise InferenceServerError(reply.get("error", "Server xatoligi"))
+        return reply["result"]
+
+    def _roundtrip(self, msg: dict) -> dict:
+        """Pipe orqali so'rov-javob (lock ostida)"""
+        if not self.is_running:
+            self._restart()
+
+        try:
+            self._conn.send(msg)
+            if not self._conn.poll(self.timeout):
+                raise InferenceServerError("Server javob bermadi (timeout)")
+            return self._conn.recv()
+        except (EOFError, OSError, InferenceServerError) as e:
+            self.failures += 1
+            error = str(e) or "Server yiqildi"
+            print(f"Inference server error: {error}")
+            try:
+                self._restart()
+            except Exception as restart_error:
+                print(f"Inference server restart error: {restart_error}")
+            raise InferenceServerError(error)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.is_running,
+            "requests": self.requests,
+            "failures": self.failures,
+            "restarts": self.restarts,
+        }
+
+
+class _RemoteDetector:
+    """Server'dagi SCRFD uchun det_model o'rnini bosuvchi (RoiDetector ham ishlatadi)"""
+    taskname = "detection"
+
+    def __init__(self, server: InferenceServer):
+        self._server = server
+        self.input_size = server.det_size
+
+    def detect(self, img, input_size=None, max_num=0, metric='default'):
+        return self._server.call(
+            "detect",
+            img,
+            input_size=tuple(input_size or self.input_size),
+            max_num=max_num
+        )
+
+
+class _RemoteRecognizer:
+    """Server'dagi ArcFace - faqat alignment uchun input_size"""
+    taskname = "recognition"
+
+    def __init__(self, server: InferenceServer):
+        self._server = server
+
+    @property
+    def input_size(self) -> Tuple[int, int]:
+        return self._server.rec_input_size
+
+
+class RemoteFaceAnalyzer(FaceAnalyzer):
+    """
+    FaceAnalyzer - modellar inference server'da
+
+    Detection va recognition (ONNX run) server'da bajariladi;
+    alignment va yuqori darajadagi metodlar FaceAnalyzer'dan meros.
+    Worker'lar uni oddiy FaceAnalyzer kabi oladi (from_app -> share).
+    """
+
+    def __init__(self, server: InferenceServer, det_size: Tuple[int, int] = None):
+        super().__init__(
+            det_size=det_size or server.det_size,
+            providers=server.providers,
+            precision=server.precision
+        )
+        self.server = server
+        self._detector = _RemoteDetector(server)
+        self._recognizer = _RemoteRecognizer(server)
+
+    @property
+    def _initialized(self) -> bool:
+        # Har safar server'dan: yiqilgan jarayon keyingi call() da qayta
+        # ishga tushadi, share() nusxalari eski holatni saqlab qolmaydi
+        return getattr(self, "server", None) is not None and self.server.is_started
+
+    @_initialized.setter
+    def _initialized(self, value: bool):
+        # FaceAnalyzer.__init__/release() yozadi - holat server'da
+        pass
+
+    def initialize(self) -> bool:
+        return self.server.is_started or self.server.start()
+
+    @property
+    def det_model(self):
+        return self._detector if self._initialized else None
+
+    @property
+    def rec_model(self):
+        return self._recognizer if self._initialized else None
+
+    @property
+    def models(self) -> dict:
+        if not self._initialized:
+            return {}
+        return {"detection": self._detector, "recognition": self._recognizer}
+
+    @property
+    def app(self):
+        return self if self._initialized else None
+
+    def _run_recognition(self, aligned) -> np.ndarray:
+        return self.server.call("recognize", np.stack(aligned))
+
+    def warm_up(self) -> dict:
+        if not self._initialized:
+            return {}
+        timings = self.server.call("warm_up")
+        print(f"Inference server warm-up: {timings}")
+        return timings
+
+    def share(self) -> 'RemoteFaceAnalyzer':
+        clone = RemoteFaceAnalyzer(self.server, self.det_size)
+        clone.max_batch = self.max_batch
+        return clone
+
+    def release(self):
+        # Server umumiy - uni egasi (start qilgan joy) to'xtatadi
+        pass
+
+
+def create_remote_analyzer(
+    det_size: Tuple[int, int] = (640, 640),
+    providers: Sequence[str] = None,
+    precision: dict = None
+) -> Optional[RemoteFaceAnalyzer]:
+    """
+    Config bo'yicha server yaratib, unga ulangan analyzer qaytarish
+
+    Returns:
+        RemoteFaceAnalyzer yoki server ishga tushmasa None
+    """
+    from safebrowser.config import config
+    from safebrowser.core.onnx_session import intra_op_threads
+
+    server = InferenceServer(
+        det_size=det_size,
+        providers=providers,
+        precision=precision,
+        intra_op_threads=intra_op_threads(),
+        slots=config.inference_slots,
+        slot_bytes=config.inference_slot_mb * 1024 * 1024,
+        timeout=config.inference_timeout
+    )
+    if not server.start():
+        server.stop()
+        return None
+    return RemoteFaceAnalyzer(server, det_size)
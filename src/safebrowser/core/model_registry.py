@@ -0,0 +1,245 @@
+"""
+Model Registry - jarayon bo'yicha yagona ONNX modellar ombori
+Har bir model (pack, vazifa, provider'lar, aniqlik) kaliti bo'yicha faqat bir
+marta yuklanadi va barcha FaceAnalyzer'lar o'rtasida bo'lishiladi.
+Oxirgi handle qo'yib yuborilganda model xotiradan o'chiriladi.
+"""
+import glob
+import os.path as osp
+import threading
+from typing import Sequence, Tuple
+
+
+DEFAULT_PACK = "buffalo_l"
+
+# Fayl nomi bo'yicha vazifa taxmini - keraksiz sessiyalarni yaratmaslik uchun
+TASK_FILE_HINTS = {
+    "detection": ("det_", "scrfd", "retinaface"),
+    "recognition": ("w600k", "glint", "arcface", "r50", "r100"),
+}
+
+CPU_PROVIDERS = ('CPUExecutionProvider',)
+
+PRECISIONS = ("fp32", "int8")
+
+
+class ModelHandle:
+    """
+    Registry'dagi modelga havola
+
+    release() chaqirilgandan keyin handle ishlatilmaydi. Bir necha
+    marta release() chaqirish xavfsiz.
+    """
+
+    def __init__(self, registry: 'ModelRegistry', key: tuple, model):
+        self._registry = registry
+        self.key = key
+        self.model = model
+
+    @property
+    def is_released(self) -> bool:
+        return self.model is None
+
+    def release(self):
+        if self.model is None:
+            return
+        self.model = None
+        self._registry._release(self.key)
+
+    def __del__(self):
+        # Ishga tushmagan worker'lar handle'ni GC orqali qaytaradi
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+class ModelRegistry:
+    """
+    Yuklangan ONNX modellarni reference-count bilan saqlash
+
+    - acquire(): modelni yuklaydi (yoki mavjudini qaytaradi), refcount += 1
+    - ModelHandle.release(): refcount -= 1, nolga tushsa model o'chiriladi
+    """
+
+    def __init__(self, root: str = None, intra_op_threads: int = None):
+        self._root = root
+        # Berilsa - bu registry sessiyalari uchun thread soni (o'lchovlar uchun)
+        self.intra_op_threads = intra_op_threads
+        self._lock = threading.RLock()
+        self._models = {}
+        self._refs = {}
+        self._task_files = {}
+
+        self.loads = 0
+        self.hits = 0
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            # Lazy import to avoid circular dependency
+            from safebrowser.utils.system import get_models_dir
+            self._root = str(get_models_dir())
+        return self._root
+
+    @staticmethod
+    def make_key(
+        taskname: str,
+        pack: str,
+        providers: Sequence[str],
+        precision: str = "fp32"
+    ) -> tuple:
+        if precision not in PRECISIONS:
+            raise ValueError(f"Noma'lum aniqlik: {precision}")
+        return pack, taskname, tuple(providers or CPU_PROVIDERS), precision
+
+    def acquire(
+        self,
+        taskname: str,
+        pack: str = DEFAULT_PACK,
+        providers: Sequence[str] = None,
+        precision: str = "fp32"
+    ) -> ModelHandle:
+        """
+        Model handle'ini olish
+
+        Args:
+            taskname: "detection" yoki "recognition"
+            pack: InsightFace model pack nomi
+            providers: ONNX Runtime provider'lari (tartib muhim)
+            precision: "fp32" yoki "int8" (scripts/quantize_models.py natijasi)
+
+        Raises:
+            RuntimeError: pack'da bunday vazifali model bo'lmasa
+        """
+        return self._acquire_key(self.make_key(taskname, pack, providers, precision))
+
+    def share(self, handle: ModelHandle) -> ModelHandle:
+        """Mavjud handle bilan bir xil modelga yangi handle"""
+        return self._acquire_key(handle.key)
+
+    def _acquire_key(self, key: tuple) -> ModelHandle:
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._load(key)
+                self._models[key] = model
+                self._refs[key] = 0
+                self.loads += 1
+            else:
+                self.hits += 1
+            self._refs[key] += 1
+            return ModelHandle(self, key, model)
+
+    def _release(self, key: tuple):
+        with self._lock:
+            if key not in self._refs:
+                return
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                del self._refs[key]
+                model = self._models.pop(key, None)
+                print(f"Model freed: {self._describe(key)}")
+                del model
+
+    @staticmethod
+    def _describe(key: tuple) -> str:
+        pack, taskname, providers, precision = key
+        return f"{pack}/{taskname} {precision} {list(providers)}"
+
+    def _pack_dir(self, pack: str) -> str:
+        from insightface.utils import ensure_available
+        return ensure_available('models', pack, root=self.root)
+
+    def _candidate_files(self, pack: str, taskname: str) -> list:
+        """Vazifaga mos bo'lishi mumkin bo'lgan .onnx fayllar (taxminiylari oldin)"""
+        known = self._task_files.get((pack, taskname))
+        if known is not None:
+            return [known]
+
+        files = sorted(glob.glob(osp.join(self._pack_dir(pack), "*.onnx")))
+        hints = TASK_FILE_HINTS.get(taskname, ())
+        hinted = [f for f in files if osp.basename(f).lower().startswith(hints)]
+        return hinted + [f for f in files if f not in hinted]
+
+    @staticmethod
+    def _build_model(onnx_file: str, session):
+        """
+        Sessiya ustida InsightFace model obyekti (model_zoo.ModelRouter kabi)
+
+        model_file doim asl fayl - ArcFace normalizatsiya parametrlarini
+        asl grafdan aniqlaydi, sessiya esa optimallashtirilgan keshdan bo'lishi mumkin.
+        """
+        from insightface.model_zoo import SCRFD, ArcFaceONNX
+
+        input_shape = session.get_inputs()[0].shape
+        if len(session.get_outputs()) >= 5:
+            return SCRFD(model_file=onnx_file, session=session)
+        if (
+            isinstance(input_shape[2], int)
+            and input_shape[2] == input_shape[3]
+            and input_shape[2] >= 112
+            and input_shape[2] % 16 == 0
+        ):
+            return ArcFaceONNX(model_file=onnx_file, session=session)
+        return None
+
+    @staticmethod
+    def _session_file(onnx_file: str, precision: str) -> str:
+        """Sessiya uchun fayl - INT8 nusxa mavjud bo'lsa o'sha"""
+        from safebrowser.core.onnx_session import quantized_model_path
+
+        if precision == "fp32":
+            return onnx_file
+
+        quantized = quantized_model_path(onnx_file, precision)
+        if quantized.exists():
+            return str(quantized)
+
+        print(f"{quantized.name} topilmadi - FP32 ishlatiladi "
+              f"(scripts/quantize_models.py bilan yarating)")
+        return onnx_file
+
+    def _load(self, key: tuple):
+        """ONNX modelni yuklash va tayyorlash"""
+        from safebrowser.core.onnx_session import create_session
+
+        pack, taskname, providers, precision = key
+        ctx_id = -1 if providers == CPU_PROVIDERS else 0
+
+        for onnx_file in self._candidate_files(pack, taskname):
+            session_file = self._session_file(onnx_file, precision)
+            model = self._build_model(onnx_file, create_session(session_file, providers, self.intra_op_threads))
+            if model is None or model.taskname != taskname:
+                continue
+
+            if taskname == "detection":
+                model.prepare(ctx_id, input_size=(640, 640), det_thresh=0.5)
+            else:
+                model.prepare(ctx_id)
+
+            self._task_files[(pack, taskname)] = onnx_file
+            print(f"Model loaded: {pack}/{osp.basename(session_file)} ({self._describe(key)})")
+            return model
+
+        raise RuntimeError(f"{pack} pack'ida '{taskname}' modeli topilmadi")
+
+    def stats(self) -> dict:
+        """Yuklangan modellar va ularning refcount'i"""
+        with self._lock:
+            return {
+                "models": {self._describe(k): n for k, n in self._refs.items()},
+                "loads": self.loads,
+                "hits": self.hits,
+            }
+
+
+# Jarayon bo'yicha yagona registry
+registry = ModelRegistry()
+
+
+def providers_for_device(gpu_id: int) -> Tuple[str, ...]:
+    """gpu_id bo'yicha provider'lar ro'yxati (-1 = faqat CPU)"""
+    if gpu_id >= 0:
+        return ('CUDAExecutionProvider', 'CPUExecutionProvider')
+    return CPU_PROVIDERS
@@ -0,0 +1,187 @@
+"""
+ONNX Session - ONNX Runtime sessiya sozlamalari va optimallashtirilgan graf keshi
+Thread soni, bajarilish rejimi va graf optimizatsiya darajasi config'dan
+olinadi. Optimallashtirilgan model get_models_dir() ostida saqlanadi va
+keyingi ishga tushirishlarda qayta optimizatsiya qilinmaydi.
+"""
+from pathlib import Path
+from typing import Optional, Sequence
+
+import psutil
+
+
+# Provider tanlovi (device_selector) aniqlagan thread soni
+_thread_override = None
+
+
+def set_thread_override(threads: int = None):
+    """Config'da avtomatik (0) bo'lganda ishlatiladigan thread soni"""
+    global _thread_override
+    _thread_override = threads
+
+
+def _optimization_level(ort, name: str):
+    return {
+        "disabled": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }.get(name, ort.GraphOptimizationLevel.ORT_ENABLE_ALL)
+
+
+def _reserved_cores() -> int:
+    """Qt va kamera thread'lari uchun qoldiriladigan fizik yadrolar"""
+    from safebrowser.config import config
+
+    physical = psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
+    return min(config.onnx_reserved_cores, physical // 2)
+
+
+def intra_op_threads() -> int:
+    """
+    Inference uchun thread soni
+
+    Config'da 0 bo'lsa - provider tanlovi natijasi, u ham bo'lmasa
+    fizik yadrolar soni minus Qt va kamera thread'lari uchun
+    qoldirilgan yadrolar (kamida 1).
+    """
+    from safebrowser.config import config
+
+    if config.onnx_intra_op_threads > 0:
+        return config.onnx_intra_op_threads
+    if _thread_override:
+        return _thread_override
+
+    physical = psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
+    return max(1, physical - _reserved_cores())
+
+
+def _thread_affinities(threads: int, reserved: int) -> Optional[str]:
+    """
+    intra_op thread'larini qoldirilgan yadrolardan keyingi
+    mantiqiy protsessorlarga biriktirish ("3;4;5" - 1 dan boshlanadi).
+    Asosiy (chaqiruvchi) thread biriktirilmaydi.
+
+    reserved - fizik yadrolar: SMT'da har bir yadroning barcha mantiqiy
+    protsessorlari o'tkazib yuboriladi. threads - 1 ta protsessor
+    sig'masa - None (biriktirilmaydi).
+    """
+    logical = psutil.cpu_count() or 1
+    physical = psutil.cpu_count(logical=False) or logical
+    first = reserved * max(1, logical // physical) + 1
+    if first + threads - 2 > logical:
+        return None
+    return ";".join(str(first + i) for i in range(threads - 1))
+
+
+def session_options(threads: int = None):
+    """
+    Config bo'yicha onnxruntime.SessionOptions
+
+    Args:
+        threads: intra_op thread soni (berilmasa - intra_op_threads())
+    """
+    import onnxruntime as ort
+    from safebrowser.config import config
+
+    options = ort.SessionOptions()
+    threads = threads or intra_op_threads()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = max(1, config.onnx_inter_op_threads)
+
+    if config.onnx_execution_mode == "parallel":
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+    else:
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+    options.graph_optimization_level = _optimization_level(ort, config.onnx_graph_optimization)
+
+    # Bo'sh turgan thread'lar CPU'ni aylantirib Qt/kamera bilan raqobatlashmasin
+    options.add_session_config_entry(
+        "session.intra_op.allow_spinning",
+        "1" if config.onnx_allow_spinning else "0"
+    )
+    if config.onnx_pin_threads and threads > 1:
+        affinities = _thread_affinities(threads, _reserved_cores())
+        if affinities:
+            options.add_session_config_entry("session.intra_op_thread_affinities", affinities)
+
+    return options
+
+
+def optimized_model_path(onnx_file: str, providers: Sequence[str]) -> Path:
+    """
+    Optimallashtirilgan model yo'li
+
+    Kalit: model nomi, asosiy provider, optimizatsiya darajasi, ONNX
+    Runtime versiyasi va protsessor - "all" darajasidagi graf apparatga
+    bog'liq bo'lishi mumkin, shuning uchun boshqa kompyuterda qayta yaratiladi.
+    """
+    import onnxruntime as ort
+    from safebrowser.config import config
+    from safebrowser.utils.system import get_models_dir, get_hardware_fingerprint
+
+    provider = (providers[0] if providers else "CPUExecutionProvider")
+    provider = provider.replace("ExecutionProvider", "").lower()
+    machine_tag = get_hardware_fingerprint()[:8]
+    name = (
+        f"{Path(onnx_file).stem}-{provider}-{config.onnx_graph_optimization}-"
+        f"ort{ort.__version__}-{machine_tag}.onnx"
+    )
+    return get_models_dir() / "optimized" / name
+
+
+def quantized_model_path(onnx_file: str, precision: str = "int8") -> Path:
+    """
+    Kvantlangan nusxa yo'li (pack papkasidagi int8/ ostida)
+
+    Alohida papkada - pack'dagi *.onnx qidiruvi nusxalarni ko'rmaydi.
+    """
+    source = Path(onnx_file)
+    return source.parent / precision / f"{source.stem}.{precision}.onnx"
+
+
+def _cache_valid(cache: Path, source: Path) -> bool:
+    return cache.exists() and cache.stat().st_mtime >= source.stat().st_mtime
+
+
+def create_session(onnx_file: str, providers: Sequence[str], threads: int = None):
+    """
+    InferenceSession yaratish (optimallashtirilgan kesh bilan)
+
+    threads berilsa - sessiya shu thread soni bilan (global sozlamaga tegmasdan).
+
+    - Kesh bor bo'lsa: tayyor graf yuklanadi, online optimizatsiya o'chiriladi
+    - Kesh yo'q bo'lsa: sessiya yaratilayotganda graf keshga yoziladi
+    - Kesh buzilgan yoki saqlab bo'lmasa: oddiy sessiya
+    """
+    import onnxruntime as ort
+    from safebrowser.config import config
+
+    providers = list(providers)
+    if not config.onnx_optimized_cache or config.onnx_graph_optimization == "disabled":
+        return ort.InferenceSession(onnx_file, session_options(threads), providers=providers)
+
+    source = Path(onnx_file)
+    cache = optimized_model_path(onnx_file, providers)
+
+    if _cache_valid(cache, source):
+        options = session_options(threads)
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        try:
+            return ort.InferenceSession(str(cache), options, providers=providers)
+        except Exception as e:
+            print(f"Optimized model cache error ({cache.name}): {e}")
+            cache.unlink(missing_ok=True)
+
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        options = session_options(threads)
+        options.optimized_model_filepath = str(cache)
+        session = ort.InferenceSession(onnx_file, options, providers=providers)
+        print(f"Optimized model saved: {cache.name}")
+        return session
+    except Exception as e:
+        print(f"Optimized model save error: {e}")
+        cache.unlink(missing_ok=True)
+        return ort.InferenceSession(onnx_file, session_options(threads), providers=providers)
@@ -0,0 +1,169 @@
+"""
+Face Quality Gate - embedding'dan oldin arzon sifat tekshiruvi
+Xira, kichik, burilgan yoki ishonchsiz yuzlar ArcFace'ga yuborilmaydi:
+ular past o'xshashlik va keraksiz qayta tekshiruvga olib keladi.
+
+Mezonlar:
+- det_score (detector ishonchi)
+- yuz o'lchami (bbox'ning qisqa tomoni, piksel)
+- keskinlik: 112x112 ga keltirilgan kulrang yuzda Laplacian dispersiyasi
+- yaw/pitch: 5 ta keypoint bo'yicha taxminiy burilish (gradus)
+"""
+import math
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+# Burun uchining chuqurligi (ko'zlar orasidagi masofaga nisbatan)
+_NOSE_DEPTH = 0.4
+
+# ArcFace shablonida burun ko'z va og'iz chiziqlari o'rtasida (~0.5)
+_NOSE_VERTICAL_RATIO = 0.5
+
+REJECT_REASONS = ("score", "size", "blur", "yaw", "pitch")
+
+
+def estimate_pose(kps) -> Tuple[float, float, float]:
+    """
+    5 ta keypoint (ko'zlar, burun, og'iz burchaklari) bo'yicha
+    taxminiy (yaw, pitch, roll) gradusda
+
+    Yaw - burunning ko'zlar o'rtasidan gorizontal siljishi,
+    pitch - burunning ko'z va og'iz chiziqlari orasidagi vertikal holati.
+    """
+    kps = np.asarray(kps, dtype=np.float32).reshape(5, 2)
+    left_eye, right_eye, nose, left_mouth, right_mouth = kps
+
+    eye_vec = right_eye - left_eye
+    eye_dist = float(np.linalg.norm(eye_vec))
+    if eye_dist < 1e-3:
+        return 90.0, 90.0, 0.0
+
+    roll = math.degrees(math.atan2(eye_vec[1], eye_vec[0]))
+
+    # Roll'ni olib tashlash - ko'zlar chizig'iga nisbatan koordinatalar
+    axis_x = eye_vec / eye_dist
+    axis_y = np.array([-axis_x[1], axis_x[0]], dtype=np.float32)
+    eye_mid = (left_eye + right_eye) / 2
+    mouth_mid = (left_mouth + right_mouth) / 2
+
+    nose_x = float(np.dot(nose - eye_mid, axis_x))
+    nose_y = float(np.dot(nose - eye_mid, axis_y))
+    mouth_y = float(np.dot(mouth_mid - eye_mid, axis_y))
+
+    yaw = math.degrees(math.atan(nose_x / (_NOSE_DEPTH * eye_dist)))
+    if abs(mouth_y) < 1e-3:
+        return yaw, 90.0, roll
+
+    pitch = math.degrees(math.atan((nose_y / mouth_y - _NOSE_VERTICAL_RATIO) / _NOSE_DEPTH))
+    return yaw, pitch, roll
+
+
+def sharpness(image: np.ndarray, bbox, size: int = 112) -> float:
+    """Yuz hududining Laplacian dispersiyasi (o'lchamdan mustaqil bo'lishi uchun size x size)"""
+    h, w = image.shape[:2]
+    x1, y1 = max(0, int(bbox[0])), max(0, int(bbox[1]))
+    x2, y2 = min(w, int(bbox[2])), min(h, int(bbox[3]))
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return 0.0
+
+    crop = image[y1:y2, x1:x2]
+    if crop.ndim == 3:
+        crop = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+    crop = cv2.resize(crop, (size, size), interpolation=cv2.INTER_AREA)
+    return float(cv2.Laplacian(crop, cv2.CV_64F).var())
+
+
+class FaceQualityGate:
+    """
+    Embedding'dan oldingi sifat filtri
+
+    check() birinchi buzilgan mezonni (sabab) qaytaradi va
+    sabablar bo'yicha rad etishlarni sanaydi.
+    """
+
+    def __init__(
+        self,
+        min_det_score: float = 0.6,
+        min_face_size: int = 60,
+        min_sharpness: float = 40.0,
+        max_yaw: float = 35.0,
+        max_pitch: float = 30.0
+    ):
+        self.min_det_score = min_det_score
+        self.min_face_size = min_face_size
+        self.min_sharpness = min_sharpness
+        self.max_yaw = max_yaw
+        self.max_pitch = max_pitch
+
+        self.passed = 0
+        self.rejected = {reason: 0 for reason in REJECT_REASONS}
+
+    @classmethod
+    def from_config(cls) -> Optional['FaceQualityGate']:
+        """config.ini [quality] bo'yicha (o'chirilgan bo'lsa None)"""
+        from safebrowser.config import config
+
+        if not config.quality_enabled:
+            return None
+        return cls(
+            min_det_score=config.quality_min_det_score,
+            min_face_size=config.quality_min_face_size,
+            min_sharpness=config.quality_min_sharpness,
+            max_yaw=config.quality_max_yaw,
+            max_pitch=config.quality_max_pitch
+        )
+
+    def assess(self, image: np.ndarray, face) -> dict:
+        """Sifat ko'rsatkichlari (arzonlaridan boshlab, rad etilganda to'xtaydi)"""
+        bbox = face.bbox
+        metrics = {
+            "det_score": float(getattr(face, "det_score", 1.0) or 0.0),
+            "size": float(min(bbox[2] - bbox[0], bbox[3] - bbox[1])),
+        }
+        if metrics["det_score"] < self.min_det_score or metrics["size"] < self.min_face_size:
+            return metrics
+
+        if face.kps is not None:
+            yaw, pitch, roll = estimate_pose(face.kps)
+            metrics.update(yaw=round(yaw, 1), pitch=round(pitch, 1), roll=round(roll, 1))
+            if abs(yaw) > self.max_yaw or abs(pitch) > self.max_pitch:
+                return metrics
+
+        metrics["sharpness"] = round(sharpness(image, bbox), 1)
+        return metrics
+
+    def reason(self, metrics: dict) -> Optional[str]:
+        """Birinchi buzilgan mezon yoki None"""
+        if metrics["det_score"] < self.min_det_score:
+            return "score"
+        if metrics["size"] < self.min_face_size:
+            return "size"
+        if abs(metrics.get("yaw", 0.0)) > self.max_yaw:
+            return "yaw"
+        if abs(metrics.get("pitch", 0.0)) > self.max_pitch:
+            return "pitch"
+        if metrics.get("sharpness", 0.0) < self.min_sharpness:
+            return "blur"
+        return None
+
+    def check(self, image: np.ndarray, face) -> Tuple[bool, Optional[str], dict]:
+        """
+        Yuz embedding uchun yaroqlimi
+
+        Returns:
+            (o'tdi, rad etish sababi yoki None, ko'rsatkichlar)
+        """
+        metrics = self.assess(image, face)
+        reason = self.reason(metrics)
+        if reason is None:
+            self.passed += 1
+            return True, None, metrics
+
+        self.rejected[reason] += 1
+        return False, reason, metrics
+
+    def stats(self) -> dict:
+        return {"passed": self.passed, "rejected": dict(self.rejected)}
@@ -0,0 +1,134 @@
+"""
+ROI Detector - oldingi yuz atrofida cheklangan qayta aniqlash
+Nomzod odatda bir joyda o'tiradi, shuning uchun detector butun
+640x480 frame o'rniga yuz atrofidagi kichik hududda ishlaydi.
+Topilmasa yoki davriy vaqt kelsa - butun frame tekshiriladi.
+"""
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class RoiDetector:
+    """
+    Detection modelini ROI (region of interest) rejimida ishlatish
+
+    - Oldingi ramka atrofida padding bilan kvadrat hudud kesiladi
+    - Hudud kichik detector o'lchamida (masalan 160x160) tekshiriladi
+    - Yuz topilmasa yoki full_scan_interval o'tgan bo'lsa - to'liq frame
+    - Tejalgan detector ishi ulushini hisoblaydi (kirish maydoni bo'yicha)
+    """
+
+    def __init__(
+        self,
+        roi_size: Tuple[int, int] = (160, 160),
+        padding: float = 0.6,
+        full_scan_interval: float = 2.0,
+        min_roi: int = 96
+    ):
+        self.roi_size = tuple(roi_size)
+        self.padding = padding
+        self.full_scan_interval = full_scan_interval
+        self.min_roi = min_roi
+
+        self._last_full_scan = 0.0
+
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_scans = 0
+        self._work_spent = 0.0
+        self._work_full = 0.0
+
+    def _region(self, prior_bbox, frame_shape) -> Optional[Tuple[int, int, int, int]]:
+        """Oldingi ramka atrofidagi kvadrat hudud"""
+        h, w = frame_shape[:2]
+        x1, y1, x2, y2 = prior_bbox[:4]
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        side = max(x2 - x1, y2 - y1) * (1 + 2 * self.padding)
+        side = max(side, self.min_roi)
+
+        rx1 = int(max(0, cx - side / 2))
+        ry1 = int(max(0, cy - side / 2))
+        rx2 = int(min(w, cx + side / 2))
+        ry2 = int(min(h, cy + side / 2))
+
+        if rx2 - rx1 < self.min_roi // 2 or ry2 - ry1 < self.min_roi // 2:
+            return None
+        # Hudud frame'ning katta qismini egallasa - ROI foydasiz
+        if (rx2 - rx1) * (ry2 - ry1) >= 0.6 * w * h:
+            return None
+        return rx1, ry1, rx2, ry2
+
+    def _full_scan(self, det_model, rgb_frame: np.ndarray, full_size, now: float):
+        self.full_scans += 1
+        self._last_full_scan = now
+        self._work_spent += full_size[0] * full_size[1]
+        return det_model.detect(rgb_frame, input_size=full_size)
+
+    def detect(
+        self,
+        det_model,
+        rgb_frame: np.ndarray,
+        prior_bbox=None,
+        full_size: Tuple[int, int] = None,
+        now: float = None
+    ):
+        """
+        Yuzlarni aniqlash (ROI yoki to'liq frame)
+
+        Args:
+            det_model: InsightFace detection modeli (SCRFD/RetinaFace)
+            rgb_frame: To'liq frame
+            prior_bbox: Oldingi ma'lum ramka (x1, y1, x2, y2)
+            full_size: To'liq skan uchun detector o'lchami
+
+        Returns:
+            (bboxes, kpss) - to'liq frame koordinatalarida
+        """
+        now = time.monotonic() if now is None else now
+        if full_size is None:
+            full_size = tuple(getattr(det_model, "input_size", None) or (640, 640))
+        self._work_full += full_size[0] * full_size[1]
+
+        region = None
+        if prior_bbox is not None and now - self._last_full_scan < self.full_scan_interval:
+            region = self._region(prior_bbox, rgb_frame.shape)
+
+        if region is None:
+            return self._full_scan(det_model, rgb_frame, full_size, now)
+
+        rx1, ry1, rx2, ry2 = region
+        crop = np.ascontiguousarray(rgb_frame[ry1:ry2, rx1:rx2])
+        self._work_spent += self.roi_size[0] * self.roi_size[1]
+        bboxes, kpss = det_model.detect(crop, input_size=self.roi_size)
+
+        if bboxes.shape[0] == 0:
+            # ROI'da yuz yo'q - to'liq frame'ga qaytish
+            self.roi_misses += 1
+            return self._full_scan(det_model, rgb_frame, full_size, now)
+
+        self.roi_hits += 1
+        bboxes = bboxes.copy()
+        bboxes[:, [0, 2]] += rx1
+        bboxes[:, [1, 3]] += ry1
+        if kpss is not None:
+            kpss = kpss.copy()
+            kpss[:, :, 0] += rx1
+            kpss[:, :, 1] += ry1
+        return bboxes, kpss
+
+    @property
+    def saved_fraction(self) -> float:
+        """Tejalgan detector ishi ulushi (0..1)"""
+        if self._work_full <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self._work_spent / self._work_full)
+
+    def stats(self) -> dict:
+        return {
+            "roi_hits": self.roi_hits,
+            "roi_misses": self.roi_misses,
+            "full_scans": self.full_scans,
+            "saved_fraction": round(self.saved_fraction, 3),
+        }
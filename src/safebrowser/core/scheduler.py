@@ -0,0 +1,189 @@
+"""
+Latency Budget Scheduler
+Aniqlash chastotasi va detector o'lchamini qurilmaga moslashtirish
+
+Maqsad: "preview >= 25 FPS, detection >= 5 Hz" kabi byudjet.
+Zaif kompyuterda aniqlash siyraklashadi (yoki detector kichrayadi),
+kuchli kompyuterda esa tezlashadi.
+"""
+import time
+from typing import Tuple
+
+import psutil
+
+
+# Detector kirish o'lchamlari (kichikdan kattaga)
+DET_SIZE_LADDER = [(160, 160), (256, 256), (320, 320), (480, 480), (640, 640)]
+
+
+class LatencyBudgetScheduler:
+    """
+    Adaptiv aniqlash rejalashtiruvchisi
+
+    - Inference vaqti va CPU yuklamasini o'lchaydi
+    - Aniqlash chastotasini (Hz) byudjetga moslab o'zgartiradi
+    - Ixtiyoriy: detector kirish o'lchamini pasaytiradi/qaytaradi
+    """
+
+    def __init__(
+        self,
+        target_preview_fps: float = 25,
+        target_detection_hz: float = 5,
+        min_detection_hz: float = 1,
+        max_detection_hz: float = 15,
+        det_size: Tuple[int, int] = (320, 320),
+        adapt_det_size: bool = False,
+        cpu_high: float = 85,
+        cpu_low: float = 50,
+        max_duty: float = 0.6,
+        adjust_interval: float = 1.0,
+        smoothing: float = 0.2
+    ):
+        self.target_preview_fps = target_preview_fps
+        self.target_detection_hz = target_detection_hz
+        self.min_detection_hz = min_detection_hz
+        self.max_detection_hz = max_detection_hz
+        self.adapt_det_size = adapt_det_size
+        self.cpu_high = cpu_high
+        self.cpu_low = cpu_low
+        self.max_duty = max_duty
+        self.adjust_interval = adjust_interval
+        self.smoothing = smoothing
+
+        # Ruxsat etilgan o'lchamlar - boshlang'ich o'lchamdan kattasi ishlatilmaydi
+        self._sizes = [s for s in DET_SIZE_LADDER if s[0] <= det_size[0]] or [tuple(det_size)]
+        if tuple(det_size) not in self._sizes:
+            self._sizes.append(tuple(det_size))
+        self._size_index = len(self._sizes) - 1
+
+        self.detection_hz = float(target_detection_hz)
+        self.state = "warmup"
+
+        self._inference_s = None
+        self._cpu_percent = 0.0
+        self._preview_fps = 0.0
+        self._capture_fps = 0.0
+        self._last_detection = 0.0
+        self._last_adjust = time.monotonic()
+
+        # Birinchi cpu_percent chaqiruvi 0 qaytaradi - o'lchovni boshlash
+        psutil.cpu_percent(interval=None)
+
+    @property
+    def det_size(self) -> Tuple[int, int]:
+        """Joriy detector kirish o'lchami"""
+        return self._sizes[self._size_index]
+
+    @property
+    def detection_interval(self) -> float:
+        """Ikki aniqlash orasidagi minimal vaqt (sekund)"""
+        return 1.0 / self.detection_hz
+
+    def time_until_next_detection(self, now: float = None) -> float:
+        """Keyingi aniqlashgacha qolgan vaqt (sekund, 0 = hozir)"""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._last_detection + self.detection_interval - now)
+
+    def record_inference(self, duration_s: float, now: float = None):
+        """Bitta aniqlash tugaganini qayd etish (interval boshlanishidan hisoblanadi)"""
+        now = time.monotonic() if now is None else now
+        self._last_detection = now - duration_s
+        if self._inference_s is None:
+            self._inference_s = duration_s
+        else:
+            self._inference_s += self.smoothing * (duration_s - self._inference_s)
+
+    def update(
+        self,
+        preview_fps: float = None,
+        capture_fps: float = None,
+        now: float = None
+    ) -> bool:
+        """
+        Qarorlarni yangilash (adjust_interval da bir marta)
+
+        Returns:
+            True - agar chastota yoki o'lcham o'zgargan bo'lsa
+        """
+        now = time.monotonic() if now is None else now
+        if preview_fps is not None:
+            self._preview_fps = preview_fps
+        if capture_fps is not None:
+            self._capture_fps = capture_fps
+
+        if now - self._last_adjust < self.adjust_interval or self._inference_s is None:
+            return False
+        self._last_adjust = now
+        self._cpu_percent = psutil.cpu_percent(interval=None)
+
+        before = (round(self.detection_hz, 2), self._size_index)
+
+        if self._is_overloaded():
+            self.state = "overloaded"
+            self._step_down()
+        elif self._is_idle():
+            self.state = "idle"
+            self._step_up()
+        else:
+            self.state = "steady"
+
+        return before != (round(self.detection_hz, 2), self._size_index)
+
+    def _preview_target(self) -> float:
+        # Kamera o'zi sekin bo'lsa - aniqlashni kamaytirish foyda bermaydi
+        if self._capture_fps > 0:
+            return min(self.target_preview_fps, self._capture_fps * 0.9)
+        return self.target_preview_fps
+
+    def _is_overloaded(self) -> bool:
+        if self._cpu_percent > self.cpu_high:
+            return True
+        if self._preview_fps and self._preview_fps < self._preview_target():
+            return True
+        # Joriy o'lchamda maqsadli chastotaga yetib bo'lmaydi
+        return self._inference_s * self.target_detection_hz > 1.0
+
+    def _is_idle(self) -> bool:
+        if self._cpu_percent >= self.cpu_low:
+            return False
+        if self._preview_fps and self._preview_fps < self._preview_target():
+            return False
+        return True
+
+    def _step_down(self):
+        """Yuklamani kamaytirish"""
+        achievable_hz = 1.0 / max(self._inference_s, 1e-3)
+
+        if self.detection_hz > self.target_detection_hz:
+            self.detection_hz = max(self.target_detection_hz, self.detection_hz * 0.75)
+        elif self.adapt_det_size and self._size_index > 0:
+            self._size_index -= 1
+        else:
+            self.detection_hz = max(self.min_detection_hz, self.detection_hz * 0.75)
+
+        self.detection_hz = min(self.detection_hz, achievable_hz)
+        self.detection_hz = max(self.min_detection_hz, self.detection_hz)
+
+    def _step_up(self):
+        """Bo'sh resursdan foydalanish"""
+        if self.adapt_det_size and self._size_index < len(self._sizes) - 1:
+            cur, nxt = self._sizes[self._size_index], self._sizes[self._size_index + 1]
+            predicted_s = self._inference_s * (nxt[0] * nxt[1]) / (cur[0] * cur[1])
+            if predicted_s * self.target_detection_hz <= self.max_duty:
+                self._size_index += 1
+                return
+
+        next_hz = min(self.max_detection_hz, self.detection_hz * 1.25)
+        if self._inference_s * next_hz <= self.max_duty:
+            self.detection_hz = next_hz
+
+    def status(self) -> dict:
+        """Joriy qarorlar (UI/log uchun)"""
+        return {
+            "state": self.state,
+            "detection_hz": round(self.detection_hz, 2),
+            "det_size": self.det_size,
+            "inference_ms": round((self._inference_s or 0.0) * 1000, 1),
+            "cpu_percent": round(self._cpu_percent, 1),
+            "preview_fps": round(self._preview_fps, 1),
+        }
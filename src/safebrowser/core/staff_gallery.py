@@ -0,0 +1,304 @@
+"""
+Staff Gallery - xodimlar embeddinglarining lokal galereyasi
+Har bir yuz namunasi uchun server'ga so'rov yuborish o'rniga xodim
+embeddinglari server'dan o'zgarishlar (delta) bilan sinxronlanadi va
+app data papkasida saqlanadi. Qidiruv - bitta matritsa-vektor
+ko'paytmasi va top-k.
+
+Sinxronlash protokoli (GET users/face_gallery/?since=<version>):
+    {"status": "success",
+     "data": {"version": 42, "full": false,
+              "upserts": [{"id": ..., "name": ..., "embedding": [...]}],
+              "deletes": [id, ...]}}
+full = true bo'lsa galereya to'liq almashtiriladi.
+
+Galereya ann_min_size dan katta bo'lsa qidiruv IVF index orqali
+(core/ann_index.py); index o'zgarishlar bilan qisman yangilanadi.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from safebrowser.core.ann_index import IVFIndex
+
+
+GALLERY_FILE_NAME = "staff_gallery.npz"
+INDEX_DIR_NAME = "staff_gallery_ivf"
+
+
+class StaffGallery:
+    """
+    Xodimlar galereyasi: L2-normallashtirilgan (N, dim) float32 matritsa
+
+    Yangilanish yangi massivlarni yasab, ularni lock ostida almashtiradi -
+    qidiruv hech qachon yarim yangilangan matritsani ko'rmaydi.
+    """
+
+    def __init__(self, path: str = None, dim: int = 512, ann_min_size: int = 20000):
+        self._path = Path(path) if path else None
+        self.dim = dim
+        self.ann_min_size = ann_min_size
+        self._lock = threading.RLock()
+        self.version = 0
+        # Oxirgi muvaffaqiyatli sinxronlash vaqti (time.time(), 0 - hech qachon)
+        self.synced_at = 0.0
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.matrix = np.empty((0, dim), dtype=np.float32)
+        self._index = None
+        self._key_rows = None
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            # Lazy import to avoid circular dependency
+            from safebrowser.utils.system import get_app_data_dir
+            self._path = get_app_data_dir() / GALLERY_FILE_NAME
+        return self._path
+
+    @property
+    def index_dir(self) -> Path:
+        return self.path.with_name(INDEX_DIR_NAME)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def sync_age(self) -> float:
+        """Oxirgi muvaffaqiyatli sinxronlashdan beri o'tgan soniyalar"""
+        return time.time() - self.synced_at if self.synced_at else float("inf")
+
+    @staticmethod
+    def _key(staff_id: str) -> int:
+        """ANN index uchun barqaror butun son kalit"""
+        digest = hashlib.blake2b(staff_id.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little", signed=True)
+
+    @property
+    def uses_index(self) -> bool:
+        return len(self) >= self.ann_min_size
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def load(self) -> bool:
+        """Saqlangan galereyani yuklash"""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                matrix = np.ascontiguousarray(data["matrix"], dtype=np.float32)
+                ids = [str(i) for i in data["ids"]]
+                names = [str(n) for n in data["names"]]
+                version = int(data["version"])
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Staff gallery load error: {e}")
+            return False
+
+        with self._lock:
+            self.matrix, self.ids, self.names, self.version = matrix, ids, names, version
+            self.synced_at = self._load_synced_at(version)
+            if len(matrix):
+                self.dim = matrix.shape[1]
+            self._index = self._load_index()
+            self._key_rows = None
+        print(f"Staff gallery loaded: {len(ids)} xodim (version {version})")
+        return True
+
+    @property
+    def sync_state_path(self) -> Path:
+        return self.path.with_suffix(".sync.json")
+
+    def _load_synced_at(self, version: int) -> float:
+        """Oxirgi sinxronlash vaqti (alohida kichik fayl - galereya qayta yozilmaydi)"""
+        try:
+            state = json.loads(self.sync_state_path.read_text())
+            # Boshqa versiya uchun yozilgan holat - galereya eskirgan deb hisoblanadi
+            return float(state["synced_at"]) if int(state["version"]) == version else 0.0
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0.0
+
+    def _save_synced_at(self):
+        try:
+            self.sync_state_path.parent.mkdir(parents=True, exist_ok=True)
+            self.sync_state_path.write_text(json.dumps({"synced_at": self.synced_at, "version": self.version}))
+        except OSError as e:
+            print(f"Staff gallery sync state save error: {e}")
+
+    def _load_index(self):
+        """Saqlangan IVF index (mmap) - galereyaga mos bo'lsa"""
+        if not self.uses_index or not (self.index_dir / "index.json").exists():
+            return None
+        try:
+            index = IVFIndex.load(str(self.index_dir), mmap=True)
+        except Exception as e:
+            print(f"Staff gallery index load error: {e}")
+            return None
+        return index if len(index) == len(self) else None
+
+    def _build_index(self) -> IVFIndex:
+        index = IVFIndex(dim=self.dim)
+        index.add((self._key(i) for i in self.ids), self.matrix)
+        index.train()
+        print(f"Staff gallery index built: {len(index)} vektor, {index.nlist} klaster")
+        return index
+
+    def save(self):
+        """Galereyani atomik yozish (vaqtinchalik fayl + replace)"""
+        with self._lock:
+            matrix, ids, names, version = self.matrix, self.ids, self.names, self.version
+            index = self._index
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp.npz")
+            np.savez(
+                tmp,
+                matrix=matrix,
+                ids=np.array(ids, dtype=str),
+                names=np.array(names, dtype=str),
+                version=np.int64(version)
+            )
+            os.replace(tmp, self.path)
+
+            if index is not None:
+                with self._lock:
+                    index.save(str(self.index_dir))
+        except Exception as e:
+            print(f"Staff gallery save error: {e}")
+
+    def apply_delta(self, delta: dict) -> bool:
+        """
+        Server'dan kelgan o'zgarishlarni qo'llash
+
+        Returns:
+            Galereya o'zgargan bo'lsa True
+        """
+        upserts = delta.get("upserts") or []
+        deletes = {str(i) for i in delta.get("deletes") or []}
+        full = bool(delta.get("full"))
+
+        with self._lock:
+            if full:
+                ids, names, rows = [], [], []
+            else:
+                keep = [i for i, staff_id in enumerate(self.ids) if staff_id not in deletes]
+                ids = [self.ids[i] for i in keep]
+                names = [self.names[i] for i in keep]
+                rows = list(self.matrix[keep])
+
+            index = {staff_id: i for i, staff_id in enumerate(ids)}
+            for item in upserts:
+                staff_id = str(item["id"])
+                embedding = np.asarray(item["embedding"], dtype=np.float32).ravel()
+                if staff_id in index:
+                    rows[index[staff_id]] = embedding
+                    names[index[staff_id]] = str(item.get("name", ""))
+                else:
+                    index[staff_id] = len(ids)
+                    ids.append(staff_id)
+                    names.append(str(item.get("name", "")))
+                    rows.append(embedding)
+
+            changed = full or bool(upserts) or len(ids) != len(self.ids)
+            if rows:
+                matrix = np.ascontiguousarray(self._normalize(np.stack(rows)))
+            else:
+                matrix = np.empty((0, self.dim), dtype=np.float32)
+
+            self._update_index(full, deletes, upserts)
+            self.matrix, self.ids, self.names = matrix, ids, names
+            self._key_rows = None
+            self.version = int(delta.get("version", self.version))
+            return changed
+
+    def _update_index(self, full: bool, deletes: set, upserts: list):
+        """IVF index'ni qayta o'qitmasdan o'zgarishlar bilan yangilash (lock ostida)"""
+        if self._index is None:
+            return
+        if full:
+            self._index = None
+            return
+
+        self._index.remove(self._key(i) for i in deletes)
+        if upserts:
+            self._index.add(
+                [self._key(str(item["id"])) for item in upserts],
+                np.stack([np.asarray(item["embedding"], dtype=np.float32).ravel() for item in upserts])
+            )
+
+    def sync(self, client) -> bool:
+        """
+        Server bilan sinxronlash (faqat oxirgi versiyadan keyingi o'zgarishlar)
+
+        Args:
+            client: APIClient
+
+        Returns:
+            Sinxronlash muvaffaqiyatli bo'lsa True
+        """
+        result = client.staff_gallery(since=self.version)
+        if result.get("status") != "success":
+            print(f"Staff gallery sync error: {result.get('message', 'Xatolik')}")
+            return False
+
+        if self.apply_delta(result.get("data") or {}):
+            self.save()
+            print(f"Staff gallery synced: {len(self)} xodim (version {self.version})")
+        self.synced_at = time.time()
+        self._save_synced_at()
+        return True
+
+    def search(self, embedding: np.ndarray, k: int = 1) -> List[dict]:
+        """
+        Eng o'xshash k ta xodim
+
+        Returns:
+            [{"id", "name", "similarity"}] - o'xshashlik kamayish tartibida
+        """
+        if self.uses_index:
+            return self._search_index(embedding, k)
+
+        with self._lock:
+            matrix, ids, names = self.matrix, self.ids, self.names
+        if not len(ids):
+            return []
+
+        query = self._normalize(np.asarray(embedding, dtype=np.float32).ravel())
+        scores = matrix @ query
+
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {"id": ids[i], "name": names[i], "similarity": float(scores[i])}
+            for i in top
+        ]
+
+    def _search_index(self, embedding: np.ndarray, k: int) -> List[dict]:
+        """Katta galereya - IVF index orqali taxminiy qidiruv"""
+        with self._lock:
+            if self._index is None:
+                self._index = self._build_index()
+            if self._key_rows is None:
+                self._key_rows = {self._key(staff_id): row for row, staff_id in enumerate(self.ids)}
+
+            keys, scores = self._index.search(embedding, k)
+            rows = [self._key_rows[int(key)] for key in keys]
+            return [
+                {"id": self.ids[row], "name": self.names[row], "similarity": float(score)}
+                for row, score in zip(rows, scores)
+            ]
+
+
+# Jarayon bo'yicha yagona galereya (worker'lar qayta yaratilganda yuklanmaydi)
+gallery = StaffGallery()
@@ -0,0 +1,233 @@
+"""
+Face Tracker - aniqlashlar orasida yuz ramkasini kuzatish
+Keyframe'da detector, oraliq frame'larda esa 5 ta keypoint bo'yicha
+sparse optical flow (Lucas-Kanade) va Kalman silliqlash ishlaydi.
+"""
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def bbox_iou(box1, box2) -> float:
+    """Ikki (x1, y1, x2, y2) ramka orasidagi IoU"""
+    if box1 is None or box2 is None:
+        return 0.0
+
+    ix1, iy1 = max(box1[0], box2[0]), max(box1[1], box2[1])
+    ix2, iy2 = min(box1[2], box2[2]), min(box1[3], box2[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    if inter <= 0:
+        return 0.0
+
+    area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+    area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+    return float(inter / (area1 + area2 - inter))
+
+
+class BoxKalmanFilter:
+    """
+    Ramka uchun doimiy tezlikli Kalman filtri
+    Holat: [cx, cy, w, h, vx, vy, vw, vh]
+    """
+
+    def __init__(self, bbox, process_noise: float = 1.0):
+        self.x = np.zeros(8, dtype=np.float64)
+        self.x[:4] = self._to_measurement(bbox)
+        self.P = np.diag([10.0] * 4 + [100.0] * 4)
+
+        self.F = np.eye(8)
+        self.F[:4, 4:] = np.eye(4)
+        self.H = np.eye(4, 8)
+        self.Q = np.diag([process_noise] * 4 + [process_noise * 0.5] * 4)
+
+    @staticmethod
+    def _to_measurement(bbox) -> np.ndarray:
+        x1, y1, x2, y2 = bbox[:4]
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=np.float64)
+
+    def predict(self):
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+
+    def correct(self, bbox, noise: float):
+        """O'lchov bilan tuzatish (noise - o'lchov xatosi dispersiyasi, px^2)"""
+        z = self._to_measurement(bbox)
+        R = np.eye(4) * noise
+        y = z - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+    @property
+    def bbox(self) -> np.ndarray:
+        cx, cy, w, h = self.x[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+
+class FaceTracker:
+    """
+    Keypoint asosidagi yengil yuz tracker
+
+    - reset(): keyframe (detector natijasi) bilan boshlash
+    - update(): har bir frame'da ramkani optical flow bilan siljitish
+    - needs_keyframe(): detector qachon kerakligini aytadi
+    """
+
+    def __init__(
+        self,
+        keyframe_interval: float = 1.0,
+        min_confidence: float = 0.6,
+        reset_iou: float = 0.3,
+        fb_threshold: float = 1.5,
+        flow_noise: float = 16.0,
+        detection_noise: float = 4.0
+    ):
+        self.keyframe_interval = keyframe_interval
+        self.min_confidence = min_confidence
+        self.reset_iou = reset_iou
+        self.fb_threshold = fb_threshold
+        self.flow_noise = flow_noise
+        self.detection_noise = detection_noise
+
+        self._lk_params = dict(
+            winSize=(21, 21),
+            maxLevel=3,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+        )
+
+        self._kalman = None
+        self._points = None
+        self._prev_gray = None
+        self._last_keyframe = 0.0
+
+        self.confidence = 0.0
+        self.keyframes = 0
+        self.tracked_frames = 0
+
+    @property
+    def is_tracking(self) -> bool:
+        return self._kalman is not None
+
+    @property
+    def bbox(self) -> Optional[Tuple[int, int, int, int]]:
+        """Joriy (silliqlangan) ramka"""
+        if self._kalman is None:
+            return None
+        return tuple(int(round(v)) for v in self._kalman.bbox)
+
+    def needs_keyframe(self, now: float = None) -> bool:
+        """Detector ishlatish kerakmi"""
+        if self._kalman is None:
+            return True
+        if self.confidence < self.min_confidence:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self._last_keyframe >= self.keyframe_interval
+
+    def clear(self):
+        """Kuzatishni to'xtatish (yuz yo'qoldi)"""
+        self._kalman = None
+        self._points = None
+        self._prev_gray = None
+        self.confidence = 0.0
+
+    def reset(self, gray: np.ndarray, bbox, kps, timestamp: float = None):
+        """
+        Detector natijasi bilan tracker'ni yangilash
+
+        Args:
+            gray: Detector ishlagan frame (grayscale)
+            bbox: (x1, y1, x2, y2) - detector ramkasi
+            kps: 5x2 keypointlar
+            timestamp: Keyframe vaqti (monotonic)
+        """
+        self.keyframes += 1
+        self._last_keyframe = time.monotonic() if timestamp is None else timestamp
+
+        if kps is None:
+            self.clear()
+            return
+
+        # Boshqa yuz bo'lsa - Kalman'ni qaytadan boshlash
+        if self._kalman is None or bbox_iou(self._kalman.bbox, bbox) < self.reset_iou:
+            self._kalman = BoxKalmanFilter(bbox)
+        else:
+            self._kalman.correct(bbox, self.detection_noise)
+
+        self._points = np.asarray(kps, dtype=np.float32).reshape(-1, 1, 2)
+        self._prev_gray = gray
+        self.confidence = 1.0
+
+    def update(self, gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Yangi frame bo'yicha ramkani yangilash
+
+        Returns:
+            Joriy ramka yoki kuzatish yo'q bo'lsa None
+        """
+        if self._kalman is None or self._points is None or self._prev_gray is None:
+            return None
+        if gray is self._prev_gray:
+            return self.bbox
+
+        self.tracked_frames += 1
+        # Flow siljishi oldingi (tuzatilgan) holatga nisbatan o'lchanadi
+        prev_state = self._kalman.x[:4].copy()
+        self._kalman.predict()
+
+        p0 = self._points
+        p1, st1, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, p0, None, **self._lk_params)
+        p0r, st2, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, p1, None, **self._lk_params)
+
+        fb_error = np.linalg.norm((p0 - p0r).reshape(-1, 2), axis=1)
+        good = (st1.ravel() == 1) & (st2.ravel() == 1) & (fb_error < self.fb_threshold)
+        self.confidence = float(good.mean()) if len(good) else 0.0
+
+        if good.sum() >= 2:
+            old = p0.reshape(-1, 2)[good]
+            new = p1.reshape(-1, 2)[good]
+            shift = np.median(new - old, axis=0)
+            scale = self._estimate_scale(old, new)
+
+            cx, cy, w, h = prev_state
+            cx, cy = cx + shift[0], cy + shift[1]
+            w, h = w * scale, h * scale
+            measured = (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+            # Ishonch past bo'lsa - o'lchovga kamroq tayanish
+            noise = self.flow_noise / max(self.confidence, 0.1)
+            self._kalman.correct(measured, noise)
+
+            self._points = p1
+        else:
+            self.confidence = 0.0
+
+        self._prev_gray = gray
+        return self.bbox
+
+    @staticmethod
+    def _estimate_scale(old: np.ndarray, new: np.ndarray) -> float:
+        """Nuqtalar orasidagi masofalar nisbati (median)"""
+        if len(old) < 2:
+            return 1.0
+        i, j = np.triu_indices(len(old), k=1)
+        d_old = np.linalg.norm(old[i] - old[j], axis=1)
+        d_new = np.linalg.norm(new[i] - new[j], axis=1)
+        valid = d_old > 1e-3
+        if not valid.any():
+            return 1.0
+        return float(np.clip(np.median(d_new[valid] / d_old[valid]), 0.8, 1.25))
+
+    def stats(self) -> dict:
+        """Detector chaqiruvlari tejamkorligi"""
+        total = self.keyframes + self.tracked_frames
+        return {
+            "tracking": self.is_tracking,
+            "confidence": round(self.confidence, 2),
+            "keyframes": self.keyframes,
+            "tracked_frames": self.tracked_frames,
+            "keyframe_ratio": round(self.keyframes / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,140 @@
+"""
+Sequential Verifier - bir necha frame bo'yicha ketma-ket qaror
+Bitta frame'ning cosine o'xshashligi o'rniga ketma-ket yaxshi
+frame'lar yig'iladi. O'rtacha o'xshashlikning ishonch oralig'i
+chegaradan to'liq yuqori (tasdiq) yoki past (rad) bo'lishi bilan qaror
+qabul qilinadi - aniq holatlarda bitta frame yetarli, chegaradagi
+holatlarda ko'proq frame olinadi.
+"""
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from safebrowser.core.face_analyzer import FaceAnalyzer
+
+
+DECISION_PENDING = "pending"
+DECISION_MATCH = "match"
+DECISION_NO_MATCH = "no_match"
+
+
+class SequentialVerifier:
+    """
+    O'rtacha o'xshashlik + ishonch chegaralari bo'yicha qaror
+
+    Chegaralar: mean ± z * max(std, prior_std) / sqrt(n).
+    prior_std - bitta yoki bir xil namunalarda oraliq nolga
+    tushib ketmasligi uchun (frame'lar orasidagi odatiy tebranish).
+    max_samples ga yetganda qaror o'rtacha bo'yicha majburiy qabul qilinadi.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        min_samples: int = 1,
+        max_samples: int = 6,
+        z: float = 1.64,
+        prior_std: float = 0.05
+    ):
+        self.threshold = threshold
+        self.min_samples = max(1, min_samples)
+        self.max_samples = max(self.min_samples, max_samples)
+        self.z = z
+        self.prior_std = prior_std
+        self.reset()
+
+    @classmethod
+    def from_score(cls, score: int, **kwargs) -> 'SequentialVerifier':
+        """Foizdagi chegara (worker'lardagi score); score <= 0 - hech qachon tasdiqlanmaydi"""
+        threshold = score / 100 if score > 0 else math.inf
+        return cls(threshold, **kwargs)
+
+    def reset(self):
+        self.trace: List[float] = []
+        self.decision = DECISION_PENDING
+        self._embedding_sum = None
+
+    @property
+    def samples(self) -> int:
+        return len(self.trace)
+
+    @property
+    def is_decided(self) -> bool:
+        return self.decision != DECISION_PENDING
+
+    @property
+    def mean(self) -> float:
+        return float(np.mean(self.trace)) if self.trace else 0.0
+
+    def bounds(self) -> tuple:
+        """(pastki, yuqori) ishonch chegaralari"""
+        if not self.trace:
+            return -1.0, 1.0
+        std = float(np.std(self.trace, ddof=1)) if len(self.trace) > 1 else 0.0
+        margin = self.z * max(std, self.prior_std) / math.sqrt(len(self.trace))
+        return self.mean - margin, self.mean + margin
+
+    def add(self, similarity: float, embedding: np.ndarray = None) -> str:
+        """
+        Yangi frame natijasini qo'shish
+
+        Args:
+            similarity: live va reference embedding cosine o'xshashligi
+            embedding: live embedding (tasdiqlanganda o'rtachasi qaytariladi)
+
+        Returns:
+            "pending", "match" yoki "no_match"
+        """
+        if self.is_decided:
+            return self.decision
+
+        self.trace.append(float(similarity))
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32).ravel()
+            norm = np.linalg.norm(embedding)
+            if norm > 0:
+                embedding = embedding / norm
+            self._embedding_sum = embedding if self._embedding_sum is None else self._embedding_sum + embedding
+
+        if self.samples < self.min_samples:
+            return self.decision
+
+        lower, upper = self.bounds()
+        if lower >= self.threshold:
+            self.decision = DECISION_MATCH
+        elif upper < self.threshold:
+            self.decision = DECISION_NO_MATCH
+        elif self.samples >= self.max_samples:
+            self.decision = DECISION_MATCH if self.mean >= self.threshold else DECISION_NO_MATCH
+        return self.decision
+
+    def add_embedding(self, live_embedding: np.ndarray, reference: np.ndarray) -> str:
+        """Live embedding'ni reference bilan solishtirib qo'shish"""
+        return self.add(FaceAnalyzer.cosine_similarity(live_embedding, reference), live_embedding)
+
+    def finish(self) -> str:
+        """Vaqt tugaganda - mavjud frame'lar o'rtachasi bo'yicha qaror"""
+        if not self.is_decided and self.trace:
+            self.decision = DECISION_MATCH if self.mean >= self.threshold else DECISION_NO_MATCH
+        return self.decision
+
+    def mean_embedding(self) -> Optional[np.ndarray]:
+        """Yig'ilgan live embeddinglarning normallashtirilgan o'rtachasi"""
+        if self._embedding_sum is None:
+            return None
+        norm = np.linalg.norm(self._embedding_sum)
+        return self._embedding_sum / norm if norm > 0 else self._embedding_sum
+
+    def result(self) -> dict:
+        """Qaror, o'rtacha o'xshashlik (%), chegaralar va frame'lar bo'yicha iz"""
+        lower, upper = self.bounds()
+        return {
+            "decision": self.decision,
+            "is_verified": self.decision == DECISION_MATCH,
+            "similarity": round(self.mean * 100, 2),
+            "lower": round(lower * 100, 2),
+            "upper": round(upper * 100, 2),
+            "samples": self.samples,
+            "trace": [round(s * 100, 2) for s in self.trace],
+        }
@@ -3,5 +3,9 @@ Services module - API va database xizmatlari
 """
 
 from safebrowser.services.api_client import APIClient, BASE_URL
+from safebrowser.services.http_transport import HttpTransport, transport
+from safebrowser.services.async_api_client import AsyncAPIClient, ApiReply
+from safebrowser.services import embedding_codec
 
-__all__ = ["APIClient", "BASE_URL"]
+__all__ = ["APIClient", "BASE_URL", "HttpTransport", "transport", "AsyncAPIClient", "ApiReply",
+           "embedding_codec"]
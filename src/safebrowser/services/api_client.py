@@ -1,81 +1,168 @@
 """
 API Client - Server bilan aloqa qilish uchun
+So'rovlar umumiy HttpTransport (keep-alive pool, retry) orqali yuboriladi.
 """
+import json as jsonlib
 import requests
 from typing import Optional, Dict, Any
 
-# Base URL (config'dan o'qilishi kerak)
+from safebrowser.services.embedding_codec import embedding_payload, legacy_payload
+from safebrowser.services.http_transport import HttpTransport, transport as shared_transport
+
+# Config'da base_url bo'lmasa ishlatiladi
 BASE_URL = 'http://localhost:8000/api/v1'
 
+# Ixcham embedding formatini rad etgan server javob kodlari (5xx - format_rejected)
+FORMAT_REJECTED_CODES = (400, 415, 422)
+
+# Xato sifatida qaytariladigan HTTP kodlar
+ERROR_STATUS_CODES = (400, 404, 415, 422, 500, 502, 503, 504)
+
+VERIFY_FACE_ENDPOINT = "users/face_identification/"
+
+
+def format_rejected(result: dict) -> bool:
+    """
+    Server ixcham embedding formatini tushunmadimi
+
+    HTTP 400/415/422 yoki 5xx, yoki javobda "verified" kaliti yo'q
+    (200 va xato matni). Tarmoq xatosi (server'ga yetmagan) - rad emas.
+    """
+    if result.get("network"):
+        return False
+    code = result.get("code")
+    if code is not None:
+        return code in FORMAT_REJECTED_CODES or code >= 500
+    return "verified" not in result
+
+
+def parse_response(status_code: int, content: bytes) -> Dict[str, Any]:
+    """HTTP javobini dict'ga o'tkazish (sinxron va asinxron client uchun umumiy)"""
+    if status_code in ERROR_STATUS_CODES:
+        return {
+            "status": False,
+            "code": status_code,
+            "message": f"Server xatoligi: {status_code}"
+        }
+    try:
+        return jsonlib.loads(content)
+    except ValueError:
+        return {"status": False, "message": "JSON parse xatoligi"}
+
 
 class APIClient:
     """
     REST API client - server bilan aloqa
     """
 
-    def __init__(self, base_url: str = None, timeout: int = 15):
-        self.base_url = base_url or BASE_URL
+    # Ixcham embedding formatini qabul qilmagan serverlar (base_url)
+    _legacy_embedding_servers = set()
+
+    def __init__(self, base_url: str = None, timeout: float = None, transport: HttpTransport = None):
+        """
+        Args:
+            base_url: berilmasa config.ini [api] base_url
+            timeout: berilmasa endpoint bo'yicha config'dan
+            transport: berilmasa jarayon bo'yicha umumiy transport
+        """
+        # Lazy import to avoid circular dependency
+        from safebrowser.config import config
+
+        self.base_url = (base_url or config.api_base_url or BASE_URL).rstrip("/")
         self.timeout = timeout
+        self.transport = transport or shared_transport
 
-    def get(self, endpoint: str, params: dict = None) -> Dict[str, Any]:
-        """GET request"""
+    def timeout_for(self, endpoint: str) -> float:
+        if self.timeout is not None:
+            return self.timeout
+        # Lazy import to avoid circular dependency
+        from safebrowser.config import config
+        return config.api_endpoint_timeout(endpoint)
+
+    def request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """So'rov yuborish va javobni dict ko'rinishida qaytarish"""
         try:
-            response = requests.get(
+            response = self.transport.request(
+                method,
                 f"{self.base_url}/{endpoint}",
-                params=params,
-                timeout=self.timeout
+                timeout=self.timeout_for(endpoint),
+                **kwargs
             )
             return self._handle_response(response)
         except requests.exceptions.Timeout:
-            return {"status": False, "message": "Server javob bermadi (timeout)"}
+            return {"status": False, "network": True, "message": "Server javob bermadi (timeout)"}
         except requests.exceptions.RequestException as e:
-            return {"status": False, "message": f"Ulanish xatoligi: {e}"}
+            return {"status": False, "network": True, "message": f"Ulanish xatoligi: {e}"}
+
+    def get(self, endpoint: str, params: dict = None) -> Dict[str, Any]:
+        """GET request"""
+        return self.request("GET", endpoint, params=params)
 
     def post(self, endpoint: str, data: dict = None, json: dict = None) -> Dict[str, Any]:
         """POST request"""
-        try:
-            response = requests.post(
-                f"{self.base_url}/{endpoint}",
-                data=data,
-                json=json,
-                timeout=self.timeout
-            )
-            return self._handle_response(response)
-        except requests.exceptions.Timeout:
-            return {"status": False, "message": "Server javob bermadi (timeout)"}
-        except requests.exceptions.RequestException as e:
-            return {"status": False, "message": f"Ulanish xatoligi: {e}"}
+        return self.request("POST", endpoint, data=data, json=json)
 
     def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
         """Response'ni qayta ishlash"""
-        if response.status_code in [400, 404, 500, 502]:
-            return {
-                "status": False,
-                "message": f"Server xatoligi: {response.status_code}"
-            }
-        try:
-            return response.json()
-        except ValueError:
-            return {"status": False, "message": "JSON parse xatoligi"}
+        return parse_response(response.status_code, response.content)
 
     def load_tests(self) -> Dict[str, Any]:
         """Testlar ro'yxatini yuklash"""
-        result = self.get("load-tests/")
+        return self.tests_result(self.get("load-tests/"))
+
+    @staticmethod
+    def tests_result(result: dict) -> Dict[str, Any]:
+        """load-tests/ javobini worker/UI formatiga keltirish"""
         if result.get("status") == "success":
             return {
                 "status": True,
                 "result": result.get("data", []),
                 "message": "Muvaffaqiyatli yuklandi"
             }
+        if "code" in result:
+            message = "Server bilan bog'lanishda muammo!"
+        else:
+            message = result.get("message", "Xatolik")
         return {
             "status": False,
             "result": [],
-            "message": result.get("message", "Xatolik")
+            "message": message
         }
 
-    def verify_face(self, embedding: list) -> Dict[str, Any]:
-        """Yuzni server orqali tekshirish"""
-        return self.post(
-            "users/face_identification/",
-            json={"embedding": str(embedding)}
-        )
+    def staff_gallery(self, since: int = 0) -> Dict[str, Any]:
+        """Xodimlar galereyasi o'zgarishlari (since versiyasidan keyin)"""
+        return self.get("users/face_gallery/", params={"since": since})
+
+    def verify_face(self, embedding, embedding_format: str = None) -> Dict[str, Any]:
+        """
+        Yuzni server orqali tekshirish
+
+        [api] embedding_format = int8/float16 bo'lsa ixcham formatda
+        yuboriladi (embedding_codec); server uni rad etsa (format_rejected)
+        eski formatda qayta yuboriladi va bu server uchun keyingi
+        so'rovlar darhol eski formatda ketadi.
+        """
+        embedding_format = self.embedding_format(embedding_format)
+        if embedding_format != "legacy":
+            result = self.post(VERIFY_FACE_ENDPOINT, json=embedding_payload(embedding, embedding_format))
+            if not format_rejected(result):
+                return result
+
+        result = self.post(VERIFY_FACE_ENDPOINT, json=legacy_payload(embedding))
+        self.remember_format(embedding_format, result)
+        return result
+
+    def embedding_format(self, embedding_format: str = None) -> str:
+        """Shu server uchun amaldagi format (rad etgan server uchun - legacy)"""
+        if embedding_format is None:
+            # Lazy import to avoid circular dependency
+            from safebrowser.config import config
+            embedding_format = config.api_embedding_format
+        if self.base_url in self._legacy_embedding_servers:
+            return "legacy"
+        return embedding_format
+
+    def remember_format(self, embedding_format: str, legacy_result: dict):
+        """Ixcham format rad etilib, eski format qabul qilinsa - server eslab qolinadi"""
+        if embedding_format != "legacy" and not format_rejected(legacy_result):
+            self._legacy_embedding_servers.add(self.base_url)
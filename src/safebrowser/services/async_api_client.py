@@ -0,0 +1,319 @@
+"""
+Async API Client - Qt event loop bilan ishlaydigan bloklamaydigan client
+Har bir so'rov uchun alohida QThread o'rniga QNetworkAccessManager
+(o'z keep-alive pool'i bilan) va QTcpSocket ishlatiladi: istalgancha
+parallel so'rov bitta (asosiy) thread'da, natija signal orqali keladi.
+
+    reply = api.load_tests(tag="page_home")
+    reply.finished.connect(self._on_tests_loaded)
+    ...
+    api.cancel("page_home")   # sahifa almashganda
+
+Metodlarni istalgan thread'dan chaqirish mumkin - so'rov client
+yaratilgan thread'ga navbat orqali uzatiladi. cancel(tag) - client
+thread'idan (odatda UI).
+"""
+import json as jsonlib
+import threading
+from typing import Callable, Optional, Set
+
+from PyQt6.QtCore import QObject, QThread, QTimer, QUrl, QUrlQuery, QByteArray, Qt, pyqtSignal
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest, QTcpSocket
+
+from safebrowser.services.api_client import (
+    APIClient,
+    VERIFY_FACE_ENDPOINT,
+    format_rejected,
+    parse_response,
+)
+from safebrowser.services.embedding_codec import embedding_payload, legacy_payload
+from safebrowser.services.http_transport import RETRY_STATUS_CODES
+
+
+class ApiReply(QObject):
+    """
+    Bitta so'rov natijasi (future)
+
+    finished signali va add_done_callback natijani bir marta beradi.
+    Bekor qilingan so'rov natija bermaydi (slot chaqirilmaydi).
+    """
+    finished = pyqtSignal(object)
+
+    def __init__(self, tag: str = None):
+        super().__init__()
+        self.tag = tag
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._result = None
+        self._cancelled = False
+        self._callbacks = []
+        self._finalizers = []
+        self._on_cancel = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def result(self) -> Optional[dict]:
+        return self._result
+
+    def wait(self, timeout: float = None) -> Optional[dict]:
+        """Natijani kutish (faqat client thread'idan boshqa thread'da!)"""
+        self._event.wait(timeout)
+        return self._result
+
+    def add_done_callback(self, fn: Callable[[dict], None]):
+        """Natija kelganda fn(result) - client thread'ida chaqiriladi"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        if not self._cancelled:
+            fn(self._result)
+
+    def cancel(self) -> bool:
+        """So'rovni bekor qilish (tugagan bo'lsa False)"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self._cancelled = True
+            self._callbacks.clear()
+            self._event.set()
+            on_cancel, self._on_cancel = self._on_cancel, None
+            finalizers, self._finalizers = self._finalizers, []
+        if on_cancel is not None:
+            on_cancel()
+        for fn in finalizers:
+            fn()
+        return True
+
+    def _add_finalizer(self, fn: Callable[[], None]):
+        """Natija yoki bekor qilinganda fn() (client ichki hisobi uchun)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._finalizers.append(fn)
+                return
+        fn()
+
+    def _resolve(self, result: dict):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._result = result
+            callbacks, self._callbacks = self._callbacks, []
+            finalizers, self._finalizers = self._finalizers, []
+            self._on_cancel = None
+            self._event.set()
+
+        for fn in finalizers:
+            fn()
+        self.finished.emit(result)
+        for fn in callbacks:
+            try:
+                fn(result)
+            except Exception as e:
+                print(f"ApiReply callback error: {e}")
+
+
+class AsyncAPIClient(QObject):
+    """
+    APIClient'ning bloklamaydigan varianti (base_url, timeout'lar va
+    embedding formati APIClient bilan bir xil). GET so'rovlar tarmoq
+    xatosi yoki 502/503/504 da backoff bilan qayta yuboriladi.
+    """
+    _call = pyqtSignal(object)
+
+    def __init__(self, base_url: str = None, timeout: float = None, parent: QObject = None):
+        super().__init__(parent)
+        self._client = APIClient(base_url=base_url, timeout=timeout)
+        self.base_url = self._client.base_url
+        self._manager = QNetworkAccessManager(self)
+        self._active: Set[ApiReply] = set()
+        self._call.connect(self._invoke, Qt.ConnectionType.QueuedConnection)
+
+    def pending(self) -> int:
+        return len(self._active)
+
+    def _invoke(self, fn: Callable[[], None]):
+        fn()
+
+    def _in_client_thread(self, fn: Callable[[], None]):
+        """fn() ni client thread'ida bajarish (boshqa thread'dan - navbat orqali)"""
+        if QThread.currentThread() is self.thread():
+            fn()
+        else:
+            self._call.emit(fn)
+
+    def _submit(self, reply: ApiReply, start: Callable[[], None]) -> ApiReply:
+        self._in_client_thread(lambda: None if reply.is_cancelled else start())
+        return reply
+
+    def _register(self, reply: ApiReply):
+        """Faol so'rovlar ro'yxatiga qo'shish (tugaganda o'zi chiqariladi)"""
+        self._active.add(reply)
+        reply._add_finalizer(lambda: self._in_client_thread(lambda: self._active.discard(reply)))
+
+    def _track(self, reply: ApiReply, abort: Callable[[], None]):
+        """Faol so'rovni ro'yxatga olish; bekor qilinganda abort() client thread'ida"""
+        if reply not in self._active:
+            self._register(reply)
+        reply._on_cancel = lambda: self._in_client_thread(abort)
+        if reply.is_cancelled:
+            abort()
+
+    # HTTP
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict = None,
+        json: dict = None,
+        tag: str = None
+    ) -> ApiReply:
+        """So'rov yuborish - natija ApiReply.finished orqali (APIClient formatida)"""
+        reply = ApiReply(tag)
+        return self._submit(reply, lambda: self._send(reply, method, endpoint, params, json, 0))
+
+    def _send(self, reply: ApiReply, method: str, endpoint: str, params: dict, json: dict, attempt: int):
+        # Lazy import to avoid circular dependency
+        from safebrowser.config import config
+
+        if reply.is_cancelled:
+            return
+
+        url = QUrl(f"{self.base_url}/{endpoint}")
+        if params:
+            query = QUrlQuery()
+            for key, value in params.items():
+                query.addQueryItem(str(key), str(value))
+            url.setQuery(query)
+
+        request = QNetworkRequest(url)
+        request.setTransferTimeout(int(self._client.timeout_for(endpoint) * 1000))
+
+        if json is not None:
+            request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
+            body = QByteArray(jsonlib.dumps(json).encode())
+            network_reply = self._manager.sendCustomRequest(request, method.encode(), body)
+        else:
+            network_reply = self._manager.sendCustomRequest(request, method.encode())
+
+        self._track(reply, network_reply.abort)
+
+        def on_finished():
+            network_reply.deleteLater()
+            if reply.is_cancelled:
+                return
+
+            error = network_reply.error()
+            status = network_reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+            retryable = status in RETRY_STATUS_CODES or (
+                status is None and error != QNetworkReply.NetworkError.NoError
+            )
+            if method == "GET" and retryable and attempt < config.api_retries:
+                delay = int(config.api_backoff * (2 ** attempt) * 1000)
+                QTimer.singleShot(delay, lambda: self._send(reply, method, endpoint, params, json, attempt + 1))
+                return
+
+            if status is not None:
+                reply._resolve(parse_response(int(status), bytes(network_reply.readAll())))
+            elif error in (QNetworkReply.NetworkError.OperationCanceledError,
+                           QNetworkReply.NetworkError.TimeoutError):
+                reply._resolve({"status": False, "network": True, "message": "Server javob bermadi (timeout)"})
+            else:
+                reply._resolve({
+                    "status": False,
+                    "network": True,
+                    "message": f"Ulanish xatoligi: {network_reply.errorString()}"
+                })
+
+        network_reply.finished.connect(on_finished)
+
+    def get(self, endpoint: str, params: dict = None, tag: str = None) -> ApiReply:
+        return self.request("GET", endpoint, params=params, tag=tag)
+
+    def post(self, endpoint: str, json: dict = None, tag: str = None) -> ApiReply:
+        return self.request("POST", endpoint, json=json, tag=tag)
+
+    def _chain(self, source: ApiReply, tag: str, then: Callable[[ApiReply, dict], None]) -> ApiReply:
+        """source natijasini then(reply, result) orqali yangi ApiReply'ga o'tkazish"""
+        reply = ApiReply(tag)
+        reply._on_cancel = source.cancel
+        self._submit(reply, lambda: self._register(reply))
+        source.add_done_callback(lambda result: then(reply, result))
+        return reply
+
+    def load_tests(self, tag: str = None) -> ApiReply:
+        """Testlar ro'yxati (APIClient.load_tests natijasi formatida)"""
+        return self._chain(
+            self.get("load-tests/", tag=tag), tag,
+            lambda reply, result: reply._resolve(APIClient.tests_result(result))
+        )
+
+    def staff_gallery(self, since: int = 0, tag: str = None) -> ApiReply:
+        return self.get("users/face_gallery/", params={"since": since}, tag=tag)
+
+    def verify_face(self, embedding, embedding_format: str = None, tag: str = None) -> ApiReply:
+        """Yuzni server orqali tekshirish (ixcham format, rad etilsa - eski format)"""
+        embedding_format = self._client.embedding_format(embedding_format)
+        if embedding_format == "legacy":
+            return self.post(VERIFY_FACE_ENDPOINT, json=legacy_payload(embedding), tag=tag)
+
+        def then(reply: ApiReply, result: dict):
+            if not format_rejected(result):
+                reply._resolve(result)
+                return
+
+            def on_legacy(legacy_result: dict):
+                self._client.remember_format(embedding_format, legacy_result)
+                reply._resolve(legacy_result)
+
+            fallback = self.post(VERIFY_FACE_ENDPOINT, json=legacy_payload(embedding), tag=tag)
+            reply._on_cancel = fallback.cancel
+            fallback.add_done_callback(on_legacy)
+
+        compact = self.post(VERIFY_FACE_ENDPOINT, json=embedding_payload(embedding, embedding_format), tag=tag)
+        return self._chain(compact, tag, then)
+
+    # TCP
+
+    def probe_tcp(self, host: str, port: int, timeout: float = 2.0, tag: str = None) -> ApiReply:
+        """TCP ulanish tekshiruvi - natija True/False"""
+        reply = ApiReply(tag)
+        return self._submit(reply, lambda: self._connect(reply, host, port, timeout))
+
+    def _connect(self, reply: ApiReply, host: str, port: int, timeout: float):
+        socket = QTcpSocket(self)
+        timer = QTimer(socket)
+        timer.setSingleShot(True)
+
+        def done(ok: bool):
+            if reply.is_finished:
+                return
+            timer.stop()
+            socket.abort()
+            socket.deleteLater()
+            reply._resolve(ok)
+
+        def abort():
+            timer.stop()
+            socket.abort()
+            socket.deleteLater()
+
+        self._track(reply, abort)
+        socket.connected.connect(lambda: done(True))
+        socket.errorOccurred.connect(lambda error: done(False))
+        timer.timeout.connect(lambda: done(False))
+
+        timer.start(int(timeout * 1000))
+        socket.connectToHost(host, port)
+
+    def cancel(self, tag: str = None) -> int:
+        """tag bo'yicha (None - barcha) faol so'rovlarni bekor qilish"""
+        replies = [reply for reply in self._active if tag is None or reply.tag == tag]
+        return sum(reply.cancel() for reply in replies)
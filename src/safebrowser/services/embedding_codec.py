@@ -0,0 +1,116 @@
+"""
+Embedding Codec - embeddinglarni server'ga ixcham yuborish formati
+512 ta float'ni matn ko'rinishidagi ro'yxat (~10 KB) o'rniga
+versiyalangan ikkilik format (int8 - 528 bayt, float16 - 1040 bayt).
+
+Ikkilik format (little-endian, 16 bayt sarlavha + ma'lumot):
+    magic   3s   b"SBE"
+    version B    1
+    dtype   B    1 = int8, 2 = float16
+    flags   B    0 (zaxira)
+    dim     H    embedding o'lchami
+    norm    f    asl embedding normasi (L2)
+    scale   f    int8 uchun kvant qadami (float16 uchun 1.0)
+    data         dim ta int8 yoki float16 - normallashtirilgan vektor
+
+JSON'da: {"embedding_b64": <base64>, "embedding_format": "sbe1"}
+Eski format (legacy): {"embedding": "[0.1, 0.2, ...]"}
+"""
+import base64
+import struct
+from typing import Union
+
+import numpy as np
+
+
+MAGIC = b"SBE"
+VERSION = 1
+WIRE_FORMAT = f"sbe{VERSION}"
+
+DTYPE_INT8 = 1
+DTYPE_FLOAT16 = 2
+DTYPES = {"int8": DTYPE_INT8, "float16": DTYPE_FLOAT16}
+FORMATS = ("int8", "float16", "legacy")
+
+_HEADER = struct.Struct("<3sBBBHff")
+_NUMPY_DTYPES = {DTYPE_INT8: np.dtype("<i1"), DTYPE_FLOAT16: np.dtype("<f2")}
+
+
+class EmbeddingCodecError(ValueError):
+    """Noto'g'ri yoki qo'llab-quvvatlanmaydigan embedding ma'lumoti"""
+
+
+def encode(embedding, dtype: str = "int8") -> bytes:
+    """
+    Embedding'ni ikkilik formatga o'tkazish
+
+    Vektor normallashtirilib saqlanadi, asl norma sarlavhada -
+    cosine o'xshashlik faqat yo'nalishga bog'liq, norma esa tiklanadi.
+    """
+    if dtype not in DTYPES:
+        raise EmbeddingCodecError(f"Noma'lum dtype: {dtype}")
+
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vector))
+    unit = vector / norm if norm > 0 else vector
+
+    if dtype == "int8":
+        peak = float(np.max(np.abs(unit))) if len(unit) else 0.0
+        scale = peak / 127 if peak > 0 else 1.0
+        data = np.clip(np.rint(unit / scale), -127, 127).astype("<i1")
+    else:
+        scale = 1.0
+        data = unit.astype("<f2")
+
+    header = _HEADER.pack(MAGIC, VERSION, DTYPES[dtype], 0, len(vector), norm, scale)
+    return header + data.tobytes()
+
+
+def decode(payload: bytes) -> np.ndarray:
+    """Ikkilik formatdan float32 embedding (asl norma bilan)"""
+    if len(payload) < _HEADER.size:
+        raise EmbeddingCodecError("Ma'lumot juda qisqa")
+
+    magic, version, dtype, _, dim, norm, scale = _HEADER.unpack_from(payload)
+    if magic != MAGIC:
+        raise EmbeddingCodecError("Embedding formati emas")
+    if version != VERSION:
+        raise EmbeddingCodecError(f"Qo'llab-quvvatlanmaydigan versiya: {version}")
+    if dtype not in _NUMPY_DTYPES:
+        raise EmbeddingCodecError(f"Noma'lum dtype: {dtype}")
+
+    numpy_dtype = _NUMPY_DTYPES[dtype]
+    if len(payload) != _HEADER.size + dim * numpy_dtype.itemsize:
+        raise EmbeddingCodecError("Ma'lumot uzunligi sarlavhaga mos emas")
+
+    unit = np.frombuffer(payload, dtype=numpy_dtype, count=dim, offset=_HEADER.size).astype(np.float32)
+    if dtype == DTYPE_INT8:
+        unit *= scale
+        length = float(np.linalg.norm(unit))
+        if length > 0:
+            unit /= length
+    return unit * norm if norm > 0 else unit
+
+
+def to_base64(embedding, dtype: str = "int8") -> str:
+    return base64.b64encode(encode(embedding, dtype)).decode("ascii")
+
+
+def from_base64(text: Union[str, bytes]) -> np.ndarray:
+    try:
+        payload = base64.b64decode(text, validate=True)
+    except ValueError as e:
+        raise EmbeddingCodecError(f"Base64 xatoligi: {e}")
+    return decode(payload)
+
+
+def legacy_payload(embedding) -> dict:
+    """Eski format: Python ro'yxatining matn ko'rinishi"""
+    return {"embedding": str(np.asarray(embedding, dtype=np.float32).ravel().tolist())}
+
+
+def embedding_payload(embedding, fmt: str = "int8") -> dict:
+    """So'rov JSON'i uchun embedding maydonlari (fmt: int8, float16 yoki legacy)"""
+    if fmt == "legacy":
+        return legacy_payload(embedding)
+    return {"embedding_b64": to_base64(embedding, fmt), "embedding_format": WIRE_FORMAT}
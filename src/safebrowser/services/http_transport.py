@@ -0,0 +1,95 @@
+"""
+HTTP Transport - jarayon bo'yicha yagona HTTP sessiya
+Barcha server so'rovlari bitta requests.Session orqali: keep-alive
+ulanishlar pool'i (har bir yuz tekshiruvida TCP/TLS handshake yo'q),
+idempotent so'rovlar uchun backoff bilan qayta urinish.
+
+Sozlamalar config.ini [api]: retries, backoff, pool_size.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Vaqtinchalik server xatolari - idempotent so'rovlar qayta yuboriladi
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+class HttpTransport:
+    """
+    Umumiy requests.Session (lazy yaratiladi)
+
+    Ulanishga oid xatolar (so'rov serverga yetmagan) har qanday metod
+    uchun qayta uriniladi; javob kelmagan yoki 502/503/504 bo'lsa -
+    faqat idempotent metodlar (GET, HEAD, PUT, DELETE, OPTIONS).
+    """
+
+    def __init__(self, retries: int = None, backoff: float = None, pool_size: int = None):
+        self._retries = retries
+        self._backoff = backoff
+        self._pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.errors = 0
+
+    def _create_session(self) -> requests.Session:
+        # Lazy import to avoid circular dependency
+        from safebrowser.config import config
+
+        retries = self._retries if self._retries is not None else config.api_retries
+        backoff = self._backoff if self._backoff is not None else config.api_backoff
+        pool_size = self._pool_size or config.api_pool_size
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def request(self, method: str, url: str, timeout: float, **kwargs) -> requests.Response:
+        """So'rov yuborish (xatolar requests istisnolari sifatida chiqadi)"""
+        with self._lock:
+            self.requests += 1
+        try:
+            return self.session.request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self.errors += 1
+            raise
+
+    def close(self):
+        """Ulanishlarni yopish (keyingi so'rov yangi sessiya yaratadi)"""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+# Jarayon bo'yicha yagona transport (barcha APIClient'lar uchun)
+transport = HttpTransport()
@@ -25,7 +25,6 @@ from safebrowser.workers import (
     MonitorWorker,
     ScreenRecorderWorker,
     AppLoaderWorker,
-    TestLoaderWorker,
 )
 from safebrowser.utils.graphics import (
     create_success_pixmap,
@@ -34,7 +33,7 @@ from safebrowser.utils.graphics import (
 )
 from safebrowser.utils.system import get_disk_with_most_free_space
 from safebrowser.services.api_client import APIClient, BASE_URL
-from safebrowser.core.face_analyzer import FaceAnalyzer
+from safebrowser.services.async_api_client import AsyncAPIClient
 from safebrowser.utils.system import is_windows, is_linux, is_macos, get_platform_name
 
 # PyQt6 imports
@@ -50,7 +49,7 @@ except ImportError:
     KEYBOARD_AVAILABLE = False
     print("keyboard moduli mavjud emas - tugmalarni bloklash ishlamaydi")
 
-from PyQt6.QtCore import Qt, QUrl, QRegularExpression, pyqtSlot
+from PyQt6.QtCore import Qt, QThread, QUrl, QRegularExpression, pyqtSlot
 from PyQt6.QtGui import (
     QPixmap, QRegularExpressionValidator, QImage, QPainter,
     QColor, QFont, QPen, QBrush, QLinearGradient
@@ -184,6 +183,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.warning_text = None
         self.app = None
         self.face_analyzer = None
+        self.staff_face_pending = False
         self.state = None
 
         # Settings
@@ -200,39 +200,74 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def _init_workers(self):
         """Worker'larni boshlash"""
-        self.checker_internet_worker = InternetCheckWorker(interval=5)
+        # Bloklamaydigan API client - so'rovlar sahifa nomi (tag) bilan,
+        # sahifa almashganda bekor qilinadi
+        self.api = AsyncAPIClient(parent=self)
+        self.current_page_name = self.stack.currentWidget().objectName()
+        self.stack.currentChanged.connect(self._on_page_changed)
+
+        self.checker_internet_worker = InternetCheckWorker(interval=5, api=self.api, parent=self)
         self.checker_internet_worker.status_changed.connect(self._on_internet_status)
         self.checker_internet_worker.start()
 
         self.checker_monitor_worker = MonitorWorker(interval=1)
-        self.checker_camera_worker = CameraCheckerWorker(interval=3)
+        self.checker_camera_worker = CameraCheckerWorker(interval=3, api=self.api, parent=self)
 
         self.face_detector_worker = None
         self.face_identification_worker = None
         self.face_staff_worker = None
         self.screen_recorder_worker = None
         self.load_app_worker = None
-        self.test_loader_worker = None
+        self.tests_reply = None
 
         # InsightFace modelini yuklash
         self._init_face_analyzer()
 
     def _init_face_analyzer(self):
-        """InsightFace modelini yuklash"""
+        """InsightFace modelini background'da yuklash (oyna bloklanmaydi)"""
         try:
             print("InsightFace modeli yuklanmoqda...")
-            self.face_analyzer = FaceAnalyzer(det_size=(320, 320), gpu_id=-1)
+            self.load_app_worker = AppLoaderWorker(det_size=(320, 320))
+            self.load_app_worker.progress.connect(self._on_model_progress)
+            self.load_app_worker.app.connect(self._on_face_analyzer_ready)
+            self.load_app_worker.start()
+        except Exception as e:
+            print(f"FaceAnalyzer init error: {e}")
+            self.app = None
+            self.face_analyzer = None
+
+    @property
+    def is_model_ready(self) -> bool:
+        return self.face_analyzer is not None and self.app is not None
 
-            if self.face_analyzer.initialize():
+    def _is_model_loading(self) -> bool:
+        return self.load_app_worker is not None and self.load_app_worker.isRunning()
+
+    @pyqtSlot(object)
+    def _on_model_progress(self, data: dict):
+        """Model yuklash jarayoni"""
+        if self.staff_face_pending:
+            self.label_response.setText(data.get("message", ""))
+
+    @pyqtSlot(object)
+    def _on_face_analyzer_ready(self, data: dict):
+        """Model yuklanib, warm-up tugaganda"""
+        try:
+            if data.get("status"):
+                self.face_analyzer = data.get("app")
                 self.app = self.face_analyzer.app
                 print("InsightFace modeli muvaffaqiyatli yuklandi!")
             else:
                 self.app = None
-                print("InsightFace modelini yuklashda xatolik!")
+                self.face_analyzer = None
+                print(f"InsightFace modelini yuklashda xatolik! {data.get('error', '')}")
+
+            # Model kutayotgan sahifa bo'lsa - davom ettirish
+            if self.staff_face_pending:
+                self.staff_face_pending = False
+                self._start_staff_face_recognition()
         except Exception as e:
-            print(f"FaceAnalyzer init error: {e}")
-            self.app = None
-            self.face_analyzer = None
+            print(f"Face analyzer ready handler error: {e}")
 
     def _init_ui_components(self):
         """UI komponentlarini sozlash"""
@@ -297,11 +332,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             print(f"ID card setup error: {e}")
 
     def _load_tests(self):
-        """Testlarni yuklash"""
+        """Testlarni yuklash (bloklamaydigan so'rov, joriy sahifa tag'i bilan)"""
         try:
-            self.test_loader_worker = TestLoaderWorker()
-            self.test_loader_worker.result.connect(self._on_tests_loaded)
-            self.test_loader_worker.start()
+            if self.tests_reply is not None:
+                self.tests_reply.cancel()
+            self.tests_reply = self.api.load_tests(tag=self.current_page_name)
+            self.tests_reply.finished.connect(self._on_tests_loaded)
         except Exception as e:
             print(f"Test loader error: {e}")
 
@@ -367,18 +403,22 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.face_detector_worker,
             self.screen_recorder_worker,
             self.load_app_worker,
-            self.test_loader_worker,
         ]
 
         for worker in workers:
             if worker:
                 try:
-                    if hasattr(worker, 'isRunning') and worker.isRunning():
+                    if not isinstance(worker, QThread):
+                        # QTimer asosidagi checker'lar - kutiladigan thread yo'q
+                        worker.stop()
+                    elif worker.isRunning():
                         worker.stop()
                         worker.wait(1000)
                 except Exception as e:
                     print(f"Worker stop error: {e}")
 
+        self.api.cancel()
+
     # Event handlers
     def keyPressEvent(self, event):
         """Tugma bosilganda"""
@@ -411,6 +451,17 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         except Exception as e:
             print(f"Internet checker error: {e}")
 
+    @pyqtSlot(int)
+    def _on_page_changed(self, index: int):
+        """Sahifa almashganda eski sahifaning kutilayotgan so'rovlarini bekor qilish"""
+        page_name = self.stack.widget(index).objectName()
+        # Internet uzilishi vaqtinchalik - oldingi sahifaga qaytilganda
+        # (page_name == current_page_name) uning so'rovlari kerak bo'ladi
+        if page_name in ('page_no_internet', self.current_page_name):
+            return
+        self.api.cancel(self.current_page_name)
+        self.current_page_name = page_name
+
     def _next_page_by_name(self, page_name: str):
         """Sahifaga o'tish"""
         for i in range(self.stack.count()):
@@ -471,7 +522,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     def _start_staff_face_recognition(self):
         """Xodim yuz tekshiruvini boshlash"""
         try:
-            if self.app is None:
+            if not self.is_model_ready:
+                if self._is_model_loading():
+                    # Model tayyor bo'lganda avtomatik boshlanadi
+                    self.staff_face_pending = True
+                    self.label_response.setText("Yuz aniqlash modeli yuklanmoqda...")
+                    return
                 self.show_message("Xatolik", "Yuz aniqlash modeli yuklanmagan!", 0)
                 return
 
@@ -483,12 +539,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 self.face_staff_worker.stop()
 
             # Face Detector Worker'ni boshlash
-            self.face_detector_worker = FaceDetectorWorker(app=self.app, camera_index=0)
+            self.face_detector_worker = FaceDetectorWorker(app=self.face_analyzer, camera_index=0)
             self.face_detector_worker.face_detected.connect(self._on_staff_face_detected)
             self.face_detector_worker.start()
 
             # Staff Face ID Worker'ni boshlash
-            self.face_staff_worker = FaceIdStaffWorker(app=self.app)
+            self.face_staff_worker = FaceIdStaffWorker(app=self.app, api=self.api)
             self.face_staff_worker.result_ready.connect(self._on_staff_face_result)
             self.face_staff_worker.start()
 
@@ -516,15 +572,17 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 )
                 self.label_face.setPixmap(scaled)
 
-            # Yuz aniqlansa, staff worker'ga yuborish
-            if has_face and cropped_face is not None and self.face_staff_worker:
+            # Embedding kelgan namunani staff worker'ga yuborish
+            # (detector uni allaqachon hisoblagan - qayta inference shart emas)
+            embedding = data.get("embedding")
+            if has_face and embedding is not None and self.face_staff_worker:
                 # RGB formatga o'tkazish
-                if len(cropped_face.shape) == 3:
+                if cropped_face is not None and len(cropped_face.shape) == 3:
                     rgb_face = cv2.cvtColor(cropped_face, cv2.COLOR_BGR2RGB)
                 else:
                     rgb_face = cropped_face
 
-                self.face_staff_worker.set_face(cropped_face=rgb_face)
+                self.face_staff_worker.set_face(cropped_face=rgb_face, embedding=embedding)
 
         except Exception as e:
             print(f"Staff face detected handler error: {e}")
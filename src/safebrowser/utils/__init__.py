@@ -34,6 +34,7 @@ __all__ = [
     "get_recordings_dir",
     "get_disk_with_most_free_space",
     "get_system_info",
+    "get_hardware_fingerprint",
 ]
 
 
@@ -51,7 +52,7 @@ def __getattr__(name):
         "get_platform", "is_windows", "is_linux", "is_macos", "get_platform_name",
         "get_camera_backend", "open_camera", "get_app_data_dir", "get_config_dir",
         "get_models_dir", "get_recordings_dir", "get_disk_with_most_free_space",
-        "get_system_info"
+        "get_system_info", "get_hardware_fingerprint"
     ):
         from safebrowser.utils import system
         return getattr(system, name)
@@ -6,49 +6,40 @@ Cross-platform qo'llab-quvvatlash
 import cv2
 import numpy as np
 from PyQt6.QtGui import QImage
-from insightface.app import FaceAnalysis
 
 
-def init_face_analyzer(det_size: tuple = (640, 640), gpu_id: int = -1):
+def init_face_analyzer(det_size: tuple = (640, 640), gpu_id: int = -1, providers: list = None):
     """
-    InsightFace FaceAnalysis modelini ishga tushirish (cross-platform)
+    InsightFace modellarini ishga tushirish (cross-platform)
+
+    Modellar FaceAnalyzer orqali umumiy registry'dan olinadi -
+    boshqa joyda yuklangan bo'lsa qayta yuklanmaydi.
+    GPU ishga tushmasa - CPU, det_size=(320, 320).
 
     Args:
         det_size: Detection size (kichikroq = tezroq, lekin kamroq aniqlik)
         gpu_id: -1 = CPU, 0+ = GPU
+        providers: ONNX Runtime provider'lari (berilsa gpu_id o'rniga)
 
     Returns:
-        FaceAnalysis app instance
+        FaceAnalyzer (FaceAnalysis bilan mos: get, det_model, models)
+        yoki None - modellar yuklanmasa
     """
     # Lazy import to avoid circular dependency
-    from safebrowser.utils.system import get_models_dir
-
-    # Cross-platform models directory
-    models_path = str(get_models_dir())
-
-    try:
-        if gpu_id >= 0:
-            providers = ['CUDAExecutionProvider', 'CPUExecutionProvider']
-        else:
-            providers = ['CPUExecutionProvider']
-
-        app = FaceAnalysis(
-            providers=providers,
-            root=models_path,
-            allowed_modules=['detection', 'recognition']
-        )
-        app.prepare(ctx_id=gpu_id, det_size=det_size)
-
-        print(f"FaceAnalysis initialized: det_size={det_size}, gpu_id={gpu_id}")
-        return app
-    except Exception as e:
-        print(f"FaceAnalysis init error: {e}")
-        app = FaceAnalysis(
-            providers=['CPUExecutionProvider'],
-            root=models_path
-        )
-        app.prepare(ctx_id=-1, det_size=(320, 320))
-        return app
+    from safebrowser.core.face_analyzer import FaceAnalyzer
+    from safebrowser.core.model_registry import CPU_PROVIDERS, providers_for_device
+
+    requested = tuple(providers) if providers else providers_for_device(gpu_id)
+    analyzer = FaceAnalyzer(det_size=det_size, gpu_id=gpu_id, providers=providers)
+    if not analyzer.initialize():
+        print("FaceAnalysis init error: modellar yuklanmadi")
+        return None
+
+    # FaceAnalyzer CPU'ga o'tgan bo'lsa - CPU uchun kichikroq detection
+    if requested != CPU_PROVIDERS and analyzer.providers == CPU_PROVIDERS:
+        analyzer.det_size = (320, 320)
+        print("FaceAnalysis CPU fallback: det_size=(320, 320)")
+    return analyzer
 
 
 def cosine_similarity(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
@@ -87,15 +78,17 @@ def ready_frame_for_gui(frame: np.ndarray) -> QImage:
     if frame is None:
         return QImage()
 
-    rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    h, w, ch = rgb_image.shape
-    bytes_per_line = ch * w
+    # BGR888 - rang konvertatsiyasiz; QImage massivni cleanup'gacha ushlab turadi
+    frame = np.ascontiguousarray(frame)
+    h, w = frame.shape[:2]
 
     return QImage(
-        rgb_image.data,
+        frame.data,
         w, h,
-        bytes_per_line,
-        QImage.Format.Format_RGB888
+        frame.strides[0],
+        QImage.Format.Format_BGR888,
+        lambda _info, _frame=frame: None,
+        None
     )
 
 
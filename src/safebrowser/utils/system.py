@@ -223,3 +223,25 @@ def get_system_info() -> dict:
         "memory_available": psutil.virtual_memory().available,
         "memory_percent": psutil.virtual_memory().percent,
     }
+
+
+def get_hardware_fingerprint(extra: str = "") -> str:
+    """
+    Qurilma identifikatori (qisqa hash)
+
+    Platforma, protsessor, yadrolar soni va xotira hajmidan tuziladi.
+    Apparatga bog'liq keshlar (provider tanlovi, optimallashtirilgan
+    graflar) boshqa kompyuterda qayta yaratilishi uchun ishlatiladi.
+    """
+    import hashlib
+
+    parts = [
+        platform.system(),
+        platform.machine(),
+        platform.processor(),
+        str(psutil.cpu_count(logical=False)),
+        str(psutil.cpu_count()),
+        str(psutil.virtual_memory().total // (1 << 30)),
+        extra,
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
@@ -12,7 +12,7 @@ from safebrowser.workers.face_recognition import (
 from safebrowser.workers.internet_checker import InternetCheckWorker
 from safebrowser.workers.monitor_checker import MonitorWorker
 from safebrowser.workers.screen_recorder import ScreenRecorderWorker
-from safebrowser.workers.loader import AppLoaderWorker, TestLoaderWorker
+from safebrowser.workers.loader import AppLoaderWorker
 
 __all__ = [
     "CameraCheckerWorker",
@@ -24,5 +24,4 @@ __all__ = [
     "MonitorWorker",
     "ScreenRecorderWorker",
     "AppLoaderWorker",
-    "TestLoaderWorker",
 ]
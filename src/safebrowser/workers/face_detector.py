@@ -2,12 +2,28 @@
 Face Detector Worker
 InsightFace asosidagi yuz aniqlash
 Cross-platform qo'llab-quvvatlash
+
+Pipeline: kamera (CaptureStage) -> aniqlash (InferenceStage) -> ko'rsatish (run)
+Preview frame'lari bufer pulidan olinadi va QImage'ga nusxasiz beriladi.
 """
 import sys
+import time
 import cv2
 import numpy as np
 from PyQt6.QtCore import QThread, pyqtSignal, QMutex, QMutexLocker
-from PyQt6.QtGui import QImage
+
+from safebrowser.core.face_analyzer import FaceAnalyzer
+from safebrowser.core.inference_executor import executor, PRIORITY_PREVIEW, PRIORITY_VERIFY
+from safebrowser.core.scheduler import LatencyBudgetScheduler
+from safebrowser.core.tracker import FaceTracker
+from safebrowser.core.roi_detector import RoiDetector
+from safebrowser.core.quality import FaceQualityGate
+from safebrowser.workers.frame_pipeline import (
+    LatestSlot,
+    StageStats,
+    CaptureStage,
+    InferenceStage,
+)
 
 
 class FaceDetectorWorker(QThread):
@@ -15,8 +31,11 @@ class FaceDetectorWorker(QThread):
     InsightFace asosidagi yuz aniqlash worker
     - Kam CPU/GPU resurs ishlatadi
     - Real-time kamera stream uchun optimallashtirilgan
+    - Kamera, aniqlash va ko'rsatish alohida bosqichlarda ishlaydi
     """
     face_detected = pyqtSignal(object)
+    stats_updated = pyqtSignal(object)
+    scheduler_status = pyqtSignal(object)
 
     def __init__(self, app=None, camera_index: int = 0):
         super().__init__()
@@ -24,22 +43,83 @@ class FaceDetectorWorker(QThread):
         self._lock = QMutex()
 
         self.app = app
+        self.analyzer = FaceAnalyzer.from_app(app)
         self.camera_index = camera_index
 
         # Performance settings
-        self.frame_skip = 2
         self.frame_counter = 0
         self.last_face_box = None
         self.detection_size = (320, 320)
+        self.stats_interval = 1.0
+        self.scheduler = self._create_scheduler()
+        self.tracker = self._create_tracker()
+        self.roi_detector = self._create_roi_detector()
+        self._last_detected_bbox = None
+        self.embedding_interval = self._embedding_interval()
+        self.quality_gate = FaceQualityGate.from_config()
+        self._last_embedding_time = 0.0
+
+        # Pipeline stages
+        self._frame_slot = None
+        self._result_slot = None
+        self._capture_stage = None
+        self._inference_stage = None
+        self._render_stats = StageStats("render")
+        self._gray_buffers = [None, None]
+        self._gray_index = 0
 
         # Camera settings
         self.cap = None
         self.frame_width = 640
         self.frame_height = 480
 
+    def _create_scheduler(self) -> LatencyBudgetScheduler:
+        """Config'dagi byudjet bo'yicha scheduler yaratish"""
+        from safebrowser.config import config
+
+        return LatencyBudgetScheduler(
+            target_preview_fps=config.target_preview_fps,
+            target_detection_hz=config.target_detection_hz,
+            max_detection_hz=config.max_detection_hz,
+            det_size=self.detection_size,
+            adapt_det_size=config.adaptive_det_size
+        )
+
+    def _create_tracker(self):
+        """Keyframe'lar orasidagi tracker (config'da o'chirilishi mumkin)"""
+        from safebrowser.config import config
+
+        if not config.tracker_enabled:
+            return None
+        return FaceTracker(keyframe_interval=config.keyframe_interval)
+
+    @staticmethod
+    def _embedding_interval() -> float:
+        from safebrowser.config import config
+        return config.embedding_interval
+
+    def _create_roi_detector(self):
+        """ROI rejimidagi qayta aniqlash (config'da yoqiladi)"""
+        from safebrowser.config import config
+
+        if not config.roi_detection:
+            return None
+        size = config.roi_input_size
+        return RoiDetector(
+            roi_size=(size, size),
+            full_scan_interval=config.full_scan_interval
+        )
+
     def set_app(self, app):
         """InsightFace app'ni o'rnatish"""
+        self._release_analyzer()
         self.app = app
+        self.analyzer = FaceAnalyzer.from_app(app)
+
+    def _release_analyzer(self):
+        """Model handle'larini registry'ga qaytarish"""
+        if self.analyzer is not None:
+            self.analyzer.release()
 
     def is_running(self) -> bool:
         with QMutexLocker(self._lock):
@@ -74,17 +154,81 @@ class FaceDetectorWorker(QThread):
             print(f"Camera init error: {e}")
             return False
 
-    def _detect_face_insightface(self, frame: np.ndarray):
-        """InsightFace yordamida yuz aniqlash"""
-        if self.app is None:
-            return None, None
+    def _run_detector(self, rgb_frame: np.ndarray) -> list:
+        """
+        Detector'ni ishga tushirish (faqat detection, embedding'siz)
+
+        Preview uchun bbox va kps yetarli - ArcFace embedding
+        hisoblanmaydi. Scheduler detector o'lchamini boshqarishi va
+        ROI rejimi hudud bo'yicha cheklashi mumkin.
+        """
+        analyzer = self.analyzer
+        if analyzer is None:
+            return []
+
+        full_size = None
+        if self.scheduler.adapt_det_size:
+            full_size = self.detection_size = self.scheduler.det_size
+
+        if self.roi_detector is not None and analyzer.det_model is not None:
+            bboxes, kpss = self.roi_detector.detect(
+                analyzer.det_model,
+                rgb_frame,
+                self._prior_bbox(),
+                full_size or analyzer.det_size
+            )
+            return analyzer.faces_from_detections(bboxes, kpss)
+
+        return analyzer.detect(rgb_frame, input_size=full_size)
+
+    def _prior_bbox(self):
+        """ROI uchun oxirgi ma'lum ramka (tracker yoki oxirgi aniqlash)"""
+        if self.tracker is not None and self.tracker.is_tracking:
+            return self.tracker.bbox
+        return self._last_detected_bbox
+
+    def _add_margin(self, bbox, frame_shape) -> tuple:
+        """Ramkaga margin qo'shish (frame chegarasida)"""
+        x1, y1, x2, y2 = (int(v) for v in bbox[:4])
+        h, w = frame_shape[:2]
+        margin_x, margin_y = 25, 40
+        x1 = max(0, x1 - margin_x)
+        y1 = max(0, y1 - margin_y)
+        x2 = min(w, x2 + margin_x)
+        y2 = min(h, y2 + margin_y)
+        return x1, y1, x2, y2
+
+    def _detect_face_insightface(self, rgb_frame: np.ndarray) -> dict:
+        """
+        InsightFace yordamida yuz aniqlash
+
+        Umumiy inference navbatida faqat detector eng yuqori ustuvorlik
+        (PRIORITY_PREVIEW) bilan ishlaydi. Tanlangan yuz embedding'i -
+        alohida PRIORITY_VERIFY vazifa: verification workerlari
+        yuz ko'rinib turganda ham navbatda qolib ketmaydi.
+
+        Args:
+            rgb_frame: Capture bosqichi tayyorlagan RGB frame
+
+        Returns:
+            {"box": margin'li ramka, "crop": kesilgan yuz (BGR),
+             "face": eng katta yuz, "embedding": embedding yoki None,
+             "quality": sifat ko'rsatkichlari yoki None,
+             "gray": tracker uchun grayscale frame}
+        """
+        result = {
+            "box": None, "crop": None, "face": None,
+            "embedding": None, "quality": None, "gray": None
+        }
+        if self.analyzer is None:
+            return result
 
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            faces = self.app.get(rgb_frame)
+            faces = executor.run(self._run_detector, rgb_frame, priority=PRIORITY_PREVIEW)
 
             if not faces:
-                return None, None
+                self._last_detected_bbox = None
+                return result
 
             # Eng katta yuzni tanlash
             best_face = max(
@@ -92,24 +236,99 @@ class FaceDetectorWorker(QThread):
                 key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1])
             )
 
-            bbox = best_face.bbox.astype(int)
-            x1, y1, x2, y2 = bbox
-
-            # Margin qo'shish
-            h, w = frame.shape[:2]
-            margin_x, margin_y = 25, 40
-            x1 = max(0, x1 - margin_x)
-            y1 = max(0, y1 - margin_y)
-            x2 = min(w, x2 + margin_x)
-            y2 = min(h, y2 + margin_y)
-
-            cropped_face = frame[y1:y2, x1:x2].copy()
-            return (x1, y1, x2, y2), cropped_face
+            self._last_detected_bbox = best_face.bbox
+            x1, y1, x2, y2 = self._add_margin(best_face.bbox, rgb_frame.shape)
+            result["box"] = (x1, y1, x2, y2)
+            result["crop"] = cv2.cvtColor(rgb_frame[y1:y2, x1:x2], cv2.COLOR_RGB2BGR)
+            result["face"] = best_face
+            result["embedding"], result["quality"] = self._maybe_embed(rgb_frame, best_face)
+            if self.tracker is not None:
+                result["gray"] = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+            return result
 
         except Exception as e:
             print(f"Face detection error: {e}")
+            return result
+
+    def _maybe_embed(self, rgb_frame: np.ndarray, face) -> tuple:
+        """
+        Embedding'ni embedding_interval da bir marta hisoblash
+
+        Verification workerlar shu embedding'dan foydalanadi va
+        kesilgan yuzda detection + recognition'ni qayta ishlatmaydi.
+        Sifat filtridan o'tmagan yuz embedding qilinmaydi - keyingi
+        frame'da yana urinib ko'riladi.
+
+        Returns:
+            (embedding yoki None, sifat ko'rsatkichlari yoki None)
+        """
+        now = time.monotonic()
+        if now - self._last_embedding_time < self.embedding_interval:
             return None, None
 
+        quality = None
+        if self.quality_gate is not None:
+            passed, reason, metrics = self.quality_gate.check(rgb_frame, face)
+            quality = {"passed": passed, "reason": reason, **metrics}
+            if not passed:
+                return None, quality
+
+        embedding = executor.run(
+            self.analyzer.get_face_embedding, rgb_frame, face, priority=PRIORITY_VERIFY
+        )
+        if embedding is not None:
+            self._last_embedding_time = now
+        return embedding, quality
+
+    def _needs_detection(self) -> bool:
+        """Inference bosqichi uchun: detector ishlatish kerakmi"""
+        if self.tracker is None:
+            return True
+        return self.tracker.needs_keyframe()
+
+    @staticmethod
+    def _face_sample(result: dict, timestamp: float) -> dict:
+        """
+        Detector natijasidan verification uchun ma'lumotlar
+
+        embedding - RGB frame bo'yicha ArcFace embedding (har safar emas),
+        quality - sifat filtri natijasi, kps - 5 ta keypoint,
+        timestamp - frame olingan vaqt (monotonic).
+        """
+        face = result["face"]
+        if face is None:
+            return {}
+        return {
+            "embedding": result["embedding"],
+            "quality": result["quality"],
+            "kps": face.kps,
+            "det_score": float(face.det_score),
+            "timestamp": timestamp,
+        }
+
+    def _apply_result(self, result: dict, timestamp: float):
+        """Yangi aniqlash natijasi bilan tracker'ni yangilash (keyframe)"""
+        face = result["face"]
+        self.last_face_box = result["box"]
+
+        if self.tracker is None:
+            return
+
+        if face is None or face.kps is None or result["gray"] is None:
+            self.tracker.clear()
+            return
+
+        self.tracker.reset(result["gray"], face.bbox, face.kps, timestamp)
+
+    def _track_face(self, frame: np.ndarray):
+        """Keyframe'lar orasida ramkani optical flow bilan yangilash"""
+        if self.tracker is None or not self.tracker.is_tracking:
+            return
+
+        tracked = self.tracker.update(self._to_gray(frame))
+        if tracked is not None:
+            self.last_face_box = self._add_margin(tracked, frame.shape)
+
     def _draw_face_box(self, frame: np.ndarray, box: tuple):
         """Yuz atrofiga ramka chizish"""
         if box is None:
@@ -132,55 +351,146 @@ class FaceDetectorWorker(QThread):
 
         return frame
 
-    def _frame_to_qimage(self, frame: np.ndarray) -> QImage:
-        """OpenCV frame'ni QImage'ga o'tkazish"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        return QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+    def _to_gray(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Tracker uchun grayscale (ikki navbatma-navbat bufer)
+
+        Tracker oldingi frame'ni saqlaydi, shuning uchun joriy va
+        oldingi frame alohida buferlarda turadi.
+        """
+        index = self._gray_index = 1 - self._gray_index
+        gray = self._gray_buffers[index]
+        if gray is None or gray.shape != frame.shape[:2]:
+            gray = self._gray_buffers[index] = np.empty(frame.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+
+    def _start_stages(self):
+        """Kamera va aniqlash bosqichlarini ishga tushirish"""
+        self._frame_slot = LatestSlot(owning=True)
+        self._result_slot = LatestSlot()
+
+        self._capture_stage = CaptureStage(self.cap, self._frame_slot)
+        self._inference_stage = InferenceStage(
+            self._capture_stage,
+            self._result_slot,
+            self._detect_face_insightface,
+            scheduler=self.scheduler,
+            gate_fn=self._needs_detection
+        )
+        self._capture_stage.start()
+        self._inference_stage.start()
+
+    def _stop_stages(self):
+        """Bosqichlarni to'xtatish"""
+        for slot in (self._frame_slot, self._result_slot):
+            if slot is not None:
+                slot.close()
+
+        for stage in (self._inference_stage, self._capture_stage):
+            if stage is not None and stage.isRunning():
+                stage.stop()
+
+        self._capture_stage = None
+        self._inference_stage = None
+
+    def get_stats(self) -> dict:
+        """Har bir bosqichning FPS va navbat yoshi"""
+        stats = {"render": self._render_stats.snapshot()}
+        if self._capture_stage is not None:
+            stats["capture"] = self._capture_stage.stats.snapshot()
+            if self._capture_stage.pool is not None:
+                stats["buffers"] = self._capture_stage.pool.stats()
+        if self._inference_stage is not None:
+            stats["inference"] = self._inference_stage.stats.snapshot()
+        if self.tracker is not None:
+            stats["tracker"] = self.tracker.stats()
+        if self.roi_detector is not None:
+            stats["roi"] = self.roi_detector.stats()
+        if self.quality_gate is not None:
+            stats["quality"] = self.quality_gate.stats()
+        stats["executor"] = executor.stats()
+        return stats
+
+    def _update_scheduler(self) -> dict:
+        """Bosqich statistikasi asosida scheduler qarorlarini yangilash"""
+        stats = self.get_stats()
+        changed = self.scheduler.update(
+            preview_fps=stats["render"]["fps"],
+            capture_fps=stats.get("capture", {}).get("fps")
+        )
+        stats["scheduler"] = self.scheduler.status()
+
+        if changed:
+            self.scheduler_status.emit(stats["scheduler"])
+        return stats
 
     def run(self):
-        """Asosiy thread loop"""
+        """Ko'rsatish bosqichi - har bir yangi frame'ga oxirgi ramkani chizadi"""
         if not self._init_camera():
             print("Camera initialization failed")
+            self._release_analyzer()
             return
 
         print("Face Detector Worker started")
+        self._start_stages()
+        self.scheduler_status.emit(self.scheduler.status())
+
+        last_frame_seq = 0
+        last_result_seq = 0
+        last_stats_time = time.monotonic()
+
+        try:
+            while self.is_running():
+                try:
+                    item = self._frame_slot.wait_newer(last_frame_seq)
+                    if item is None:
+                        continue
+
+                    last_frame_seq, timestamp, buffer = item
+                    frame = buffer.array
+                    self.frame_counter += 1
+                    cropped_face = None
+                    sample = {}
+
+                    # Yangi aniqlash natijasi bo'lsa - keyframe sifatida olish
+                    result_seq, result_ts, result = self._result_slot.peek()
+                    if result_seq != last_result_seq:
+                        last_result_seq = result_seq
+                        cropped_face = result["crop"]
+                        sample = self._face_sample(result, result_ts)
+                        self._apply_result(result, result_ts)
+
+                    try:
+                        self._track_face(frame)
+                        face_box = self.last_face_box
+
+                        # Ramka bufer ustiga chiziladi, QImage bufer xotirasini ishlatadi
+                        self._draw_face_box(frame, face_box)
+                        qt_image = buffer.to_qimage()
+                    finally:
+                        buffer.release()
+
+                    self.face_detected.emit({
+                        "image": qt_image,
+                        "crop_face": cropped_face,
+                        "has_face": face_box is not None,
+                        **sample
+                    })
+                    self._render_stats.tick(timestamp)
+
+                    now = time.monotonic()
+                    if now - last_stats_time >= self.stats_interval:
+                        last_stats_time = now
+                        stats = self._update_scheduler()
+                        self.stats_updated.emit(stats)
+
+                except Exception as e:
+                    print(f"Frame processing error: {e}")
+                    self.msleep(50)
+        finally:
+            self._stop_stages()
+            if self.cap:
+                self.cap.release()
+            self._release_analyzer()
 
-        while self.is_running():
-            try:
-                ret, frame = self.cap.read()
-                if not ret:
-                    self.msleep(10)
-                    continue
-
-                self.frame_counter += 1
-                cropped_face = None
-                face_box = None
-
-                # Frame skip
-                if self.frame_counter % self.frame_skip == 0:
-                    face_box, cropped_face = self._detect_face_insightface(frame)
-                    if face_box:
-                        self.last_face_box = face_box
-                else:
-                    face_box = self.last_face_box
-
-                display_frame = self._draw_face_box(frame.copy(), face_box)
-                qt_image = self._frame_to_qimage(display_frame)
-
-                self.face_detected.emit({
-                    "image": qt_image,
-                    "crop_face": cropped_face,
-                    "has_face": face_box is not None
-                })
-
-                self.msleep(33)
-
-            except Exception as e:
-                print(f"Frame processing error: {e}")
-                self.msleep(50)
-
-        if self.cap:
-            self.cap.release()
         print("Face Detector Worker finished")
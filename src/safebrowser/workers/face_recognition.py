@@ -8,32 +8,45 @@ import queue
 import gc
 import numpy as np
 import cv2
-import requests
-from PyQt6.QtCore import QThread, pyqtSignal, QMutex, QMutexLocker
+from PyQt6.QtCore import QThread, pyqtSignal, QMutex, QMutexLocker, QWaitCondition
 
-from safebrowser.utils.helpers import cosine_similarity
-from safebrowser.services.api_client import BASE_URL
+from safebrowser.core.face_analyzer import FaceAnalyzer
+from safebrowser.core.embedding_cache import EmbeddingCache
+from safebrowser.core.verifier import SequentialVerifier, DECISION_PENDING
+from safebrowser.core.inference_executor import executor, PRIORITY_VERIFY
+from safebrowser.core.staff_gallery import gallery as staff_gallery
+from safebrowser.services.api_client import APIClient
 
 
 class CPUOptimizedFaceIdWorker(QThread):
     """
     Nomzod yuzini tekshirish workeri
     - Base64 rasm bilan solishtirish
+    - Pasport embedding'i rasm hash'i bo'yicha keshlanadi
+    - Qaror bir necha ketma-ket frame bo'yicha (SequentialVerifier)
     - Rate limiting
     - Memory management
     """
     result_ready = pyqtSignal(object)
 
-    def __init__(self, app=None):
+    def __init__(self, app=None, reference_cache_size: int = 16):
         super().__init__()
         self._running = True
         self.app = app
+        self.analyzer = FaceAnalyzer.from_app(app)
         self._lock = QMutex()
         self._task_queue = queue.Queue(maxsize=1)
         self.processing = False
         self.last_process_time = 0
         self.min_interval = 500
         self.process_count = 0
+        self.reference_cache = EmbeddingCache(reference_cache_size)
+
+        # Joriy tekshiruv raundi (pasport + score bo'yicha)
+        self.verifier = None
+        self._verifier_key = None
+        self._last_sample_time = 0
+        self.round_timeout = 3000
 
     def is_running(self) -> bool:
         with QMutexLocker(self._lock):
@@ -56,12 +69,19 @@ class CPUOptimizedFaceIdWorker(QThread):
         self,
         image_base64: str = None,
         cropped_face=None,
-        score: int = 40
+        score: int = 40,
+        embedding=None
     ) -> bool:
-        """Yangi task qo'shish"""
+        """
+        Yangi task qo'shish
+
+        embedding - FaceDetectorWorker'dan kelgan live embedding.
+        Berilsa, cropped_face qayta aniqlanmaydi.
+        """
         current_time = time.time() * 1000
 
-        if current_time - self.last_process_time < self.min_interval:
+        # Raund davom etayotganda keyingi frame kutilmasdan olinadi
+        if not self._collecting() and current_time - self.last_process_time < self.min_interval:
             return False
 
         if self.processing:
@@ -70,7 +90,8 @@ class CPUOptimizedFaceIdWorker(QThread):
         task = {
             "image_base64": image_base64,
             "cropped_face": cropped_face,
-            "score": score
+            "score": score,
+            "embedding": embedding
         }
 
         try:
@@ -107,15 +128,63 @@ class CPUOptimizedFaceIdWorker(QThread):
         except Exception as e:
             return None, str(e)
 
-    def _get_embedding(self, image) -> tuple:
-        """Rasmdan embedding olish"""
+    def _collecting(self) -> bool:
+        """Qaror hali qabul qilinmagan raund bormi"""
+        verifier = self.verifier
+        return (
+            verifier is not None
+            and verifier.samples > 0
+            and not verifier.is_decided
+            and time.time() * 1000 - self._last_sample_time < self.round_timeout
+        )
+
+    def _verifier_for(self, cache_key: str, score: int) -> SequentialVerifier:
+        """Joriy raund verifier'i - pasport, score o'zgarsa yoki raund eskirsa yangisi"""
+        key = (cache_key, score)
+        if self.verifier is None or self._verifier_key != key or not self._collecting():
+            self.verifier = SequentialVerifier.from_score(score)
+            self._verifier_key = key
+        return self.verifier
+
+    def get_stats(self) -> dict:
+        """Pasport embedding keshi statistikasi (hits/misses)"""
+        return {"reference_cache": self.reference_cache.stats()}
+
+    def _get_pair_embeddings(self, ps_image, cropped_face, live_embedding=None, ps_embedding=None) -> tuple:
+        """
+        Pasport va live yuz embeddinglari
+
+        ps_embedding keshdan berilsa faqat live yuz hisoblanadi.
+        Ikkalasi ham kerak bo'lsa, recognition bitta batch'da ishlaydi.
+
+        Returns:
+            (ps_embedding, live_embedding, pasport xatoligi)
+        """
+        if self.analyzer is None:
+            return None, None, "Model yuklanmadi"
+
         try:
-            faces = self.app.get(image)
-            if not faces:
-                return None, "Yuz topilmadi"
-            return faces[0].embedding, None
+            if ps_embedding is not None:
+                if live_embedding is None and cropped_face is not None:
+                    live_embedding = executor.run(
+                        self.analyzer.get_embedding, cropped_face, priority=PRIORITY_VERIFY
+                    )
+            elif live_embedding is not None or cropped_face is None:
+                ps_embedding = executor.run(
+                    self.analyzer.get_embedding, ps_image, priority=PRIORITY_VERIFY
+                )
+            else:
+                ps_embedding, live_embedding = executor.run(
+                    self.analyzer.get_embeddings_batch,
+                    [ps_image, cropped_face],
+                    priority=PRIORITY_VERIFY
+                )
         except Exception as e:
-            return None, str(e)
+            return None, None, str(e)
+
+        if ps_embedding is None:
+            return None, None, "Yuz topilmadi"
+        return ps_embedding, live_embedding, None
 
     def _process_task(self, task: dict):
         """Taskni bajarish"""
@@ -127,44 +196,69 @@ class CPUOptimizedFaceIdWorker(QThread):
             cropped_face = task.get("cropped_face")
             score = task.get("score", 40)
 
-            ps_image, error = self._decode_base64_image(image_base64)
+            # Bir xil pasport rasmi - decode va inference'siz
+            cache_key = self.reference_cache.key_for(image_base64) if image_base64 else None
+            ps_embedding = self.reference_cache.get(cache_key) if cache_key else None
+            ps_image = None
+
+            if ps_embedding is None:
+                ps_image, error = self._decode_base64_image(image_base64)
+                if error:
+                    self.result_ready.emit({
+                        "status": "error",
+                        "is_verified": False,
+                        "message": error
+                    })
+                    return
+
+            ps_embedding, live_embedding, error = self._get_pair_embeddings(
+                ps_image, cropped_face, task.get("embedding"), ps_embedding
+            )
             if error:
                 self.result_ready.emit({
                     "status": "error",
                     "is_verified": False,
-                    "message": error
+                    "message": f"Pasport rasm: {error}"
                 })
                 return
 
-            ps_embedding, error = self._get_embedding(ps_image)
-            if error:
+            if ps_image is not None:
+                ps_embedding = self.reference_cache.put(cache_key, ps_embedding)
+
+            if live_embedding is None:
+                error = "Yuz topilmadi" if cropped_face is not None else "Ma'lumot yo'q"
                 self.result_ready.emit({
                     "status": "error",
                     "is_verified": False,
-                    "message": f"Pasport rasm: {error}"
+                    "message": f"Live yuz: {error}"
                 })
                 return
 
-            live_embedding, error = self._get_embedding(cropped_face)
-            if error:
+            verifier = self._verifier_for(cache_key, score)
+            verifier.add_embedding(live_embedding, ps_embedding)
+            self._last_sample_time = time.time() * 1000
+            result = verifier.result()
+
+            if not verifier.is_decided:
+                # Dalil yetarli emas - keyingi frame bilan davom etadi
                 self.result_ready.emit({
-                    "status": "error",
-                    "is_verified": False,
-                    "message": f"Live yuz: {error}"
+                    "status": "pending",
+                    "threshold": score,
+                    **result,
+                    "message": f"Tekshirilmoqda: {result['similarity']}% ({result['samples']} frame)"
                 })
                 return
 
-            similarity = cosine_similarity(ps_embedding, live_embedding)
-            similarity_percent = round(float(similarity) * 100, 2)
-            is_match = 0 < score <= similarity_percent
+            is_match = result["is_verified"]
+            mean_embedding = verifier.mean_embedding()
+            self.verifier = None
 
             self.result_ready.emit({
                 "status": "success",
-                "is_verified": is_match,
-                "similarity": similarity_percent,
                 "threshold": score,
-                "ps_embedding": live_embedding.tolist() if is_match else None,
-                "message": f"O'xshashlik: {similarity_percent}%"
+                **result,
+                "ps_embedding": mean_embedding.tolist() if is_match else None,
+                "message": f"O'xshashlik: {result['similarity']}%"
             })
 
         except Exception as e:
@@ -190,25 +284,49 @@ class CPUOptimizedFaceIdWorker(QThread):
                     continue
 
                 self._process_task(task)
-                self.msleep(200)
+                if not self._collecting():
+                    self.msleep(200)
 
             except Exception as e:
                 print(f"CPUOptimizedFaceIdWorker error: {e}")
                 self.msleep(500)
 
+        # Model handle'larini registry'ga qaytarish
+        if self.analyzer is not None:
+            self.analyzer.release()
+
 
 class FaceIdStaffWorker(QThread):
     """
-    Xodim yuzini server orqali tekshirish workeri
+    Xodim yuzini tekshirish workeri
+
+    Lokal galereya (StaffGallery) bo'lsa moslik qurilmada topiladi va
+    server'siz qabul qilinadi. Server tasdig'i faqat server_confirm = true
+    bo'lsa yoki galereya max_sync_age dan eski bo'lsa.
+    Galereya bo'sh yoki o'chirilgan bo'lsa - har bir namuna server orqali.
+    Galereya holati har bir namunada qayta tekshiriladi; eskirgan
+    galereya RESYNC_INTERVAL da bir marta qayta sinxronlanadi.
+
+    api (AsyncAPIClient) berilsa server so'rovi thread'ni bloklamaydi:
+    javob kelganda result_ready yuboriladi, javob kutilayotganda yangi
+    so'rov yuborilmaydi.
     """
     result_ready = pyqtSignal(object)
 
-    def __init__(self, app=None):
+    RESYNC_INTERVAL = 60.0
+
+    def __init__(self, app=None, gallery=None, api=None):
         super().__init__()
         self._running = True
         self.app = app
+        self.analyzer = FaceAnalyzer.from_app(app)
         self._lock = QMutex()
         self.cropped_face = None
+        self.embedding = None
+        self.gallery = gallery if gallery is not None else staff_gallery
+        self._last_sync_attempt = 0.0
+        self.api = api
+        self._server_reply = None
 
     def is_running(self) -> bool:
         with QMutexLocker(self._lock):
@@ -217,81 +335,209 @@ class FaceIdStaffWorker(QThread):
     def stop(self):
         with QMutexLocker(self._lock):
             self._running = False
+            reply = self._server_reply
+        if reply is not None:
+            reply.cancel()
         self.wait()
 
-    def set_face(self, cropped_face=None, **kwargs):
-        """Yangi yuz o'rnatish"""
+    def set_face(self, cropped_face=None, embedding=None, **kwargs):
+        """
+        Yangi yuz o'rnatish
+
+        embedding berilsa (FaceDetectorWorker'dan), u to'g'ridan-to'g'ri
+        ishlatiladi va kesilgan yuzda qayta inference qilinmaydi.
+        """
         with QMutexLocker(self._lock):
             self.cropped_face = cropped_face
+            self.embedding = embedding
 
     def _get_face(self):
-        """Thread-safe face olish"""
+        """Thread-safe face va embedding olish"""
         with QMutexLocker(self._lock):
-            face = self.cropped_face
+            face, embedding = self.cropped_face, self.embedding
             self.cropped_face = None
-            return face
+            self.embedding = None
+            return face, embedding
+
+    def _prepare_gallery(self):
+        """Saqlangan galereyani yuklash va server bilan delta sinxronlash"""
+        from safebrowser.config import config
 
-    def _verify_staff(self, face):
-        """Xodimni server orqali tekshirish"""
+        if not config.staff_gallery_enabled:
+            return
+
+        if not len(self.gallery):
+            self.gallery.load()
+        self._sync_gallery()
+
+    def _sync_gallery(self):
+        self._last_sync_attempt = time.time()
         try:
-            if face is None:
+            self.gallery.sync(APIClient())
+        except Exception as e:
+            # Sinxronlanmasa saqlangan galereya faqat server tasdig'i bilan ishlatiladi
+            print(f"Staff gallery sync error: {e}")
+
+    def _gallery_ready(self) -> bool:
+        """Galereya ishlatiladimi (har bir namunada - keyingi sinxronlash ham hisobga olinadi)"""
+        from safebrowser.config import config
+
+        if not config.staff_gallery_enabled:
+            return False
+
+        stale = self.gallery.sync_age() > config.staff_gallery_max_sync_age
+        if stale and time.time() - self._last_sync_attempt >= self.RESYNC_INTERVAL:
+            self._sync_gallery()
+        return len(self.gallery) > 0
+
+    def _gallery_fresh(self) -> bool:
+        from safebrowser.config import config
+        return self.gallery.sync_age() <= config.staff_gallery_max_sync_age
+
+    def _verify_staff(self, face, embedding=None):
+        """Xodimni tekshirish (lokal galereya yoki server); None - javob keyin keladi"""
+        try:
+            if face is None and embedding is None:
                 return {"is_verified": False, "message": "Yuz topilmadi"}
 
-            if self.app is None:
-                return {"is_verified": False, "message": "Model yuklanmadi"}
+            if embedding is None:
+                if self.analyzer is None:
+                    return {"is_verified": False, "message": "Model yuklanmadi"}
 
-            faces = self.app.get(face)
-            if not faces:
-                return {"is_verified": False, "message": "Yuz aniqlanmadi"}
+                embedding = executor.run(self.analyzer.get_embedding, face, priority=PRIORITY_VERIFY)
+                if embedding is None:
+                    return {"is_verified": False, "message": "Yuz aniqlanmadi"}
 
-            embedding = faces[0].embedding.tolist()
+            if self._gallery_ready():
+                return self._match_local(embedding)
+            return self._verify_on_server(embedding)
 
-            response = requests.post(
-                f"{BASE_URL}/users/face_identification/",
-                json={"embedding": str(embedding)},
-                timeout=10
-            )
+        except Exception as e:
+            return {"is_verified": False, "message": f"Xatolik: {e}"}
+
+    def _match_local(self, embedding) -> dict:
+        """Galereyada top-k qidiruv (server'siz)"""
+        from safebrowser.config import config
+
+        matches = self.gallery.search(embedding, k=config.staff_gallery_top_k)
+        if not matches:
+            # IVF probe'lar faqat bo'sh/o'chirilgan klasterlarga tushgan bo'lishi mumkin
+            return {
+                "is_verified": False,
+                "similarity": 0.0,
+                "source": "local",
+                "message": "Xodim topilmadi"
+            }
 
-            data = response.json()
+        best = matches[0]
+        similarity = round(best["similarity"] * 100, 2)
 
+        if similarity < config.staff_gallery_threshold:
             return {
-                "is_verified": data.get("verified", False),
-                "message": data.get("message", "")
+                "is_verified": False,
+                "similarity": similarity,
+                "source": "local",
+                "message": "Xodim topilmadi"
             }
 
-        except requests.exceptions.Timeout:
-            return {"is_verified": False, "message": "Server javob bermadi"}
-        except requests.exceptions.RequestException as e:
-            return {"is_verified": False, "message": f"Server xatolik: {e}"}
+        result = {
+            "is_verified": True,
+            "staff_id": best["id"],
+            "name": best["name"],
+            "similarity": similarity,
+            "candidates": matches,
+            "source": "local",
+            "message": f"{best['name']} ({similarity}%)"
+        }
+
+        # Server tasdig'i ixtiyoriy; eskirgan galereya (server'da o'chirilgan
+        # xodim hali bo'lishi mumkin) - har doim
+        if config.staff_gallery_server_confirm or not self._gallery_fresh():
+            return self._verify_on_server(embedding, local=result)
+        return result
+
+    @staticmethod
+    def _server_result(data: dict, local: dict = None) -> dict:
+        """Server javobi (local berilsa - lokal moslik server qarori bilan)"""
+        result = {
+            "is_verified": data.get("verified", False),
+            "message": data.get("message", "")
+        }
+        if local is None:
+            return result
+
+        return dict(
+            local,
+            is_verified=result["is_verified"],
+            message=result["message"] or local["message"],
+            source="server"
+        )
+
+    def _verify_on_server(self, embedding, local: dict = None):
+        """Xodimni server orqali tekshirish (ixcham embedding formati, eski formatga fallback)"""
+        try:
+            if self.api is None:
+                return self._server_result(APIClient().verify_face(embedding), local)
+
+            with QMutexLocker(self._lock):
+                if self._server_reply is not None and not self._server_reply.is_finished:
+                    # Oldingi so'rov javobi kutilmoqda
+                    return None
+                self._server_reply = reply = self.api.verify_face(embedding)
+
+            reply.add_done_callback(lambda data: self.result_ready.emit(self._server_result(data, local)))
+            return None
+
         except Exception as e:
             return {"is_verified": False, "message": f"Xatolik: {e}"}
 
     def run(self):
         """Asosiy loop"""
+        self._prepare_gallery()
+
         while self.is_running():
-            face = self._get_face()
-            if face is not None:
-                result = self._verify_staff(face)
-                self.result_ready.emit(result)
+            face, embedding = self._get_face()
+            if face is not None or embedding is not None:
+                result = self._verify_staff(face, embedding)
+                if result is not None:
+                    self.result_ready.emit(result)
             self.msleep(100)
 
+        # Model handle'larini registry'ga qaytarish
+        if self.analyzer is not None:
+            self.analyzer.release()
+
 
 class Camera1Worker(QThread):
     """
-    Test vaqtida yuzni real-time tekshirish workeri
+    Test vaqtida yuzni davriy tekshirish workeri
+
+    - Reference (pasport) embedding sessiya davomida saqlanadi
+    - Thread faqat yangi yuz namunasi kelganda va check_timer
+      o'tganda uyg'onadi (QWaitCondition, polling yo'q)
+    - Raund: ketma-ket namunalar SequentialVerifier'ga qo'shiladi va
+      qaror aniq bo'lishi bilan (yoki round_timeout tugaganda) natija yuboriladi
     """
     result_ready = pyqtSignal(object)
 
     def __init__(self, app=None):
         super().__init__()
         self._lock = QMutex()
+        self._cond = QWaitCondition()
         self.app = app
+        self.analyzer = FaceAnalyzer.from_app(app)
         self._running = False
         self.ps_embedding = None
         self.cropped_face = None
+        self.live_embedding = None
+        self._has_sample = False
+        self._idle = False
         self.score = 40
         self.check_timer = 10
-        self.last_check_time = 0
+        self.round_timeout = 3.0
+        self.verifier = None
+        self._next_check = 0.0
+        self._round_deadline = None
 
     def is_running(self) -> bool:
         with QMutexLocker(self._lock):
@@ -300,87 +546,174 @@ class Camera1Worker(QThread):
     def stop(self):
         with QMutexLocker(self._lock):
             self._running = False
+            self._cond.wakeAll()
         self.wait()
 
+    def set_reference(self, ps_embedding):
+        """Reference embedding'ni sessiya uchun o'rnatish (yangi raund kutadi)"""
+        reference = np.asarray(ps_embedding, dtype=np.float32).ravel()
+        with QMutexLocker(self._lock):
+            self.ps_embedding = reference
+            self.verifier = None
+            self._round_deadline = None
+            # Reference'siz kutilayotgan namuna endi ishlanishi mumkin
+            self._cond.wakeAll()
+
+    def clear_reference(self):
+        with QMutexLocker(self._lock):
+            self.ps_embedding = None
+            self.verifier = None
+            self._round_deadline = None
+
     def set_face(
         self,
         ps_embedding=None,
         cropped_face=None,
         score: int = 40,
-        check_timer: int = 10
+        check_timer: int = 10,
+        embedding=None
     ):
-        """Yangi yuz ma'lumotlarini o'rnatish"""
+        """
+        Yangi yuz namunasini berish
+
+        ps_embedding faqat birinchi marta (yoki almashtirish uchun)
+        kerak - u set_reference() orqali saqlanadi va qayta yuborilmaydi.
+        embedding - FaceDetectorWorker'dan kelgan live embedding
+        (berilsa cropped_face qayta aniqlanmaydi).
+        """
+        if ps_embedding is not None:
+            self.set_reference(ps_embedding)
+
         with QMutexLocker(self._lock):
-            if ps_embedding is not None:
-                self.ps_embedding = ps_embedding
-            if cropped_face is not None:
+            if cropped_face is not None or embedding is not None:
                 self.cropped_face = cropped_face
+                self.live_embedding = embedding
+                self._has_sample = True
             self.score = score
             self.check_timer = check_timer
 
             if not self._running:
                 self._running = True
-                self.last_check_time = 0
+                self._next_check = 0.0
                 if not self.isRunning():
                     self.start()
 
-    def _get_data(self):
-        """Thread-safe data olish"""
-        with QMutexLocker(self._lock):
-            embedding = self.ps_embedding
-            face = self.cropped_face
-            self.ps_embedding = None
-            self.cropped_face = None
-            return embedding, face
+            # Namuna kerak bo'lganda yoki thread muddatsiz uxlayotganda
+            # (check_timer gacha vaqtli kutishga o'tishi uchun) uyg'otish
+            if self._has_sample and (self._idle or self._sample_due(time.monotonic())):
+                self._cond.wakeAll()
 
-    def _verify_face(self, ps_embedding, live_face) -> dict:
-        """Yuzni tekshirish"""
-        try:
-            if self.app is None:
-                return {"is_verified": False, "message": "App not initialized"}
+    def _sample_due(self, now: float) -> bool:
+        # Mutex ostida chaqiriladi
+        if self.ps_embedding is None:
+            return False
+        return self._round_deadline is not None or now >= self._next_check
 
-            faces = self.app.get(live_face)
-            if not faces:
-                return {"is_verified": False, "message": "Yuz topilmadi"}
+    def _wait_sample(self):
+        """
+        Keyingi ishlov beriladigan namunani kutish
 
-            live_embedding = faces[0].embedding
+        Returns:
+            (reference, cropped_face, live_embedding),
+            raund vaqti tugasa "timeout", to'xtatilganda None
+        """
+        with QMutexLocker(self._lock):
+            while self._running:
+                now = time.monotonic()
+
+                if self._has_sample and self._sample_due(now):
+                    self._has_sample = False
+                    face, live_embedding = self.cropped_face, self.live_embedding
+                    self.cropped_face = None
+                    self.live_embedding = None
+                    return self.ps_embedding, face, live_embedding
+
+                if self._round_deadline is not None:
+                    remaining = self._round_deadline - now
+                    if remaining <= 0:
+                        return "timeout"
+                    self._cond.wait(self._lock, int(remaining * 1000) + 1)
+                elif self._has_sample and self.ps_embedding is not None:
+                    # Namuna bor, lekin check_timer hali o'tmagan
+                    self._cond.wait(self._lock, int((self._next_check - now) * 1000) + 1)
+                else:
+                    self._idle = True
+                    self._cond.wait(self._lock)
+                    self._idle = False
+            return None
+
+    def _live_embedding(self, live_face, live_embedding=None):
+        """Live embedding (detector bermagan bo'lsa - kesilgan yuzdan)"""
+        if live_embedding is not None:
+            return live_embedding
+        if self.analyzer is None or live_face is None:
+            return None
+        return executor.run(self.analyzer.get_embedding, live_face, priority=PRIORITY_VERIFY)
+
+    def _finish_round(self, result: dict):
+        with QMutexLocker(self._lock):
+            self._next_check = time.monotonic() + self.check_timer
+            self._round_deadline = None
+            self.verifier = None
+        self.result_ready.emit(result)
 
-            similarity = cosine_similarity(live_embedding, ps_embedding)
-            similarity_percent = round(float(similarity) * 100)
+    def _add_sample(self, reference, cropped_face, live_embedding):
+        """Raundga bitta namuna qo'shish va qaror aniq bo'lsa natijani yuborish"""
+        try:
+            live_embedding = self._live_embedding(cropped_face, live_embedding)
+        except Exception as e:
+            self._finish_round({"is_verified": False, "message": f"Xatolik: {e}"})
+            return
 
-            is_match = 0 < self.score <= similarity_percent
+        # Yuz topilmagan namuna - o'tkazib yuboriladi
+        if live_embedding is None:
+            return
 
-            return {
-                "is_verified": is_match,
-                "similarity": similarity_percent,
-                "message": "Tasdiqlandi" if is_match else "Tasdiqlanmadi"
-            }
+        with QMutexLocker(self._lock):
+            if self.verifier is None:
+                self.verifier = SequentialVerifier.from_score(self.score)
+                self._round_deadline = time.monotonic() + self.round_timeout
+            verifier = self.verifier
 
-        except Exception as e:
-            return {"is_verified": False, "message": f"Xatolik: {e}"}
+        if verifier.add_embedding(live_embedding, reference) != DECISION_PENDING:
+            self._emit_decision(verifier)
 
-    def run(self):
-        """Asosiy loop"""
-        while self.is_running():
-            try:
-                current_time = time.time()
+    def _emit_decision(self, verifier: SequentialVerifier):
+        verifier.finish()
+        result = verifier.result()
+        result["message"] = "Tasdiqlandi" if result["is_verified"] else "Tasdiqlanmadi"
+        self._finish_round(result)
 
-                if current_time - self.last_check_time >= self.check_timer:
-                    self.last_check_time = current_time
+    def run(self):
+        """Asosiy loop - namuna kelmaguncha thread uxlaydi"""
+        # set_face() to'xtatilgan worker'ni qayta ishga tushirganda
+        # oldingi run() qaytargan handle'lar o'rniga yangilari olinadi
+        if self.analyzer is None:
+            self.analyzer = FaceAnalyzer.from_app(self.app)
 
-                    ps_embedding, cropped_face = self._get_data()
+        while True:
+            sample = self._wait_sample()
+            if sample is None:
+                break
 
-                    if ps_embedding is None or cropped_face is None:
-                        self.result_ready.emit({
-                            "is_verified": False,
-                            "message": "Ma'lumot yo'q"
-                        })
+            try:
+                if sample == "timeout":
+                    verifier = self.verifier
+                    if verifier is not None and verifier.samples:
+                        self._emit_decision(verifier)
                     else:
-                        result = self._verify_face(ps_embedding, cropped_face)
-                        self.result_ready.emit(result)
+                        self._finish_round({"is_verified": False, "message": "Yuz topilmadi"})
+                    continue
 
-                self.msleep(100)
+                self._add_sample(*sample)
 
             except Exception as e:
                 print(f"Camera1Worker error: {e}")
-                self.msleep(500)
+                with QMutexLocker(self._lock):
+                    self.verifier = None
+                    self._round_deadline = None
+
+        # Model handle'larini registry'ga qaytarish
+        if self.analyzer is not None:
+            self.analyzer.release()
+            self.analyzer = None
@@ -0,0 +1,431 @@
+"""
+Frame Pipeline
+Kamera -> aniqlash -> ko'rsatish bosqichlari uchun umumiy primitivlar
+
+Bosqichlar bir-birini kutmaydi: har biri faqat eng so'nggi
+ma'lumotni oladi (latest-wins), eskirgan frame'lar tashlab yuboriladi.
+
+Frame'lar oldindan ajratilgan buferlar pulidan olinadi (FrameBufferPool):
+kamera to'g'ridan-to'g'ri buferga o'qiydi, ramka joyida chiziladi va
+QImage shu xotira ustida quriladi. Bufer oxirgi foydalanuvchi (QImage
+ham) uni qo'yib yuborganda pulga qaytadi.
+"""
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import QThread, QMutex, QMutexLocker, QWaitCondition
+from PyQt6.QtGui import QImage
+
+
+class FrameBuffer:
+    """
+    Reference-count'li frame buferi
+
+    retain()/release() juftligi bilan ishlatiladi. Hisob nolga
+    tushganda bufer pulga qaytadi (pul bo'lmasa - shunchaki tashlanadi).
+    """
+
+    def __init__(self, array: np.ndarray, pool: 'FrameBufferPool' = None):
+        self.array = array
+        self._pool = pool
+        self._refs = 0
+
+    @classmethod
+    def standalone(cls, array: np.ndarray) -> 'FrameBuffer':
+        """Pulga tegishli bo'lmagan frame (masalan, o'lcham mos kelmasa)"""
+        buf = cls(array)
+        buf._refs = 1
+        return buf
+
+    def retain(self) -> 'FrameBuffer':
+        if self._pool is None:
+            self._refs += 1
+            return self
+        with QMutexLocker(self._pool._mutex):
+            self._refs += 1
+        return self
+
+    def release(self):
+        if self._pool is None:
+            self._refs -= 1
+            return
+        self._pool._release(self)
+
+    def to_qimage(self) -> QImage:
+        """
+        Bufer ustida QImage (nusxasiz, BGR888)
+
+        QImage buferni ushlab turadi: oxirgi QImage nusxasi
+        o'chirilganda cleanup orqali bufer qo'yib yuboriladi.
+        """
+        h, w = self.array.shape[:2]
+        self.retain()
+        return QImage(
+            self.array.data,
+            w, h,
+            self.array.strides[0],
+            QImage.Format.Format_BGR888,
+            self._qimage_cleanup,
+            None
+        )
+
+    def _qimage_cleanup(self, _info):
+        self.release()
+
+
+class FrameBufferPool:
+    """
+    Oldindan ajratilgan frame buferlari puli
+
+    Har bir frame uchun yangi xotira ajratilmaydi. Pul bo'sh bo'lsa
+    (GUI orqada qolgan), acquire() None qaytaradi va frame tashlanadi.
+    """
+
+    def __init__(self, shape: tuple, size: int = 8, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.size = size
+        self._mutex = QMutex()
+        self._free = [FrameBuffer(np.empty(self.shape, dtype), self) for _ in range(size)]
+        self.dropped = 0
+
+    def acquire(self) -> Optional[FrameBuffer]:
+        """Bo'sh buferni olish (refcount = 1)"""
+        with QMutexLocker(self._mutex):
+            if not self._free:
+                self.dropped += 1
+                return None
+            buf = self._free.pop()
+            buf._refs = 1
+            return buf
+
+    def _release(self, buf: FrameBuffer):
+        with QMutexLocker(self._mutex):
+            buf._refs -= 1
+            if buf._refs == 0:
+                self._free.append(buf)
+
+    def stats(self) -> dict:
+        with QMutexLocker(self._mutex):
+            return {"size": self.size, "free": len(self._free), "dropped": self.dropped}
+
+
+class LatestSlot:
+    """
+    Latest-wins slot - faqat eng so'nggi element saqlanadi
+
+    Yozuvchi hech qachon bloklanmaydi: o'qilmagan eski element
+    yangisi bilan almashtiriladi. O'quvchi sequence raqami orqali
+    yangi element kelganini biladi.
+
+    owning=True bo'lsa elementlar FrameBuffer deb hisoblanadi: slot
+    o'z nusxasini ushlab turadi, almashtirilganda qo'yib yuboradi,
+    o'quvchiga esa retain() qilingan bufer beriladi (release() shart).
+    """
+
+    def __init__(self, owning: bool = False):
+        self.owning = owning
+        self._mutex = QMutex()
+        self._cond = QWaitCondition()
+        self._item = None
+        self._seq = 0
+        self._timestamp = 0.0
+        self._closed = False
+
+    def put(self, item, timestamp: float = None) -> int:
+        """Yangi element qo'yish (eskisi almashtiriladi)"""
+        with QMutexLocker(self._mutex):
+            old = self._item
+            self._seq += 1
+            self._item = item
+            self._timestamp = time.monotonic() if timestamp is None else timestamp
+            self._cond.wakeAll()
+            seq = self._seq
+
+        if self.owning and old is not None:
+            old.release()
+        return seq
+
+    @property
+    def seq(self) -> int:
+        """Joriy element raqami (elementni olmasdan, retain() yo'q)"""
+        with QMutexLocker(self._mutex):
+            return self._seq
+
+    def _take(self):
+        # Mutex ostida chaqiriladi
+        if self.owning and self._item is not None:
+            self._item.retain()
+        return self._seq, self._timestamp, self._item
+
+    def peek(self) -> tuple:
+        """
+        Kutmasdan joriy elementni olish
+
+        Returns:
+            (seq, timestamp, item)
+        """
+        with QMutexLocker(self._mutex):
+            return self._take()
+
+    def wait_newer(self, last_seq: int, timeout_ms: int = 100):
+        """
+        last_seq dan yangiroq element kelguncha kutish
+
+        Returns:
+            (seq, timestamp, item) yoki timeout/yopilganda None
+        """
+        with QMutexLocker(self._mutex):
+            if self._seq <= last_seq and not self._closed:
+                self._cond.wait(self._mutex, timeout_ms)
+
+            if self._closed or self._seq <= last_seq:
+                return None
+            return self._take()
+
+    def close(self):
+        """Kutayotgan barcha o'quvchilarni uyg'otish"""
+        with QMutexLocker(self._mutex):
+            self._closed = True
+            self._cond.wakeAll()
+            item, self._item = self._item, None
+
+        if self.owning and item is not None:
+            item.release()
+
+
+class StageStats:
+    """
+    Bosqich statistikasi - FPS va navbat yoshi (queue age)
+
+    Queue age - element slotga qo'yilgandan bosqich uni
+    tugatguncha o'tgan vaqt (ms).
+    """
+
+    def __init__(self, name: str, smoothing: float = 0.1):
+        self.name = name
+        self.smoothing = smoothing
+        self.count = 0
+        self._fps = 0.0
+        self._age_ms = 0.0
+        self._last_tick = None
+
+    def tick(self, source_timestamp: float = None):
+        """Bitta element qayta ishlanganini qayd etish"""
+        now = time.monotonic()
+        self.count += 1
+
+        if self._last_tick is not None:
+            dt = now - self._last_tick
+            if dt > 0:
+                self._fps = self._ema(self._fps, 1.0 / dt)
+        self._last_tick = now
+
+        if source_timestamp is not None:
+            age_ms = (now - source_timestamp) * 1000
+            self._age_ms = self._ema(self._age_ms, age_ms)
+
+    def _ema(self, current: float, value: float) -> float:
+        if self.count <= 2:
+            return value
+        return current + self.smoothing * (value - current)
+
+    def snapshot(self) -> dict:
+        """Joriy ko'rsatkichlar"""
+        return {
+            "fps": round(self._fps, 1),
+            "age_ms": round(self._age_ms, 1),
+            "count": self.count,
+        }
+
+
+class CaptureStage(QThread):
+    """
+    Kamera bosqichi - frame'larni uzluksiz o'qib slotga qo'yadi
+
+    Aniqlash qanchalik sekin bo'lmasin, kamera to'xtamaydi va
+    slotda doim eng yangi frame turadi. Frame'lar pul buferlariga
+    o'qiladi. Inference bosqichi so'raganda (request_rgb) keyingi
+    frame alohida RGB pul buferiga konvertatsiya qilinib rgb_slot'ga
+    qo'yiladi - inference o'qiyotgan bufer ustiga yozilmaydi.
+    """
+
+    RGB_POOL_SIZE = 3
+
+    def __init__(self, cap, frame_slot: LatestSlot, pool_size: int = 8):
+        super().__init__()
+        self._running = True
+        self._lock = QMutex()
+        self.cap = cap
+        self.frame_slot = frame_slot
+        self.pool_size = pool_size
+        self.pool = None
+        self.rgb_slot = LatestSlot(owning=True)
+        self._rgb_pool = None
+        self._rgb_requested = False
+        self.stats = StageStats("capture")
+
+    def is_running(self) -> bool:
+        with QMutexLocker(self._lock):
+            return self._running
+
+    def stop(self):
+        with QMutexLocker(self._lock):
+            self._running = False
+        self.rgb_slot.close()
+        self.wait()
+
+    def request_rgb(self):
+        """Keyingi frame'ni RGB ko'rinishda rgb_slot'ga qo'yishni so'rash"""
+        with QMutexLocker(self._lock):
+            self._rgb_requested = True
+
+    def _take_rgb_request(self) -> bool:
+        with QMutexLocker(self._lock):
+            requested, self._rgb_requested = self._rgb_requested, False
+            return requested
+
+    def _read(self) -> Optional[FrameBuffer]:
+        """Frame'ni pul buferiga o'qish"""
+        if self.pool is None:
+            ret, frame = self.cap.read()
+            if not ret:
+                return None
+            self.pool = FrameBufferPool(frame.shape, self.pool_size)
+            return FrameBuffer.standalone(frame)
+
+        buf = self.pool.acquire()
+        if buf is None:
+            # Barcha buferlar band - frame'ni tashlab kamerani bo'shatish
+            self.cap.grab()
+            return None
+
+        ret, frame = self.cap.read(image=buf.array)
+        if not ret:
+            buf.release()
+            return None
+
+        if frame is not buf.array:
+            # Kamera o'lchami o'zgardi - bu frame puldan tashqarida
+            buf.release()
+            return FrameBuffer.standalone(frame)
+        return buf
+
+    def _publish_rgb(self, frame: np.ndarray, timestamp: float) -> bool:
+        """
+        Inference uchun RGB nusxa (inference so'ragandagina)
+
+        Returns:
+            False - barcha RGB buferlar band (so'rov keyingi frame'ga qoladi)
+        """
+        if self._rgb_pool is None or self._rgb_pool.shape != frame.shape:
+            self._rgb_pool = FrameBufferPool(frame.shape, self.RGB_POOL_SIZE, frame.dtype)
+        buf = self._rgb_pool.acquire()
+        if buf is None:
+            return False
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buf.array)
+        # Slot buferning egasi bo'ladi
+        self.rgb_slot.put(buf, timestamp)
+        return True
+
+    def run(self):
+        while self.is_running():
+            try:
+                buf = self._read()
+                if buf is None:
+                    self.msleep(10)
+                    continue
+
+                timestamp = time.monotonic()
+                if self._take_rgb_request() and not self._publish_rgb(buf.array, timestamp):
+                    self.request_rgb()
+
+                # Slot buferning egasi bo'ladi
+                self.frame_slot.put(buf, timestamp)
+                self.stats.tick(timestamp)
+
+            except Exception as e:
+                print(f"Capture stage error: {e}")
+                self.msleep(50)
+
+
+class InferenceStage(QThread):
+    """
+    Aniqlash bosqichi - faqat eng yangi frame'ni qayta ishlaydi
+
+    Frame capture bosqichidan so'raladi va RGB ko'rinishda keladi
+    (preview buferlari bilan bo'lishilmaydi). RGB bufer detect_fn
+    tugaguncha ushlab turiladi. detect_fn(rgb_frame)
+    natijasi result slotga frame'ning
+    timestamp'i bilan birga qo'yiladi. Scheduler berilsa, aniqlash
+    chastotasini u belgilaydi va inference vaqti unga qayd etiladi.
+    gate_fn() False qaytarsa (masalan, tracker yuzni ishonchli
+    kuzatayotgan bo'lsa), aniqlash o'tkazib yuboriladi.
+    """
+
+    def __init__(
+        self,
+        capture: CaptureStage,
+        result_slot: LatestSlot,
+        detect_fn,
+        scheduler=None,
+        gate_fn=None
+    ):
+        super().__init__()
+        self._running = True
+        self._lock = QMutex()
+        self.capture = capture
+        self.result_slot = result_slot
+        self.detect_fn = detect_fn
+        self.scheduler = scheduler
+        self.gate_fn = gate_fn
+        self.stats = StageStats("inference")
+
+    def is_running(self) -> bool:
+        with QMutexLocker(self._lock):
+            return self._running
+
+    def stop(self):
+        with QMutexLocker(self._lock):
+            self._running = False
+        self.wait()
+
+    def run(self):
+        last_seq = 0
+
+        while self.is_running():
+            try:
+                # Scheduler byudjeti bo'yicha navbatni kutish
+                if self.scheduler is not None:
+                    delay = self.scheduler.time_until_next_detection()
+                    if delay > 0:
+                        self.msleep(min(100, max(1, int(delay * 1000))))
+                        continue
+
+                if self.gate_fn is not None and not self.gate_fn():
+                    self.msleep(10)
+                    continue
+
+                if self.capture.rgb_slot.seq <= last_seq:
+                    self.capture.request_rgb()
+                item = self.capture.rgb_slot.wait_newer(last_seq)
+                if item is None:
+                    continue
+
+                last_seq, timestamp, buf = item
+                started = time.monotonic()
+                try:
+                    result = self.detect_fn(buf.array)
+                finally:
+                    buf.release()
+
+                if self.scheduler is not None:
+                    self.scheduler.record_inference(time.monotonic() - started)
+
+                self.result_slot.put(result, timestamp)
+                self.stats.tick(timestamp)
+
+            except Exception as e:
+                print(f"Inference stage error: {e}")
+                self.msleep(50)
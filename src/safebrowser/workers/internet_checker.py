@@ -3,36 +3,63 @@ Internet Connection Checker Worker
 Internet ulanishini tekshirish
 """
 import socket
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 
+from safebrowser.services.async_api_client import AsyncAPIClient
 
-class InternetCheckWorker(QThread):
-    """Internet ulanishini tekshiruvchi worker"""
+
+class InternetCheckWorker(QObject):
+    """
+    Internet ulanishini tekshiruvchi worker
+
+    Alohida thread ishlatilmaydi: QTimer har interval soniyada
+    AsyncAPIClient.probe_tcp orqali bloklamaydigan tekshiruv boshlaydi.
+    """
     status_changed = pyqtSignal(bool)
 
-    def __init__(self, interval: int = 10):
-        super().__init__()
+    HOST = "8.8.8.8"
+    PORT = 53
+    TIMEOUT = 2.0
+
+    def __init__(self, interval: int = 10, api: AsyncAPIClient = None, parent: QObject = None):
+        super().__init__(parent)
         self.interval = interval
-        self._running = True
         self.last_status = None
+        self.api = api or AsyncAPIClient(parent=self)
+        self._reply = None
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._probe)
+
+    def start(self):
+        self._timer.start(self.interval * 1000)
+        self._probe()
+
+    def isRunning(self) -> bool:
+        return self._timer.isActive()
 
     def stop(self):
-        self._running = False
-        self.wait()
+        self._timer.stop()
+        if self._reply is not None:
+            self._reply.cancel()
 
     @staticmethod
     def check_connection() -> bool:
-        """Internet ulanishini tekshirish"""
+        """Internet ulanishini tekshirish (bloklaydigan variant)"""
         try:
-            socket.create_connection(("8.8.8.8", 53), timeout=2)
+            socket.create_connection((InternetCheckWorker.HOST, InternetCheckWorker.PORT), timeout=2)
             return True
         except OSError:
             return False
 
-    def run(self):
-        while self._running:
-            status = self.check_connection()
-            if status != self.last_status:
-                self.last_status = status
-                self.status_changed.emit(status)
-            self.msleep(self.interval * 1000)
+    def _probe(self):
+        # Oldingi tekshiruv hali tugamagan bo'lsa - yangisi boshlanmaydi
+        if self._reply is not None and not self._reply.is_finished:
+            return
+        self._reply = self.api.probe_tcp(self.HOST, self.PORT, timeout=self.TIMEOUT)
+        self._reply.finished.connect(self._on_status)
+
+    def _on_status(self, status: bool):
+        if status != self.last_status:
+            self.last_status = status
+            self.status_changed.emit(status)
@@ -1,146 +1,125 @@
 """
-App and Test Loader Workers
-Model va testlarni yuklash
+App Loader Worker
+Modellarni yuklash
 Cross-platform qo'llab-quvvatlash
 """
-import requests
-from PyQt6.QtCore import QThread, pyqtSignal
-
-from safebrowser.services.api_client import BASE_URL
+from PyQt6.QtCore import QThread, pyqtSignal, QMutex, QMutexLocker
 
 
 class AppLoaderWorker(QThread):
     """
     InsightFace modelni background'da yuklash
+
+    Bosqichlar progress signali orqali xabar qilinadi, oxirida
+    bo'sh frame'da warm-up inference bajariladi va app signali
+    {"app": FaceAnalyzer, "status": True} bilan keladi.
+    gpu_id berilmasa provider o'lchov asosida tanlanadi.
     """
     app = pyqtSignal(object)
+    progress = pyqtSignal(object)
 
-    def __init__(self):
+    def __init__(self, det_size: tuple = (640, 640), gpu_id: int = None, warm_up: bool = True):
         super().__init__()
+        self._running = True
+        self._lock = QMutex()
+        self.det_size = det_size
+        self.gpu_id = gpu_id
+        self.warm_up = warm_up
         self.loaded_app = None
 
-    def run(self):
-        try:
-            # Lazy import to avoid circular dependency
-            from safebrowser.utils.helpers import init_face_analyzer
+    def is_running(self) -> bool:
+        with QMutexLocker(self._lock):
+            return self._running
+
+    def stop(self):
+        """Yuklashni to'xtatib bo'lmaydi - faqat natija yuborilmaydi"""
+        with QMutexLocker(self._lock):
+            self._running = False
+
+    def _select_providers(self) -> list:
+        """
+        Execution provider tanlash (cross-platform)
 
-            gpu_id = self._detect_best_device()
+        gpu_id berilgan bo'lsa - unga mos provider'lar. Aks holda har
+        bir mavjud provider o'lchanadi (birinchi ishga tushirishda) va
+        natija qurilma bo'yicha keshlanadi. Masalan, OpenVINO ba'zi
+        Intel kompyuterlarda oddiy CPU'dan sekin - o'lchov buni ko'radi.
+        """
+        # Lazy import to avoid circular dependency
+        from safebrowser.core.model_registry import providers_for_device
+        from safebrowser.core.device_selector import select_execution, apply_selection
+        from safebrowser.utils.system import get_platform_name
 
-            self.loaded_app = init_face_analyzer(
-                det_size=(640, 640),
-                gpu_id=gpu_id
+        if self.gpu_id is not None:
+            return list(providers_for_device(self.gpu_id))
+
+        print(f"Platform: {get_platform_name()}")
+        try:
+            selection = select_execution(
+                det_size=self.det_size,
+                progress=lambda message: self._report("device", 10, message)
             )
-            self.app.emit({"app": self.loaded_app, "status": True})
+            return apply_selection(selection)
         except Exception as e:
-            print(f"AppLoaderWorker error: {e}")
-            self.app.emit({"app": None, "status": False, "error": str(e)})
+            print(f"Device selection xatosi: {e} - CPU ishlatiladi")
+            return list(providers_for_device(-1))
 
-    def _detect_best_device(self) -> int:
+    def _load_analyzer(self, providers: list):
         """
-        Eng yaxshi qurilmani aniqlash (cross-platform)
+        FaceAnalyzer yaratish
 
-        Returns: 0+ = GPU, -1 = CPU
-
-        Qo'llab-quvvatlanadigan GPU'lar:
-        - NVIDIA CUDA (Windows/Linux)
-        - DirectML (Windows - AMD/Intel/NVIDIA)
-        - OpenVINO (Intel)
-        - CoreML (macOS - Apple Silicon)
+        config.ini [inference] out_of_process = true bo'lsa modellar
+        alohida jarayonda yuklanadi; server ishga tushmasa - shu jarayonda.
         """
         # Lazy import to avoid circular dependency
-        from safebrowser.utils.system import is_macos, get_platform_name
+        from safebrowser.config import config
+        from safebrowser.utils.helpers import init_face_analyzer
 
-        try:
-            import onnxruntime as ort
-            providers = ort.get_available_providers()
-            print(f"Platform: {get_platform_name()}")
-            print(f"Mavjud providerlar: {providers}")
-
-            # NVIDIA GPU (CUDA) - Windows/Linux
-            if 'CUDAExecutionProvider' in providers:
-                print("GPU (NVIDIA CUDA) topildi - GPU ishlatiladi")
-                return 0
-
-            # macOS Apple Silicon (CoreML)
-            if is_macos() and 'CoreMLExecutionProvider' in providers:
-                print("GPU (Apple CoreML) topildi - GPU ishlatiladi")
-                return 0
-
-            # AMD/Intel/NVIDIA GPU (DirectML) - Windows
-            if 'DmlExecutionProvider' in providers:
-                print("GPU (DirectML) topildi - GPU ishlatiladi")
-                return 0
-
-            # Intel GPU (OpenVINO) - Cross-platform
-            if 'OpenVINOExecutionProvider' in providers:
-                print("GPU (OpenVINO) topildi - GPU ishlatiladi")
-                return 0
-
-            # ROCm for AMD GPUs on Linux
-            if 'ROCMExecutionProvider' in providers:
-                print("GPU (AMD ROCm) topildi - GPU ishlatiladi")
-                return 0
-
-            print(f"GPU topilmadi ({get_platform_name()}) - CPU ishlatiladi")
-            return -1
+        if config.inference_out_of_process:
+            from safebrowser.core.inference_server import create_remote_analyzer
 
-        except Exception as e:
-            print(f"Device detection xatosi: {e} - CPU ishlatiladi")
-            return -1
+            analyzer = create_remote_analyzer(det_size=self.det_size, providers=providers)
+            if analyzer is not None:
+                return analyzer
+            print("Inference server ishga tushmadi - modellar shu jarayonda yuklanadi")
 
+        analyzer = init_face_analyzer(det_size=self.det_size, providers=providers)
+        if analyzer is None:
+            raise RuntimeError("FaceAnalysis init error")
+        return analyzer
 
-class TestLoaderWorker(QThread):
-    """
-    Server'dan testlar ro'yxatini yuklash
-    """
-    result = pyqtSignal(object)
+    def _discard(self):
+        """Kerak bo'lmay qolgan analyzer'ni (va uning server'ini) yopish"""
+        server = getattr(self.loaded_app, "server", None)
+        self.loaded_app.release()
+        if server is not None:
+            server.stop()
 
-    def __init__(self):
-        super().__init__()
+    def _report(self, stage: str, percent: int, message: str):
+        print(f"Model loader [{percent}%]: {message}")
+        self.progress.emit({"stage": stage, "percent": percent, "message": message})
 
     def run(self):
         try:
-            res = requests.get(f"{BASE_URL}/load-tests/", timeout=15)
-
-            if res.status_code in [400, 404, 500, 502]:
-                self.result.emit({
-                    "status": False,
-                    "result": [],
-                    "message": "Server bilan bog'lanishda muammo!"
-                })
+            self._report("device", 5, "Qurilma aniqlanmoqda...")
+            providers = self._select_providers()
+
+            self._report("models", 20, "Yuz aniqlash modeli yuklanmoqda...")
+            self.loaded_app = self._load_analyzer(providers)
+
+            if self.warm_up and self.is_running():
+                self._report("warmup", 80, "Model tayyorlanmoqda...")
+                # Lazy import to avoid circular dependency
+                from safebrowser.core.inference_executor import executor, PRIORITY_OFFLINE
+                executor.run(self.loaded_app.warm_up, priority=PRIORITY_OFFLINE)
+
+            if not self.is_running():
+                self._discard()
                 return
 
-            res_data = res.json()
-
-            if res_data.get('status') == 'success':
-                tests = res_data.get('data', [])
-                self.result.emit({
-                    "status": True,
-                    "result": tests,
-                    "message": "Muvaffaqiyatli yuklandi"
-                })
-            else:
-                self.result.emit({
-                    "status": False,
-                    "result": [],
-                    "message": res_data.get('message', 'Xatolik')
-                })
-
-        except requests.exceptions.Timeout:
-            self.result.emit({
-                "status": False,
-                "result": [],
-                "message": "Server javob bermadi (timeout)"
-            })
-        except requests.exceptions.RequestException as e:
-            self.result.emit({
-                "status": False,
-                "result": [],
-                "message": f"Ulanish xatoligi: {e}"
-            })
+            self._report("ready", 100, "Model tayyor")
+            self.app.emit({"app": self.loaded_app, "status": True})
         except Exception as e:
-            self.result.emit({
-                "status": False,
-                "result": [],
-                "message": f"Xatolik: {e}"
-            })
+            print(f"AppLoaderWorker error: {e}")
+            self.app.emit({"app": None, "status": False, "error": str(e)})
+
@@ -0,0 +1,21 @@
+"""
+Pytest umumiy sozlamalari
+"""
+import os
+import sys
+
+import pytest
+
+# src papkasini path'ga qo'shish
+src_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """Qt obyektlari uchun QCoreApplication (oyna ochilmaydi)"""
+    from PyQt6.QtCore import QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    yield app
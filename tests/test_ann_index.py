@@ -0,0 +1,139 @@
+"""
+IVFIndex va StaffGallery (ANN yo'li) testlari
+"""
+import numpy as np
+import pytest
+
+from safebrowser.core.ann_index import IVFIndex
+from safebrowser.core.staff_gallery import StaffGallery
+
+
+DIM = 512
+
+
+def _unit(rng, count: int, dim: int = DIM) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _noisy(rng, vectors: np.ndarray, scale: float = 0.03) -> np.ndarray:
+    """Bir xil odamning boshqa suratidagi embedding kabi"""
+    return vectors + rng.standard_normal(vectors.shape).astype(np.float32) * scale
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(7)
+    return _unit(rng, 3000)
+
+
+@pytest.fixture
+def trained(data):
+    index = IVFIndex(dim=DIM)
+    index.add(range(len(data)), data)
+    index.train()
+    return index
+
+
+def test_recall_at_1_matches_exact_search(trained, data):
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(data), 200, replace=False)
+    queries = _noisy(rng, data[picks])
+
+    hits = 0
+    for query in queries:
+        exact_ids, _ = trained.search_exact(query, 1)
+        ann_ids, _ = trained.search(query, 1)
+        hits += int(len(ann_ids) and ann_ids[0] == exact_ids[0])
+
+    assert trained.nprobe == 8
+    assert hits / len(queries) >= 0.95
+
+
+def test_add_and_remove_after_train(trained):
+    rng = np.random.default_rng(2)
+    extra = _unit(rng, 10)
+    new_ids = list(range(10000, 10010))
+    trained.add(new_ids, extra)
+
+    for item_id, vector in zip(new_ids, extra):
+        ids, scores = trained.search(vector, 1)
+        assert ids[0] == item_id
+        assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+    assert trained.remove(new_ids[:5]) == 5
+    assert trained.remove(new_ids[:5]) == 0
+    for item_id, vector in zip(new_ids[:5], extra[:5]):
+        assert item_id not in trained
+        assert item_id not in trained.search(vector, 5)[0]
+        assert item_id not in trained.search_exact(vector, 5)[0]
+
+
+def test_add_existing_id_replaces_vector(trained, data):
+    rng = np.random.default_rng(3)
+    size = len(trained)
+    replacement = _unit(rng, 1)
+
+    trained.add([0], replacement)
+
+    assert len(trained) == size
+    ids, scores = trained.search(replacement[0], 1)
+    assert ids[0] == 0
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    # Eski vektor bo'yicha 0 endi topilmaydi
+    assert 0 not in trained.search_exact(data[0], 3)[0]
+
+
+def test_save_load_mmap_round_trip_then_add(trained, data, tmp_path):
+    trained.remove([1, 2])
+    trained.save(str(tmp_path))
+
+    loaded = IVFIndex.load(str(tmp_path), mmap=True)
+    assert len(loaded) == len(trained)
+    assert loaded.is_trained and loaded.nlist == trained.nlist
+    assert 1 not in loaded and 2 not in loaded
+    for row in (3, 500, 2999):
+        assert loaded.search(data[row], 1)[0][0] == row
+
+    rng = np.random.default_rng(4)
+    extra = _unit(rng, 3)
+    loaded.add([20000, 20001, 20002], extra)
+    assert len(loaded) == len(trained) + 3
+    assert loaded.search(extra[1], 1)[0][0] == 20001
+
+    # mmap ochiq turganda qayta saqlash va o'qish
+    loaded.save(str(tmp_path))
+    reloaded = IVFIndex.load(str(tmp_path), mmap=True)
+    assert reloaded.search(extra[2], 1)[0][0] == 20002
+
+
+def _upserts(vectors: np.ndarray, start: int) -> list:
+    return [
+        {"id": f"s{start + i}", "name": f"Xodim {start + i}", "embedding": vector.tolist()}
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def test_gallery_apply_delta_crosses_ann_min_size(tmp_path):
+    rng = np.random.default_rng(5)
+    vectors = _unit(rng, 90)
+    gallery = StaffGallery(path=str(tmp_path / "gallery.npz"), ann_min_size=50)
+
+    gallery.apply_delta({"full": True, "upserts": _upserts(vectors[:60], 0), "version": 1})
+    assert gallery.uses_index
+    assert gallery.search(vectors[10])[0]["id"] == "s10"
+    assert gallery._index is not None
+
+    # Chegaradan pastga: to'liq qidiruv, o'chirilganlar topilmaydi
+    gallery.apply_delta({"deletes": [f"s{i}" for i in range(20)], "version": 2})
+    assert len(gallery) == 40 and not gallery.uses_index
+    assert gallery.search(vectors[30])[0]["id"] == "s30"
+    assert all(m["id"] != "s5" for m in gallery.search(vectors[5], k=5))
+
+    # Yana yuqoriga: index o'zgarishlar bilan yangilangan bo'lishi kerak
+    gallery.apply_delta({"upserts": _upserts(vectors[60:90], 60), "version": 3})
+    assert len(gallery) == 70 and gallery.uses_index
+    assert gallery.search(vectors[75])[0]["id"] == "s75"
+    assert gallery.search(vectors[45])[0]["id"] == "s45"
+    assert all(m["id"] != "s5" for m in gallery.search(vectors[5], k=5))
+    assert gallery.search(vectors[75])[0]["name"] == "Xodim 75"
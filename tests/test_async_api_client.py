@@ -0,0 +1,45 @@
+"""
+AsyncAPIClient faol so'rovlar hisobi testlari
+"""
+import socket
+
+from PyQt6.QtCore import QEventLoop, QTimer
+
+from safebrowser.services.async_api_client import AsyncAPIClient
+
+
+def _run_until(qapp, predicate, timeout_ms: int = 3000):
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.timeout.connect(lambda: predicate() and loop.quit())
+    timer.start(10)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    timer.stop()
+
+
+def test_finished_probes_leave_active_set(qapp):
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    port = server.getsockname()[1]
+
+    client = AsyncAPIClient(base_url="http://127.0.0.1:1")
+    replies = [client.probe_tcp("127.0.0.1", port, timeout=2.0) for _ in range(10)]
+    _run_until(qapp, lambda: all(reply.is_finished for reply in replies))
+    _run_until(qapp, lambda: client.pending() == 0, 500)
+
+    server.close()
+    assert all(reply.result() is True for reply in replies)
+    assert client.pending() == 0
+
+
+def test_cancelled_requests_leave_active_set(qapp):
+    client = AsyncAPIClient(base_url="http://10.255.255.1:9")
+    replies = [client.get("slow/", tag="page") for _ in range(5)]
+    assert client.pending() == 5
+
+    assert client.cancel("page") == 5
+    _run_until(qapp, lambda: client.pending() == 0, 500)
+    assert client.pending() == 0
+    assert all(reply.is_cancelled for reply in replies)
@@ -0,0 +1,83 @@
+"""
+EmbeddingCache testlari
+"""
+import numpy as np
+import pytest
+
+from safebrowser.core.embedding_cache import EmbeddingCache
+
+
+def _embedding(value: float) -> np.ndarray:
+    return np.full(8, value, dtype=np.float32)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = EmbeddingCache(capacity=2)
+    cache.put("a", _embedding(1))
+    cache.put("b", _embedding(2))
+
+    # "a" ishlatildi - endi eng eskisi "b"
+    assert cache.get("a") is not None
+    cache.put("c", _embedding(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["size"] == 2
+
+
+def test_put_existing_key_refreshes_without_growing():
+    cache = EmbeddingCache(capacity=2)
+    cache.put("a", _embedding(1))
+    cache.put("b", _embedding(2))
+    cache.put("a", _embedding(-1))
+    cache.put("c", _embedding(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a")[0] < 0
+
+
+def test_capacity_is_at_least_one():
+    cache = EmbeddingCache(capacity=0)
+    cache.put("a", _embedding(1))
+    cache.put("b", _embedding(2))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_content_hash_key_hits_for_equal_content():
+    cache = EmbeddingCache()
+    image = b"\xff\xd8passport-image-bytes"
+    stored = cache.put(EmbeddingCache.key_for(image), _embedding(3))
+
+    # Boshqa obyekt, bir xil mazmun
+    assert cache.get(EmbeddingCache.key_for(bytes(bytearray(image)))) is stored
+    # base64 matn va bayt ko'rinishi bir xil kalit beradi
+    assert EmbeddingCache.key_for("abc") == EmbeddingCache.key_for(b"abc")
+    assert EmbeddingCache.key_for(image + b"x") != EmbeddingCache.key_for(image)
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 0
+    assert stats["hit_rate"] == 1.0
+
+
+def test_stored_embedding_is_normalized_and_read_only():
+    cache = EmbeddingCache()
+    stored = cache.put("a", _embedding(5))
+
+    assert np.linalg.norm(stored) == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        stored[0] = 0.0
+
+    zero = cache.put("z", np.zeros(8))
+    assert not zero.any()
+
+
+def test_miss_counts_and_clear():
+    cache = EmbeddingCache()
+    assert cache.get("missing") is None
+    cache.put("a", _embedding(1))
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,248 @@
+"""
+embedding_codec va verify_face fallback testlari
+"""
+import base64
+import json
+import struct
+from json import dumps as _dumps
+
+import numpy as np
+import pytest
+
+from safebrowser.services import embedding_codec
+from safebrowser.services.api_client import APIClient
+from safebrowser.services.embedding_codec import EmbeddingCodecError
+
+
+def _embedding(seed: int = 0, dim: int = 512) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # ArcFace embedding normasi ~20-30
+    vector = rng.normal(size=dim).astype(np.float32)
+    return vector * 25 / np.linalg.norm(vector)
+
+
+def _cosine(a, b) -> float:
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+@pytest.mark.parametrize("dtype, size, max_drift", [("int8", 16 + 512, 1e-3), ("float16", 16 + 1024, 1e-6)])
+def test_round_trip_cosine_drift(dtype, size, max_drift):
+    for seed in range(50):
+        vector = _embedding(seed)
+        payload = embedding_codec.encode(vector, dtype)
+        decoded = embedding_codec.decode(payload)
+
+        assert len(payload) == size
+        assert decoded.dtype == np.float32
+        assert 1 - _cosine(vector, decoded) < max_drift
+        assert np.linalg.norm(decoded) == pytest.approx(np.linalg.norm(vector), rel=1e-3)
+
+
+def test_round_trip_keeps_decision_near_threshold():
+    rng = np.random.default_rng(1)
+    for seed in range(50):
+        vector = _embedding(seed)
+        partner = vector + rng.normal(size=vector.shape).astype(np.float32) * 2.0
+        decoded = embedding_codec.from_base64(embedding_codec.to_base64(vector, "int8"))
+        assert abs(_cosine(vector, partner) - _cosine(decoded, partner)) < 5e-3
+
+
+def test_zero_vector_round_trip():
+    decoded = embedding_codec.decode(embedding_codec.encode(np.zeros(8), "int8"))
+    assert np.all(decoded == 0)
+
+
+def test_header_fields():
+    vector = _embedding()
+    magic, version, dtype, flags, dim, norm, scale = struct.unpack_from(
+        "<3sBBBHff", embedding_codec.encode(vector, "int8")
+    )
+    assert (magic, version, dtype, flags, dim) == (b"SBE", 1, embedding_codec.DTYPE_INT8, 0, 512)
+    assert norm == pytest.approx(25, rel=1e-5)
+    assert scale > 0
+
+
+def test_unknown_dtype_rejected():
+    with pytest.raises(EmbeddingCodecError):
+        embedding_codec.encode(_embedding(), "int4")
+
+
+def test_bad_magic_rejected():
+    payload = bytearray(embedding_codec.encode(_embedding()))
+    payload[:3] = b"XYZ"
+    with pytest.raises(EmbeddingCodecError):
+        embedding_codec.decode(bytes(payload))
+
+
+def test_unsupported_version_rejected():
+    payload = bytearray(embedding_codec.encode(_embedding()))
+    payload[3] = 2
+    with pytest.raises(EmbeddingCodecError):
+        embedding_codec.decode(bytes(payload))
+
+
+def test_unknown_dtype_code_rejected():
+    payload = bytearray(embedding_codec.encode(_embedding()))
+    payload[4] = 9
+    with pytest.raises(EmbeddingCodecError):
+        embedding_codec.decode(bytes(payload))
+
+
+@pytest.mark.parametrize("cut", [0, 5, 15, 16, 100, 527])
+def test_truncated_payload_rejected(cut):
+    payload = embedding_codec.encode(_embedding(), "int8")
+    with pytest.raises(EmbeddingCodecError):
+        embedding_codec.decode(payload[:cut])
+
+
+def test_trailing_bytes_rejected():
+    with pytest.raises(EmbeddingCodecError):
+        embedding_codec.decode(embedding_codec.encode(_embedding()) + b"\0")
+
+
+def test_invalid_base64_rejected():
+    with pytest.raises(EmbeddingCodecError):
+        embedding_codec.from_base64("not base64!")
+
+
+def test_embedding_payload():
+    vector = _embedding()
+    payload = embedding_codec.embedding_payload(vector, "float16")
+
+    assert payload["embedding_format"] == "sbe1"
+    assert set(payload) == {"embedding_b64", "embedding_format"}
+    raw = base64.b64decode(payload["embedding_b64"])
+    assert np.allclose(embedding_codec.decode(raw), vector, atol=1e-2)
+    assert len(json.dumps(payload)) < len(json.dumps(embedding_codec.legacy_payload(vector))) / 5
+
+
+def test_legacy_payload():
+    vector = np.array([0.5, -1.25, 2.0], dtype=np.float32)
+    payload = embedding_codec.legacy_payload(vector)
+
+    assert payload == {"embedding": "[0.5, -1.25, 2.0]"}
+    assert embedding_codec.embedding_payload(vector, "legacy") == payload
+
+
+# verify_face fallback
+
+def _server(compact_response: dict):
+    """Ixcham payload'ga compact_response, eski payload'ga tasdiq qaytaruvchi server"""
+    calls = []
+
+    def respond(payload: dict) -> dict:
+        calls.append("compact" if "embedding_b64" in payload else "legacy")
+        if "embedding_b64" in payload:
+            return compact_response
+        return {"verified": True, "message": "legacy"}
+
+    return respond, calls
+
+
+class _StubTransport:
+    """HttpTransport o'rniga - javob respond(payload) dan"""
+
+    def __init__(self, respond):
+        self.respond = respond
+
+    def request(self, method, url, timeout, json=None, **kwargs):
+        result = dict(self.respond(json))
+        status = result.pop("code", 200)
+        body = _dumps(result).encode()
+
+        class Response:
+            status_code = status
+            content = body
+
+        return Response()
+
+
+REJECTIONS = [
+    {"code": 422},
+    {"code": 415},
+    {"code": 500},
+    {"code": 503},
+    {"status": False, "message": "embedding maydoni yo'q"},
+]
+
+
+@pytest.mark.parametrize("rejection", REJECTIONS)
+def test_sync_verify_face_falls_back_to_legacy(rejection):
+    respond, calls = _server(dict(rejection))
+    client = APIClient(base_url=f"http://sync-{id(rejection)}", transport=_StubTransport(respond))
+
+    assert client.verify_face(_embedding(), "int8") == {"verified": True, "message": "legacy"}
+    assert calls == ["compact", "legacy"]
+
+    # Server eslab qolinadi - keyingi so'rov darhol eski formatda
+    client.verify_face(_embedding(), "int8")
+    assert calls == ["compact", "legacy", "legacy"]
+
+
+def test_sync_verify_face_compact_accepted():
+    respond, calls = _server({"verified": True, "message": "compact"})
+    client = APIClient(base_url="http://sync-compact", transport=_StubTransport(respond))
+
+    assert client.verify_face(_embedding(), "int8")["message"] == "compact"
+    assert calls == ["compact"]
+
+
+def test_sync_verify_face_legacy_default_sends_only_legacy():
+    respond, calls = _server({"verified": True, "message": "compact"})
+    client = APIClient(base_url="http://sync-default", transport=_StubTransport(respond))
+
+    assert client.verify_face(_embedding())["message"] == "legacy"
+    assert calls == ["legacy"]
+
+
+def test_sync_verify_face_network_error_not_retried():
+    class FailingTransport:
+        calls = 0
+
+        def request(self, *args, **kwargs):
+            import requests
+            FailingTransport.calls += 1
+            raise requests.exceptions.ConnectionError("down")
+
+    client = APIClient(base_url="http://sync-down", transport=FailingTransport())
+    result = client.verify_face(_embedding(), "int8")
+
+    assert result["network"] is True
+    assert FailingTransport.calls == 1
+
+
+def _async_client(qapp, base_url: str, respond):
+    """AsyncAPIClient - post() darhol natija beradigan ApiReply qaytaradi"""
+    from safebrowser.services.async_api_client import ApiReply, AsyncAPIClient
+
+    client = AsyncAPIClient(base_url=base_url)
+
+    def post(endpoint, json=None, tag=None):
+        reply = ApiReply(tag)
+        reply._resolve(respond(json))
+        return reply
+
+    client.post = post
+    return client
+
+
+@pytest.mark.parametrize("rejection", REJECTIONS)
+def test_async_verify_face_falls_back_to_legacy(qapp, rejection):
+    respond, calls = _server(dict(rejection))
+    client = _async_client(qapp, f"http://async-{id(rejection)}", respond)
+
+    reply = client.verify_face(_embedding(), "int8")
+    assert reply.is_finished
+    assert reply.result() == {"verified": True, "message": "legacy"}
+    assert calls == ["compact", "legacy"]
+
+    client.verify_face(_embedding(), "int8")
+    assert calls == ["compact", "legacy", "legacy"]
+
+
+def test_async_verify_face_compact_accepted(qapp):
+    respond, calls = _server({"verified": False, "message": "compact"})
+    client = _async_client(qapp, "http://async-compact", respond)
+
+    assert client.verify_face(_embedding(), "float16").result()["message"] == "compact"
+    assert calls == ["compact"]
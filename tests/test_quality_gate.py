@@ -0,0 +1,94 @@
+"""
+FaceQualityGate testlari - har bir rad etish sababi
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from safebrowser.core.quality import REJECT_REASONS, FaceQualityGate, estimate_pose
+
+
+# ArcFace 112x112 shablonidagi 5 ta keypoint (frontal yuz)
+ARCFACE_KPS = np.array([
+    [38.2946, 51.6963],
+    [73.5318, 51.5014],
+    [56.0252, 71.7366],
+    [41.5493, 92.3655],
+    [70.7299, 92.2041],
+], dtype=np.float32)
+
+
+def _face(bbox=(100, 100, 300, 300), det_score=0.9, kps=None, nose_shift=(0.0, 0.0)):
+    x1, y1, x2, y2 = bbox
+    if kps is None:
+        kps = ARCFACE_KPS * ((x2 - x1) / 112.0) + np.array([x1, y1], dtype=np.float32)
+        kps[2] += np.array(nose_shift, dtype=np.float32) * (x2 - x1)
+    return SimpleNamespace(bbox=np.array(bbox, dtype=np.float32), det_score=det_score, kps=kps)
+
+
+@pytest.fixture(scope="module")
+def sharp_image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+
+@pytest.fixture(scope="module")
+def flat_image():
+    return np.full((480, 640, 3), 128, dtype=np.uint8)
+
+
+def test_frontal_sharp_face_passes(sharp_image):
+    gate = FaceQualityGate()
+    passed, reason, metrics = gate.check(sharp_image, _face())
+
+    assert passed and reason is None
+    assert abs(metrics["yaw"]) < 5 and abs(metrics["pitch"]) < 5
+    assert metrics["sharpness"] >= gate.min_sharpness
+    assert gate.stats()["passed"] == 1
+
+
+@pytest.mark.parametrize("face_kwargs, image_name, reason", [
+    ({"det_score": 0.3}, "sharp_image", "score"),
+    ({"bbox": (100, 100, 140, 140)}, "sharp_image", "size"),
+    ({}, "flat_image", "blur"),
+    ({"nose_shift": (0.2, 0.0)}, "sharp_image", "yaw"),
+    ({"nose_shift": (0.0, 0.2)}, "sharp_image", "pitch"),
+])
+def test_each_reject_reason(request, face_kwargs, image_name, reason):
+    gate = FaceQualityGate()
+    passed, got, metrics = gate.check(request.getfixturevalue(image_name), _face(**face_kwargs))
+
+    assert not passed
+    assert got == reason
+    assert gate.stats()["rejected"] == {r: int(r == reason) for r in REJECT_REASONS}
+    assert gate.stats()["passed"] == 0
+
+
+def test_cheap_rejects_skip_sharpness(sharp_image):
+    gate = FaceQualityGate()
+    _, _, metrics = gate.check(sharp_image, _face(det_score=0.1))
+    assert "sharpness" not in metrics and "yaw" not in metrics
+
+    _, _, metrics = gate.check(sharp_image, _face(nose_shift=(0.2, 0.0)))
+    assert "sharpness" not in metrics
+
+
+def test_face_without_keypoints_skips_pose(sharp_image):
+    face = _face()
+    face.kps = None
+    passed, reason, metrics = FaceQualityGate().check(sharp_image, face)
+    assert passed and reason is None
+    assert "yaw" not in metrics
+
+
+def test_pose_sign_and_roll():
+    yaw, pitch, roll = estimate_pose(ARCFACE_KPS)
+    assert abs(yaw) < 1 and abs(pitch) < 3 and abs(roll) < 1
+
+    shifted = ARCFACE_KPS.copy()
+    shifted[2, 0] += 10
+    assert estimate_pose(shifted)[0] > 15
+
+    # Ko'zlar bir nuqtada - ishonchsiz, burilgan deb hisoblanadi
+    assert estimate_pose(np.zeros((5, 2)))[:2] == (90.0, 90.0)
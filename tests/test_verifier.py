@@ -0,0 +1,106 @@
+"""
+SequentialVerifier testlari
+"""
+import numpy as np
+import pytest
+
+from safebrowser.core.verifier import (
+    DECISION_MATCH,
+    DECISION_NO_MATCH,
+    DECISION_PENDING,
+    SequentialVerifier,
+)
+
+
+THRESHOLD = 0.5
+# Bitta namuna uchun oraliq: z * prior_std / sqrt(1)
+MARGIN = 1.64 * 0.05
+
+
+def _verifier(**kwargs) -> SequentialVerifier:
+    return SequentialVerifier(THRESHOLD, **kwargs)
+
+
+@pytest.mark.parametrize("similarity, decision", [
+    (THRESHOLD + MARGIN + 0.002, DECISION_MATCH),
+    (THRESHOLD + MARGIN - 0.002, DECISION_PENDING),
+    (THRESHOLD - MARGIN - 0.002, DECISION_NO_MATCH),
+    (THRESHOLD - MARGIN + 0.002, DECISION_PENDING),
+])
+def test_single_sample_boundaries(similarity, decision):
+    assert _verifier().add(similarity) == decision
+
+
+def test_prior_std_floor_keeps_identical_samples_undecided():
+    verifier = _verifier(max_samples=10)
+    # std = 0, lekin oraliq prior_std bo'yicha: 1.64 * 0.05 / sqrt(2) ~ 0.058
+    assert verifier.add(0.54) == DECISION_PENDING
+    assert verifier.add(0.54) == DECISION_PENDING
+    lower, upper = verifier.bounds()
+    assert lower == pytest.approx(0.54 - 1.64 * 0.05 / np.sqrt(2))
+    assert upper == pytest.approx(0.54 + 1.64 * 0.05 / np.sqrt(2))
+
+    # Namunalar ko'payishi bilan oraliq torayadi va qaror qabul qilinadi
+    decisions = [verifier.add(0.54) for _ in range(3)]
+    assert decisions == [DECISION_PENDING, DECISION_PENDING, DECISION_MATCH]
+    assert verifier.samples == 5
+
+
+def test_sample_std_used_when_above_prior():
+    verifier = _verifier(min_samples=2, max_samples=10)
+    verifier.add(0.3)
+    verifier.add(0.9)
+    lower, upper = verifier.bounds()
+    std = np.std([0.3, 0.9], ddof=1)
+    assert upper - lower == pytest.approx(2 * 1.64 * std / np.sqrt(2))
+    assert verifier.decision == DECISION_PENDING
+
+
+def test_max_samples_forces_decision_by_mean():
+    verifier = _verifier(max_samples=3)
+    assert verifier.add(0.51) == DECISION_PENDING
+    assert verifier.add(0.49) == DECISION_PENDING
+    assert verifier.add(0.52) == DECISION_MATCH
+    assert verifier.result()["samples"] == 3
+
+    verifier = _verifier(max_samples=2)
+    verifier.add(0.5)
+    assert verifier.add(0.48) == DECISION_NO_MATCH
+
+
+def test_min_samples_delays_clear_decision():
+    verifier = _verifier(min_samples=3)
+    assert verifier.add(0.95) == DECISION_PENDING
+    assert verifier.add(0.95) == DECISION_PENDING
+    assert verifier.add(0.95) == DECISION_MATCH
+
+
+def test_decision_is_final_until_reset():
+    verifier = _verifier()
+    embedding = np.ones(4, dtype=np.float32)
+    assert verifier.add(0.9, embedding) == DECISION_MATCH
+    assert verifier.add(0.1) == DECISION_MATCH
+    assert verifier.samples == 1
+    assert verifier.mean_embedding() == pytest.approx(np.full(4, 0.5))
+
+    verifier.reset()
+    assert verifier.decision == DECISION_PENDING
+    assert verifier.samples == 0
+    assert verifier.mean_embedding() is None
+    assert verifier.bounds() == (-1.0, 1.0)
+    assert verifier.add(0.1) == DECISION_NO_MATCH
+
+
+def test_finish_decides_by_mean():
+    verifier = _verifier()
+    assert verifier.finish() == DECISION_PENDING
+
+    verifier.add(0.53)
+    assert verifier.finish() == DECISION_MATCH
+    assert verifier.result()["is_verified"]
+
+
+def test_from_score_zero_never_matches():
+    verifier = SequentialVerifier.from_score(0)
+    assert verifier.add(1.0) == DECISION_NO_MATCH
+    assert SequentialVerifier.from_score(60).threshold == pytest.approx(0.6)